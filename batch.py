@@ -0,0 +1,153 @@
+import json
+import sys
+from services import cart
+from services.products.controlers.controller import Controller
+from services.products.controlers.categoryregistry import CategoryRegistry
+
+class Batch():
+    """
+    Classe Batch para executar operações de estoque sem interação com o usuário.
+
+    Lê um roteiro com uma operação JSON por linha e executa cada uma pelos mesmos
+    controladores usados pela Screen (ProductController e Cart), sem pausas nem
+    limpeza de tela. Para cada operação é impressa uma linha JSON com o resultado,
+    para que outras ferramentas possam usar o sistema na velocidade máxima.
+
+    Operações (campos como nos arquivos de importação: produto, genero, nome, quantidade, preco):
+    - {"op": "restock", "produto": "shampoo", "genero": "masculino", "nome": "Men shampoo", "quantidade": 5}
+    - {"op": "sell", "itens": [{"produto": "batom", "genero": "unisex", "nome": "Make B", "quantidade": 1}, ...]}
+      (ou um único item com os campos no próprio objeto)
+    - {"op": "reprice", "produto": "perfume", "genero": "feminino", "nome": "Lily", "preco": 89.9}
+      (sem "nome": remarcação em massa com "percentual", "valor" ou "precos", filtrada
+      por "produto", "genero" e "padrao")
+    - {"op": "add", "produto": "shampoo", "genero": "feminino", "nome": "Novo", "quantidade": 3, "preco": 19.9}
+
+    Linhas vazias ou começando com '#' são ignoradas.
+
+    Saída (uma linha por operação):
+    - {"linha": 1, "op": "restock", "ok": true, "quantidade": 15}
+    - {"linha": 2, "op": "sell", "ok": false, "erro": "InsufficientStock", "mensagem": "..."}
+
+    Métodos:
+    - run(self, lines, output=sys.stdout) -> int: Executa o roteiro e retorna a quantidade de falhas.
+    - execute(self, operation) -> dict: Executa uma operação e retorna o resultado.
+    - controller(self, operation) -> ProductController: O controlador do tipo e gênero da operação.
+    """
+
+    def __init__(self) -> None:
+        # Os tipos de produto e gêneros vêm do catálogo; os controladores são reaproveitados
+        self._registry = CategoryRegistry()
+
+        # Mapeia o nome da operação para o método correspondente
+        self._operations = {
+            'restock': self._restock,
+            'sell': self._sell,
+            'reprice': self._reprice,
+            'add': self._add,
+        }
+
+    def controller(self, operation: dict):
+        """
+        Retorna o controlador do tipo e gênero informados na operação.
+
+        Lança:
+        - InvalidProduct se o tipo de produto ou o gênero não existirem.
+        """
+        return self._registry.controller(operation['produto'], operation['genero'])
+
+    def _restock(self, operation: dict) -> dict:
+        quantity = int(operation['quantidade'])
+        if quantity <= 0:
+            raise ValueError("A quantidade reposta deve ser maior que 0!")  # Como na venda (check_sale)
+        action = self.controller(operation)
+        action.increase_quantity(operation['nome'], quantity)
+        return {'quantidade': action.product_details(operation['nome'])[1]['quantidade']}
+
+    def _sell(self, operation: dict) -> dict:
+        shopping_cart = cart.Cart()
+        try:
+            for item in operation.get('itens', [operation]):
+                action = self.controller(item)
+                price = action.show_price(item['nome'])
+                shopping_cart.add_item(item['nome'], int(item['quantidade']), price, action.product, action.gender)
+            return {'total': shopping_cart.checkout()}  # Tudo ou nada: sem estoque, nenhum item é baixado
+        except Exception:
+            shopping_cart.cancel()  # Libera as reservas dos itens já incluídos
+            raise
+
+    def _reprice(self, operation: dict) -> dict:
+        if 'nome' in operation:
+            self.controller(operation).edit_price(operation['nome'], float(operation['preco']))
+            return {'alterados': 1}
+        changed = Controller().reprice(operation.get('percentual'), operation.get('valor'), operation.get('precos'),
+                                       operation.get('produto'), operation.get('genero'), operation.get('padrao'))
+        return {'alterados': changed}
+
+    def _add(self, operation: dict) -> dict:
+        self.controller(operation).add_product(operation['nome'], int(operation['quantidade']),
+                                                float(operation['preco']))
+        return {}
+
+    def execute(self, operation: dict) -> dict:
+        """
+        Executa uma operação.
+
+        Parâmetros:
+        - operation (dict): A operação, ex. {"op": "restock", ...}.
+
+        Retorna:
+        - Um dicionário com "ok" e o resultado, ou "erro" (nome da exceção) e "mensagem".
+        """
+        try:
+            method = self._operations.get(operation.get('op'))
+            if method is None:
+                raise ValueError(f"Operação desconhecida: {operation.get('op')!r}")
+            return {'ok': True, **method(operation)}
+        except KeyError as e:
+            return {'ok': False, 'erro': 'KeyError', 'mensagem': f"Campo obrigatório ausente: {e.args[0]}"}
+        except Exception as e:
+            return {'ok': False, 'erro': type(e).__name__, 'mensagem': str(e)}
+
+    def run(self, lines, output=sys.stdout) -> int:
+        """
+        Executa um roteiro, imprimindo uma linha JSON por operação.
+
+        Parâmetros:
+        - lines: As linhas do roteiro (um arquivo aberto ou a entrada padrão).
+        - output: Onde imprimir os resultados.
+
+        Retorna:
+        - A quantidade de operações que falharam.
+        """
+        failures = 0
+        for line_number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                operation = json.loads(line)
+                if not isinstance(operation, dict):
+                    raise ValueError("A operação precisa ser um objeto JSON")
+            except ValueError as e:
+                result = {'ok': False, 'erro': 'ValueError', 'mensagem': f"Linha inválida: {e}"}
+                operation = {}
+            else:
+                result = self.execute(operation)
+            failures += not result['ok']
+            output.write(json.dumps({'linha': line_number, 'op': operation.get('op'), **result},
+                                    ensure_ascii=False) + '\n')
+            output.flush()
+        return failures
+
+
+def run_batch(path: str = '-') -> int:
+    """
+    Executa um roteiro de um arquivo ou da entrada padrão ('-').
+
+    Retorna:
+    - 0 se todas as operações deram certo, 1 se alguma falhou.
+    """
+    if path == '-':
+        return 1 if Batch().run(sys.stdin) else 0
+    with open(path, 'r', encoding='utf-8') as file:
+        return 1 if Batch().run(file) else 0
@@ -0,0 +1,218 @@
+"""
+Benchmark das operações do ProductController e do Cart.
+
+Para cada tamanho de catálogo, gera um catálogo sintético (generate_catalog.py)
+em um diretório temporário e mede as operações abaixo, cada tamanho em um
+processo separado para que o pico de memória (RSS) seja do próprio tamanho:
+
+- show_price, increase_quantity, decrease_quantity, all_products_details e
+  check_zero_quantity do ProductController;
+- show_price e stock_by_id pelo código (SKU), direto dos vetores da SkuTable;
+- Cart.get_total em um carrinho de 100 linhas;
+- checkout completo (Cart.checkout) de um carrinho de 30 linhas;
+- entrada de 50 produtos (increase_quantity), chamada a chamada e dentro de
+  uma transação (Controller.transaction).
+
+O resultado é um JSON com operações por segundo, latência p50/p99 (ms) e pico
+de RSS, para comparar execuções entre commits.
+
+Uso (na raiz do projeto):
+    python benchmarks/bench.py --sizes 1000,100000 --output bench.json
+    python benchmarks/bench.py --sizes 1000000 --storage sqlite --max-seconds 5
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_catalog import write_catalog, LAYOUT
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_kb():
+    """
+    Retorna o pico de memória residente do processo em KiB (None se indisponível).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # macOS informa em bytes
+
+
+def measure(function, iterations: int, max_seconds: float) -> dict:
+    """
+    Executa a função várias vezes e retorna as estatísticas de latência.
+
+    Para antes de `iterations` chamadas se o tempo total passar de `max_seconds`.
+    """
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    for index in range(iterations):
+        start = time.perf_counter_ns()
+        function(index)
+        samples.append(time.perf_counter_ns() - start)
+        if time.perf_counter() >= deadline:
+            break
+    samples.sort()
+    total = sum(samples)
+    return {
+        'calls': len(samples),
+        'ops_per_sec': round(len(samples) / (total / 1e9), 2) if total else None,
+        'p50_ms': round(samples[len(samples) // 2] / 1e6, 4),
+        'p99_ms': round(samples[min(int(len(samples) * 0.99), len(samples) - 1)] / 1e6, 4),
+    }
+
+
+def run_single(size: int, storage_kind: str, iterations: int, max_seconds: float) -> dict:
+    """
+    Mede todas as operações em um catálogo de `size` produtos.
+    """
+    from services.cart import Cart
+    from services.products.controlers.controller import Controller
+    from services.products.controlers.storage import JsonStorage
+    from services.products.controlers.productcontroller import ProductController
+
+    workdir = tempfile.mkdtemp(prefix='bench_')
+    try:
+        json_path = os.path.join(workdir, 'data.json')
+        data = write_catalog(size, json_path)
+        if storage_kind == 'sqlite':
+            from services.products.controlers.sqlitestorage import SqliteStorage, migrate_json_to_sqlite
+            migrate_json_to_sqlite(json_path, os.path.join(workdir, 'data.db'))
+            Controller.use_storage(SqliteStorage(os.path.join(workdir, 'data.db')))
+        elif storage_kind == 'binary':
+            from services.products.controlers.binarystorage import BinaryStorage, convert_json_to_binary
+            convert_json_to_binary(json_path, os.path.join(workdir, 'data.bin'))
+            Controller.use_storage(BinaryStorage(os.path.join(workdir, 'data.bin')))
+        else:
+            Controller.use_storage(JsonStorage(json_path, journaled=(storage_kind == 'journal')))
+
+        product, gender = LAYOUT[0]
+        names = list(data[product][gender])
+        del data
+        controller = ProductController(gender, product)
+
+        results = {}
+        start = time.perf_counter()
+        controller.load_json()
+        results['first_load'] = {'seconds': round(time.perf_counter() - start, 4)}
+
+        results['show_price'] = measure(lambda i: controller.show_price(names[i % len(names)]), iterations, max_seconds)
+
+        Controller.enable_skus(os.path.join(workdir, 'data.skus'))
+        start = time.perf_counter()
+        ids = controller.product_ids()
+        results['sku_first_use'] = {'seconds': round(time.perf_counter() - start, 4)}
+        results['show_price_by_id'] = measure(lambda i: controller.show_price(ids[i % len(ids)]), iterations, max_seconds)
+        results['stock_by_id'] = measure(lambda i: controller.stock_by_id(ids[i % len(ids)]), iterations, max_seconds)
+        results['increase_quantity'] = measure(lambda i: controller.increase_quantity(names[i % len(names)], 1),
+                                               iterations, max_seconds)
+        results['decrease_quantity'] = measure(lambda i: controller.decrease_quantity(names[i % len(names)], 1),
+                                               iterations, max_seconds)
+        results['all_products_details'] = measure(lambda i: controller.all_products_details(),
+                                                  min(iterations, 100), max_seconds)
+        results['check_zero_quantity'] = measure(lambda i: controller.check_zero_quantity(), iterations, max_seconds)
+
+        cart = Cart()
+        for name in names[:100]:
+            cart.add_item(name, 1, 10.0)  # Sem tipo e gênero: não reserva estoque (produtos podem estar em falta)
+        results['cart_get_total'] = measure(lambda i: cart.get_total(), iterations, max_seconds)
+
+        # Produtos com estoque de sobra para que nenhum checkout falte estoque
+        stocked = names[len(names) // 2:][:3000]
+        catalog = controller.load_json()
+        for name in stocked:
+            catalog[product][gender][name]['quantidade'] = 10 ** 6
+        controller.save_json(catalog)
+
+        def checkout(i):
+            basket = Cart()
+            start = (i * 30) % max(len(stocked) - 30, 1)
+            for name in stocked[start:start + 30]:
+                basket.add_item(name, 1, 10.0, product, gender)
+            basket.checkout()
+        results['checkout_30_lines'] = measure(checkout, min(iterations, 200), max_seconds)
+
+        def restock(i):
+            start = (i * 50) % max(len(names) - 50, 1)
+            for name in names[start:start + 50]:
+                controller.increase_quantity(name, 1)
+        results['restock_50_calls'] = measure(restock, min(iterations, 20), max_seconds)
+
+        def restock_transaction(i):
+            with Controller.transaction():
+                restock(i)
+        results['restock_50_transaction'] = measure(restock_transaction, min(iterations, 200), max_seconds)
+
+        Controller.storage.compact()
+        Controller.disable_skus()
+        return {
+            'size': size,
+            'storage': storage_kind,
+            'operations': results,
+            'peak_rss_kb': peak_rss_kb(),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark do ProductController e do Cart.')
+    parser.add_argument('--sizes', default='1000,100000', help='tamanhos de catálogo separados por vírgula')
+    parser.add_argument('--storage', choices=('json', 'journal', 'sqlite', 'binary'), default='json')
+    parser.add_argument('--iterations', type=int, default=1000, help='máximo de chamadas por operação')
+    parser.add_argument('--max-seconds', type=float, default=10.0, help='tempo máximo por operação')
+    parser.add_argument('--output', help='arquivo JSON de saída (padrão: saída padrão)')
+    parser.add_argument('--single', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_single(args.single, args.storage, args.iterations, args.max_seconds)))
+        return 0
+
+    runs = []
+    for size in (int(value) for value in args.sizes.split(',')):
+        # Cada tamanho roda em um processo novo: o pico de RSS não mistura tamanhos
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), '--single', str(size),
+                                    '--storage', args.storage, '--iterations', str(args.iterations),
+                                    '--max-seconds', str(args.max_seconds)],
+                                   capture_output=True, text=True, check=True)
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    report = {
+        'revision': git_revision(),
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'runs': runs,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Benchmark do histórico binário de movimentações (EventLog).
+
+Grava um histórico sintético de --events movimentações sobre --products produtos
+(em lotes, como as vendas de um carrinho) e mede a reconstrução do estado: do
+início do arquivo, a partir do snapshot mais recente e até um momento no meio
+do histórico. Com --no-numpy mede o caminho sem numpy (struct.iter_unpack).
+
+O resultado é um JSON com eventos por segundo de cada etapa.
+
+Uso (na raiz do projeto):
+    python benchmarks/bench_events.py --events 5000000 --products 100000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.products.controlers import eventlog
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark do histórico de movimentações.')
+    parser.add_argument('--events', type=int, default=2000000)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--batch', type=int, default=1000, help='eventos por gravação')
+    parser.add_argument('--no-numpy', action='store_true', help='mede a reconstrução sem o numpy')
+    args = parser.parse_args()
+    if args.no_numpy:
+        eventlog.np = None
+
+    directory = tempfile.mkdtemp(prefix='inventory-events-')
+    try:
+        path = os.path.join(directory, 'data.events')
+        clock = [1_700_000_000.0]
+        log = eventlog.EventLog(path, snapshot_every=args.events // 2, clock=lambda: clock[0])
+        rng = random.Random(42)
+        skus = [('shampoo', 'masculino', f'Produto {index:07d}') for index in range(args.products)]
+        start = time.perf_counter()
+        written = 0
+        while written < args.events:
+            size = min(args.batch, args.events - written)
+            log.record(eventlog.SALE, [(*rng.choice(skus), rng.randrange(1000), 9.9) for _ in range(size)])
+            written += size
+            clock[0] += 1
+        record_seconds = time.perf_counter() - start
+        middle = clock[0] - (args.events // args.batch) // 4
+        log.close()
+
+        def timed(function):
+            start = time.perf_counter()
+            result = function()
+            return result, time.perf_counter() - start
+
+        snapshots = [name for name in os.listdir(directory) if name.endswith('.snap')]
+        _, open_seconds = timed(lambda: eventlog.EventLog(path).close())
+        for name in snapshots:
+            os.remove(os.path.join(directory, name))
+        reopened = eventlog.EventLog(path)
+        state, full_seconds = timed(reopened.replay)
+        _, until_seconds = timed(lambda: reopened.replay(middle))
+        reopened.close()
+
+        print(json.dumps({
+            'events': args.events,
+            'products': args.products,
+            'numpy': eventlog.np is not None,
+            'file_mb': round(os.path.getsize(path) / 2 ** 20, 1),
+            'record_events_per_sec': round(args.events / record_seconds),
+            'replay_full_events_per_sec': round(args.events / full_seconds),
+            'replay_full_seconds': round(full_seconds, 3),
+            'open_from_snapshot_seconds': round(open_seconds, 3),
+            'replay_until_middle_seconds': round(until_seconds, 3),
+            'products_rebuilt': len(state),
+        }, indent=2))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
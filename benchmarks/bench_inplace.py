@@ -0,0 +1,100 @@
+"""
+Benchmark das alterações de quantidade no arquivo binário (BinaryStorage).
+
+Para cada tamanho de catálogo, grava um catálogo sintético (generate_catalog.py)
+no formato binário e mede increase_quantity/decrease_quantity do ProductController
+em produtos aleatórios:
+
+- in_place: cada alteração escreve o registro do produto no próprio arquivo
+  (mais o log de refazer); o custo deve ficar igual em todos os tamanhos;
+- in_place_sync: o mesmo, com fsync do log a cada alteração;
+- rewrite: o modo padrão, que regrava o arquivo inteiro (limitado por --max-seconds).
+
+O resultado é um JSON com operações por segundo e latência p50/p99 (ms).
+
+Uso (na raiz do projeto):
+    python benchmarks/bench_inplace.py --sizes 1000,10000,100000,1000000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_catalog import generate_catalog, LAYOUT
+from services.products.controlers.binarystorage import BinaryStorage, write_binary
+from services.products.controlers.controller import Controller
+from services.products.controlers.productcontroller import ProductController
+
+
+def measure(function, iterations: int, max_seconds: float) -> dict:
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    for index in range(iterations):
+        start = time.perf_counter_ns()
+        function(index)
+        samples.append(time.perf_counter_ns() - start)
+        if time.perf_counter() > deadline:
+            break
+    samples.sort()
+    return {
+        'calls': len(samples),
+        'ops_per_sec': round(len(samples) / (sum(samples) / 1e9), 1),
+        'p50_ms': round(samples[len(samples) // 2] / 1e6, 4),
+        'p99_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1e6, 4),
+    }
+
+
+def run_size(size: int, iterations: int, max_seconds: float) -> dict:
+    workdir = tempfile.mkdtemp(prefix='bench_inplace_')
+    try:
+        path = os.path.join(workdir, 'data.bin')
+        data = generate_catalog(size)
+        product, gender = LAYOUT[0]
+        names = list(data[product][gender])
+        write_binary(path, data)
+        del data
+        rng = random.Random(7)
+        picks = [rng.choice(names) for _ in range(iterations)]
+
+        def update(i):
+            if i % 2:
+                controller.decrease_quantity(picks[i], 1)
+            else:
+                controller.increase_quantity(picks[i], 1)
+
+        results = {'size': size, 'file_mb': round(os.path.getsize(path) / 2 ** 20, 2)}
+        for mode, options in (('in_place', {'in_place': True}), ('in_place_sync', {'in_place': True, 'sync': True}),
+                              ('rewrite', {})):
+            storage = BinaryStorage(path, **options)
+            Controller.use_storage(storage)
+            controller = ProductController(gender, product)
+            controller.show_price(names[0])  # Mapeia o arquivo antes de medir
+            results[mode] = measure(update, iterations, max_seconds)
+            storage.compact()
+            storage.close()
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark das alterações no arquivo binário.')
+    parser.add_argument('--sizes', default='1000,10000,100000,1000000')
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--max-seconds', type=float, default=5.0, help='tempo máximo de cada medição')
+    args = parser.parse_args()
+    runs = [run_size(int(size), args.iterations, args.max_seconds) for size in args.sizes.split(',')]
+    print(json.dumps({'runs': runs}, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+Benchmark da partida e das ações do modo interativo (main.py / Screen).
+
+Compara as duas formas de rodar o menu principal, em um catálogo sintético
+(generate_catalog.py) gravado em um diretório temporário:
+
+- rebuild: como o main.py antigo, com as importações curinga de todos os módulos
+  e uma Screen nova a cada volta ao menu;
+- session: como o main.py atual, com uma única Screen (a sessão) criada e
+  aquecida na partida.
+
+Mede, para cada forma:
+- cold_start: um processo novo até o primeiro menu (importações, leitura do
+  catálogo e avisos de produtos em falta e de reposição), em ms;
+- menu: cada volta ao menu principal (avisos de falta e de reposição), sem as
+  pausas e a limpeza de tela, com latência p50/p99 (ms);
+- menu_restock: a volta ao menu seguida de uma entrada de estoque (a gravação
+  do catálogo costuma dominar o tempo).
+
+Uso (na raiz do projeto):
+    python benchmarks/bench_session.py --sizes 1000,100000
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_catalog import write_catalog, LAYOUT
+
+# Código executado em cada processo novo; imprime os tempos em JSON
+CHILD = r'''
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+if {mode!r} == 'rebuild':
+    from services.products.shampoo import *
+    from screen import *
+    from batch import *
+else:
+    from services.products.controlers.controller import Controller
+    from screen import Screen
+imported = time.perf_counter()
+Controller.enable_sales()
+screen = Screen()
+if {mode!r} == 'session':
+    screen.warm_up()
+screen._check_zero_products() + screen._check_reorder_products()
+ready = time.perf_counter()
+print(json.dumps({{'import_ms': (imported - start) * 1000, 'first_menu_ms': (ready - start) * 1000}}))
+'''
+
+
+def measure(function, iterations: int, max_seconds: float) -> dict:
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    for index in range(iterations):
+        start = time.perf_counter_ns()
+        function(index)
+        samples.append(time.perf_counter_ns() - start)
+        if time.perf_counter() > deadline:
+            break
+    samples.sort()
+    return {
+        'calls': len(samples),
+        'ops_per_sec': round(len(samples) / (sum(samples) / 1e9), 1),
+        'p50_ms': round(samples[len(samples) // 2] / 1e6, 4),
+        'p99_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1e6, 4),
+    }
+
+
+def cold_start(workdir: str, mode: str, runs: int) -> dict:
+    """
+    Mede a partida em processos novos e retorna as medianas (ms).
+    """
+    results = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, '-c', CHILD.format(root=ROOT, mode=mode)], cwd=workdir,
+                                   capture_output=True, text=True, check=True)
+        wall = (time.perf_counter() - start) * 1000
+        results.append({**json.loads(completed.stdout.strip().splitlines()[-1]), 'process_ms': wall})
+    return {key: round(statistics.median(result[key] for result in results), 2) for key in results[0]}
+
+
+def per_action(mode: str, names: list, iterations: int, max_seconds: float) -> dict:
+    """
+    Mede a volta ao menu principal, sozinha e seguida de uma entrada de estoque.
+    """
+    from screen import Screen
+    product, gender = LAYOUT[0]
+    session = Screen()
+    session.warm_up()
+
+    def menu(i):
+        screen = Screen() if mode == 'rebuild' else session
+        screen._check_zero_products() + screen._check_reorder_products()
+        return screen
+
+    def menu_restock(i):
+        screen = menu(i)
+        screen._save_product = product
+        screen._action(gender).increase_quantity(names[i % len(names)], 1)
+    return {'menu': measure(menu, iterations * 10, max_seconds),
+            'menu_restock': measure(menu_restock, iterations, max_seconds)}
+
+
+def run_size(size: int, runs: int, iterations: int, max_seconds: float) -> dict:
+    from services.products.controlers.controller import Controller
+    from services.products.controlers.storage import JsonStorage
+
+    workdir = tempfile.mkdtemp(prefix='bench_session_')
+    cwd = os.getcwd()
+    try:
+        data = write_catalog(size, os.path.join(workdir, 'data.json'))
+        product, gender = LAYOUT[0]
+        names = list(data[product][gender])
+        del data
+        result = {'size': size}
+        for mode in ('rebuild', 'session'):
+            result[mode] = {'cold_start': cold_start(workdir, mode, runs)}
+        os.chdir(workdir)
+        Controller.use_storage(JsonStorage('data.json'))
+        Controller.enable_sales()
+        for mode in ('rebuild', 'session'):
+            result[mode].update(per_action(mode, names, iterations, max_seconds))
+        Controller.disable_sales()
+        return result
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark da partida e das ações do modo interativo.')
+    parser.add_argument('--sizes', default='1000,100000', help='tamanhos de catálogo separados por vírgula')
+    parser.add_argument('--runs', type=int, default=5, help='processos medidos na partida')
+    parser.add_argument('--iterations', type=int, default=200, help='máximo de ações medidas')
+    parser.add_argument('--max-seconds', type=float, default=10.0, help='tempo máximo por forma')
+    args = parser.parse_args()
+
+    report = [run_size(int(size), args.runs, args.iterations, args.max_seconds) for size in args.sizes.split(',')]
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Gerador de catálogos sintéticos no formato de data.json.
+
+Distribui os produtos entre os mesmos tipos e gêneros do catálogo real
+(shampoo e perfume em masculino/feminino/infantil, batom em unisex), com
+quantidades e preços aleatórios (semente fixa, então o resultado é repetível).
+Cerca de 5% dos produtos ficam com quantidade zero.
+
+Uso (na raiz do projeto):
+    python benchmarks/generate_catalog.py 100000 catalog.json
+"""
+import json
+import random
+import sys
+
+LAYOUT = (
+    ('shampoo', 'masculino'), ('shampoo', 'feminino'), ('shampoo', 'infantil'),
+    ('perfume', 'masculino'), ('perfume', 'feminino'), ('perfume', 'infantil'),
+    ('batom', 'unisex'),
+)
+
+
+def generate_catalog(size: int, seed: int = 42) -> dict:
+    """
+    Gera um catálogo com `size` produtos.
+
+    Parâmetros:
+    - size (int): A quantidade total de produtos.
+    - seed (int): A semente do gerador aleatório.
+
+    Retorna:
+    - dict: O catálogo no formato data[produto][gênero][tipo].
+    """
+    rng = random.Random(seed)
+    data = {}
+    for index in range(size):
+        product, gender = LAYOUT[index % len(LAYOUT)]
+        name = f'{product.capitalize()} {gender} {index:07d}'
+        quantity = 0 if rng.random() < 0.05 else rng.randint(1, 500)
+        price = round(rng.uniform(5, 500), 2)
+        data.setdefault(product, {}).setdefault(gender, {})[name] = {'quantidade': quantity, 'preco': price}
+    return data
+
+
+def write_catalog(size: int, path: str, seed: int = 42) -> dict:
+    """
+    Gera um catálogo e grava no caminho informado, no mesmo formato de data.json.
+    """
+    data = generate_catalog(size, seed)
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=4)
+    return data
+
+
+if __name__ == '__main__':
+    write_catalog(int(sys.argv[1]), sys.argv[2] if len(sys.argv) > 2 else 'catalog.json')
@@ -0,0 +1,216 @@
+"""
+Teste de carga do servidor HTTP do estoque (server.py).
+
+Abre várias conexões keep-alive ao mesmo tempo e envia uma mistura de leituras
+(consulta de produto, busca, produtos em falta) e alterações (reposição e venda).
+Ao final imprime um JSON com requisições por segundo e latência p50/p95/p99/máx
+(ms), no total e por tipo de requisição.
+
+Sem --url, inicia o servidor em um subprocesso sobre uma cópia temporária de um
+catálogo sintético (generate_catalog.py), então pode rodar sem nada configurado.
+
+Uso (na raiz do projeto):
+    python benchmarks/load_test.py --connections 50 --seconds 10
+    python benchmarks/load_test.py --url http://127.0.0.1:8080 --write-ratio 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_catalog import write_catalog
+
+
+def _percentile(values: list, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def _stats(samples: list, seconds: float) -> dict:
+    samples = sorted(samples)
+    return {
+        'requests': len(samples),
+        'requests_per_sec': round(len(samples) / seconds, 1),
+        'p50_ms': round(_percentile(samples, 0.50) * 1000, 3),
+        'p95_ms': round(_percentile(samples, 0.95) * 1000, 3),
+        'p99_ms': round(_percentile(samples, 0.99) * 1000, 3),
+        'max_ms': round(samples[-1] * 1000, 3) if samples else 0.0,
+    }
+
+
+async def _request(reader, writer, host: str, method: str, path: str, body: dict = None) -> tuple:
+    payload = json.dumps(body).encode('utf-8') if body is not None else b''
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: {host}\r\n'
+                 f'Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n'.encode('latin-1') + payload)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def _client(host: str, port: int, products: list, write_ratio: float, deadline: float,
+                  samples: dict, errors: dict, seed: int) -> None:
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            product, gender, name = rng.choice(products)
+            item = {'produto': product, 'genero': gender, 'nome': name, 'quantidade': 1}
+            if rng.random() < write_ratio:
+                kind, method, path, body = rng.choice((
+                    ('restock', 'POST', '/restock', item),
+                    ('sell', 'POST', '/sell', item),
+                ))
+            else:
+                kind, method, path, body = rng.choice((
+                    ('lookup', 'GET', f'/products/{quote(product)}/{quote(gender)}/{quote(name)}', None),
+                    ('lookup', 'GET', f'/products/{quote(product)}/{quote(gender)}/{quote(name)}', None),
+                    ('search', 'GET', f'/search?q={quote(name.split()[0][:4])}&limit=5', None),
+                    ('out-of-stock', 'GET', '/out-of-stock', None),
+                ))
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, host, method, path, body)
+            samples.setdefault(kind, []).append(time.perf_counter() - start)
+            if status != 200 and not (kind == 'sell' and status == 409):  # Venda sem estoque é esperada
+                errors[status] = errors.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(url: str, products: list, connections: int, seconds: float, write_ratio: float) -> dict:
+    address = urlsplit(url)
+    samples = {}
+    errors = {}
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(address.hostname, address.port, products, write_ratio, deadline,
+                                   samples, errors, seed) for seed in range(connections)))
+    elapsed = time.perf_counter() - start
+    result = {'connections': connections, 'seconds': round(elapsed, 2), 'write_ratio': write_ratio,
+              'total': _stats([sample for values in samples.values() for sample in values], elapsed),
+              'by_kind': {kind: _stats(values, elapsed) for kind, values in sorted(samples.items())},
+              'errors': errors}
+    return result
+
+
+def _catalog_products(path: str, limit: int = 1000) -> list:
+    with open(path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    products = []
+    for product, genders in data.items():
+        if product.startswith('_'):
+            continue
+        for gender, names in genders.items():
+            products.extend((product, gender, name) for name in names)
+    random.Random(0).shuffle(products)
+    return products[:limit]
+
+
+def _wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('O servidor não iniciou a tempo')
+
+
+async def _products_from_server(url: str) -> list:
+    """
+    Obtém alguns produtos de um servidor já em execução, pela busca.
+    """
+    address = urlsplit(url)
+    reader, writer = await asyncio.open_connection(address.hostname, address.port)
+    try:
+        products = []
+        for query in ('shampoo', 'perfume', 'batom', 'a', 'e', 'o'):
+            _, result = await _request(reader, writer, address.hostname, 'GET', f'/search?q={query}&limit=200')
+            products.extend((item['produto'], item['genero'], item['nome']) for item in result['produtos'])
+        if not products:
+            raise RuntimeError('Nenhum produto encontrado no servidor')
+        return sorted(set(products))
+    finally:
+        writer.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Teste de carga do servidor HTTP do estoque.')
+    parser.add_argument('--url', help='servidor já em execução (padrão: inicia um com catálogo sintético)')
+    parser.add_argument('--size', type=int, default=10000, help='produtos do catálogo sintético')
+    parser.add_argument('--storage', choices=('json', 'journal', 'sqlite', 'binary'), default='json')
+    parser.add_argument('--connections', type=int, default=20)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--write-ratio', type=float, default=0.2, help='fração de requisições de alteração')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--output', help='arquivo JSON de saída (padrão: saída padrão)')
+    args = parser.parse_args()
+
+    directory = None
+    server = None
+    try:
+        if args.url:
+            url = args.url
+            products = None
+        else:
+            directory = tempfile.mkdtemp(prefix='inventory-load-')
+            catalog = os.path.join(directory, 'data.json')
+            write_catalog(args.size, catalog)
+            data = catalog
+            if args.storage == 'sqlite':
+                sys.path.insert(0, ROOT)
+                from services.products.controlers.sqlitestorage import migrate_json_to_sqlite
+                data = os.path.join(directory, 'data.db')
+                migrate_json_to_sqlite(catalog, data)
+            elif args.storage == 'binary':
+                sys.path.insert(0, ROOT)
+                from services.products.controlers.binarystorage import convert_json_to_binary
+                data = os.path.join(directory, 'data.bin')
+                convert_json_to_binary(catalog, data)
+            server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'server.py'), '--port', str(args.port),
+                                       '--storage', args.storage, '--data', data], cwd=directory,
+                                      stdout=subprocess.DEVNULL)
+            _wait_for_port(args.port)
+            url = f'http://127.0.0.1:{args.port}'
+            products = _catalog_products(catalog)
+        if products is None:
+            products = asyncio.run(_products_from_server(url))
+        result = asyncio.run(run(url, products, args.connections, args.seconds, args.write_ratio))
+        if not args.url:
+            result.update({'size': args.size, 'storage': args.storage})
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+    return 1 if result['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Teste de estresse de concorrência entre processos no mesmo catálogo JSON.
+
+Vários processos vendem o mesmo produto ao mesmo tempo (decrease_quantity) e,
+no final, a quantidade em estoque precisa ter diminuído exatamente o total
+vendido: nenhuma baixa pode ser perdida. Também mostra por quanto tempo cada
+processo manteve o bloqueio do catálogo.
+
+Uso (na raiz do projeto):
+    python benchmarks/stress_concurrency.py --processes 8 --sales 200 [--journal]
+
+Sai com código 1 se alguma baixa for perdida.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.products.controlers.controller import Controller
+from services.products.controlers.storage import JsonStorage
+from services.products.shampoo import Shampoo
+
+PRODUCT = 'Men shampoo'
+
+
+def _worker(path: str, journaled: bool, sales: int, results) -> None:
+    Controller.use_storage(JsonStorage(path, journaled=journaled, compact_every=50))
+    controller = Shampoo('masculino')
+    for _ in range(sales):
+        controller.decrease_quantity(PRODUCT, 1)
+    results.put(list(Controller.storage.lock.hold_times))
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--sales', type=int, default=200, help='vendas por processo')
+    parser.add_argument('--journal', action='store_true', help='usa o modo com log')
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    workdir = tempfile.mkdtemp(prefix='stress_')
+    path = os.path.join(workdir, 'data.json')
+    shutil.copy(os.path.join(root, 'data.json'), path)
+
+    total_sales = args.processes * args.sales
+    storage = JsonStorage(path)
+    data = storage.load()
+    data['shampoo']['masculino'][PRODUCT]['quantidade'] = total_sales + 10  # Nunca chega a zero
+    storage.save(data)
+    initial = total_sales + 10
+
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_worker, args=(path, args.journal, args.sales, results))
+               for _ in range(args.processes)]
+    for worker in workers:
+        worker.start()
+    hold_times = []
+    for _ in workers:
+        hold_times.extend(results.get())
+    for worker in workers:
+        worker.join()
+
+    storage = JsonStorage(path, journaled=args.journal)
+    final = storage.get('shampoo', 'masculino', PRODUCT)['quantidade']
+    lost = final - (initial - total_sales)
+    report = {
+        'processes': args.processes,
+        'sales': total_sales,
+        'journal': args.journal,
+        'initial': initial,
+        'final': final,
+        'lost_updates': lost,
+        'lock_hold_ms': {
+            'p50': round(_percentile(hold_times, 0.50) * 1000, 3),
+            'p99': round(_percentile(hold_times, 0.99) * 1000, 3),
+            'max': round(max(hold_times) * 1000, 3),
+        },
+    }
+    print(json.dumps(report, indent=2))
+    shutil.rmtree(workdir)
+    return 1 if lost else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
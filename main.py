@@ -1,6 +1,34 @@
-from services.products.shampoo import *
-from screen import *
+import sys
 
-while True:
+def main(argv: list = None) -> int:
+    """
+    Ponto de entrada do sistema de estoque.
+
+    Só importa o que o modo escolhido usa: o modo em lote não carrega as telas, e
+    o modo interativo não carrega o modo em lote.
+
+    Parâmetros:
+    - argv (list): Os argumentos da linha de comando (padrão: sys.argv[1:]).
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == '--batch':
+        # Modo sem interação: python main.py --batch [roteiro.jsonl] (sem arquivo, lê da entrada padrão)
+        from batch import run_batch
+        return run_batch(argv[1] if len(argv) > 1 else '-')
+
+    from services.products.controlers.controller import Controller
+    from screen import Screen
+
+    # Registra as vendas finalizadas no caixa (data.sales), base dos avisos de reposição
+    Controller.enable_sales()
+
+    # Uma única sessão para o programa inteiro: o catálogo, os controladores, os
+    # índices e o carrinho continuam em memória de uma ação para a outra
     screen = Screen()
-    screen.initial_menu()
\ No newline at end of file
+    screen.warm_up()
+    while True:
+        screen.initial_menu()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,7 @@
 from services import cart
-from services.products import shampoo, lipstick, perfume
+from services.products.controlers.controller import Controller
+from services.products.controlers.categoryregistry import CategoryRegistry
+from services.products.controlers.productsexceptions import InsufficientStock, InvalidProduct
 from screenexceptions import *
 from view import *
 import time
@@ -14,172 +16,210 @@ class Screen():
 
     Métodos:
     - __init__(self): Inicializa a classe Screen.
+    - warm_up(self): Carrega o catálogo e monta os índices antes do primeiro menu.
     - initial_menu(self): Exibe o menu inicial e gerencia a escolha do usuário.
     - _product_menu(self): Exibe o menu de seleção de produtos.
-    - _genere_menu(self, product: int): Exibe o menu de seleção de gênero do produto.
-    - _print_products(self, genere: str) -> list: Exibe a lista de produtos de um gênero específico.
+    - _genere_menu(self, product: str): Exibe o menu de seleção de gênero do produto.
+    - _action(self, genere: str) -> ProductController: O controlador do produto escolhido e do gênero.
+    - _choose_from(self, options: list) -> int: Exibe uma lista numerada e coleta a escolha do usuário.
+    - _print_products(self, genere: str) -> str: Busca ou lista os produtos de um gênero e coleta a escolha.
+    - _find_product(self) -> tuple: Busca um produto pelo nome em todo o catálogo.
     - _print_products_details(self, genere: str) -> list: Exibe detalhes de todos os produtos de um gênero específico.
-    - _increase_product(self, genere: str): Aumenta a quantidade de um produto.
-    - _decrease_stock(self, genere): Diminui a quantidade de um produto.
+    - _increase_product(self, genere: str, product: str = None): Aumenta a quantidade de um produto.
+    - _decrease_stock(self, genere, product: str = None): Diminui a quantidade de um produto.
     - _create_product(self, genere: str): Adiciona um novo produto.
-    - _change_product_price(self, genere: str): Altera o preço de um produto.
-    - _handle_crud(self, genere: str): Gerencia operações de CRUD com base na escolha inicial do usuário.
-    - _handle_unisex(self): Lida com operações em produtos unissex.
-    - _handle_male(self): Lida com operações em produtos masculinos.
-    - _handle_female(self): Lida com operações em produtos femininos.
-    - _handle_child(self): Lida com operações em produtos infantis.
-    - _handle_choice(self, genere: int): Chama a função apropriada com base na escolha do usuário.
+    - _change_product_price(self, genere: str, product: str = None): Altera o preço de um produto.
+    - _handle_crud(self, genere: str, product: str = None): Gerencia operações de CRUD com base na escolha inicial do usuário.
     - _check_zero_products(self) -> list: Verifica quais produtos estão com quantidade zero.
+    - _check_reorder_products(self) -> list: Verifica quais produtos devem acabar antes de uma reposição.
     - _handle_cart(self): Gerencia o processo de adição de produtos ao carrinho.
-    - _add_products_cart(self, genere: str): Adiciona um produto ao carrinho.
+    - _add_products_cart(self, genere: str, product: str = None): Adiciona um produto ao carrinho.
     """
 
     def __init__(self) -> None:
         """
         Inicializa a classe Screen, definindo produtos, variáveis de escolha, e o carrinho.
 
-        Este construtor configura as classes de produtos, inicializa as variáveis de 
-        escolha do usuário, configura o mapeamento de ações baseadas nas escolhas e 
-        inicializa o objeto do carrinho e a lista de itens do carrinho.
+        Este construtor monta o registro de tipos e gêneros a partir do catálogo,
+        inicializa as variáveis de escolha do usuário e inicializa o objeto do
+        carrinho e a lista de itens do carrinho.
         """
-        # Inicializa as classes de produtos
-        self._shampoo = shampoo.Shampoo
-        self._perfume = perfume.Perfume
-        self._lipstick = lipstick.Lipstick
+        # Os tipos de produto e gêneros vêm do catálogo; os controladores são criados sob demanda
+        self._registry = CategoryRegistry()
 
         # Inicializa variáveis de escolha do usuário
         self._initial_choice: int
         self._product_choice: int
         self._genere_choice: int
-        self._save_product: object
+        self._save_product: str  # O tipo de produto escolhido (shampoo, perfume, batom)
 
-        # Mapeia escolhas do usuário para os métodos correspondentes
-        self._choice_actions = {
-            0: self._handle_unisex,
-            1: self._handle_male,
-            2: self._handle_female,
-            3: self._handle_child
-        }
-
-        # Inicializa o carrinho de compras
+        # Inicializa o carrinho de compras (cada item guarda também o tipo e o gênero do produto)
         self._cart = cart.Cart()
 
-         # Lista para armazenar itens do carrinho (produto e gênero) para identificação de filtros pre definidos e localizar o produto
-        self._list_cart = []  # Exemplo: [{'product': <produto>, 'genere': <gênero>}]
-
         self._view = View()
 
+    def warm_up(self) -> None:
+        """
+        Carrega o catálogo, os tipos e gêneros e o índice de estoque antes do primeiro menu.
+
+        A Screen é a sessão do programa: criada uma única vez (ver main.py), ela
+        mantém o catálogo, os controladores, os índices e o carrinho entre as ações,
+        então cada volta ao menu principal só consulta o que já está em memória.
+        """
+        self._registry.out_of_stock()  # Lê os tipos e gêneros e monta o índice de estoque
 
     # Método para exibir o menu de produtos e capturar a escolha do usuário
     def _product_menu(self) -> None:
-        itens = ('Shampoo', 'Perfume', 'Batom')
         """
-        Exibe o menu de seleção de produtos e gerencia a escolha do usuário.
+        Exibe o menu de seleção de produtos (os tipos do catálogo) e gerencia a escolha do usuário.
         """
+        itens = self._registry.categories()
 
         while True:
             try:
                 self._view.display_header('\033[34mPRODUTO\033[m')
                 c = 1
                 for item in itens:
-                    print(f'''\033[32m{c} - \033[34m{item}\033[m''')
+                    print(f'''\033[32m{c} - \033[34m{item.capitalize()}\033[m''')
                     c += 1
                 print(self._view.draw_line())
                 product_choice = int(input("\033[33mDigite sua opção: \033[m"))
                 os.system("cls")
 
                 # Verifica se a escolha é válida
-                if product_choice not in [1, 2, 3]:
+                if product_choice < 1 or product_choice > len(itens):
                     raise InvalidChoice("\033[31mOpção inválida! Tente novamente!\033[m")
 
                 # Chama o menu de gênero com base na escolha do produto
-                self._genere_menu(product_choice)
+                self._genere_menu(itens[product_choice - 1])
 
                 return
             except (InvalidChoice, ValueError):
                 print("\033[31mOpção inválida! Tente novamente!\033[m")
 
     # Método para exibir o menu de gêneros e capturar a escolha do usuário
-    def _genere_menu(self, product: int) -> None:
-        opcoes = ('Masculino', 'Feminino', 'Infantil')
+    def _genere_menu(self, product: str) -> None:
         """
         Exibe o menu de seleção de gênero do produto e gerencia a escolha do usuário.
+
+        Os gêneros são os do tipo de produto no catálogo; se houver só um (como o
+        batom, unissex), ele é escolhido sem exibir o menu.
         
         Parâmetros:
         - product: O tipo de produto escolhido pelo usuário.
         """
+        opcoes = self._registry.genders(product)
+        self._save_product = product
 
-        while True:
-            try:
-                if product == 1:
-                    os.system("cls")
-                    self._view.display_header('\033[34mSELECIONE O GENÊRO\033[m')
-                    c = 1
-                    for item in opcoes:
-                        print(f'\033[32m{c} - \033[34m{item}\033[m')
-                        c += 1
-                    self._save_product = self._shampoo
-                    print(self._view.draw_line())
-                    genere_choice = int(input("\033[33mDigite sua opção: \033[m"))
-                    os.system("cls")
-                    if genere_choice not in [1,2,3]: # array com opções válidas
-                        raise InvalidChoice("\033[31mOpção inválida! Tente novamente!\033[m")
-
-                elif product == 2:
-                    os.system("cls")
-                    self._view.display_header('\033[34mSELECIONE A OPÇÃO\033[m')
-                    c = 1
-                    for item in opcoes:
-                        print(f'\033[32m{c} - \033[34m{item}\033[m')
-                        c += 1
-                    self._save_product = self._perfume
-                    print(self._view.draw_line())
-                    genere_choice = int(input("\033[33mDigite sua opção: \033[m"))
-                    os.system("cls")
-                    if genere_choice not in [1,2,3]: # array com opções válidas
-                        raise InvalidChoice("\033[31mOpção inválida! Tente novamente!\033[m")
+        if len(opcoes) == 1:
+            self._handle_crud(opcoes[0])
+            return
+        try:
+            os.system("cls")
+            self._view.display_header('\033[34mSELECIONE O GENÊRO\033[m')
+            c = 1
+            for item in opcoes:
+                print(f'\033[32m{c} - \033[34m{item.capitalize()}\033[m')
+                c += 1
+            print(self._view.draw_line())
+            genere_choice = int(input("\033[33mDigite sua opção: \033[m"))
+            os.system("cls")
+            if genere_choice < 1 or genere_choice > len(opcoes):
+                raise InvalidChoice("\033[31mOpção inválida! Tente novamente!\033[m")
+        except (InvalidChoice, ValueError):
+            raise InvalidChoice("Opção inválida! Tente novamente!")
 
-                elif product == 3:
-                    self._save_product = self._lipstick
-                    genere_choice = 0
+        # Processa a escolha do gênero
+        self._handle_crud(opcoes[genere_choice - 1])
 
-                # Processa a escolha do gênero
-                self._handle_choice(genere_choice)
+    # Método para obter o controlador do produto escolhido
+    def _action(self, genere: str):
+        """
+        Retorna o controlador (ProductController) do produto escolhido e do gênero.
 
-                return
-            except (InvalidChoice, ValueError):
-                raise InvalidChoice("Opção inválida! Tente novamente!")
+        Lança:
+        - InvalidProduct se o tipo ou o gênero não existirem no catálogo.
+        """
+        return self._registry.controller(self._save_product, genere)
 
-    # Método para exibir os produtos e capturar a escolha do usuário
-    def _print_products(self, genere: str) -> list:
+    # Método para exibir uma lista numerada e capturar a escolha do usuário
+    def _choose_from(self, options: list) -> int:
         """
-        Exibe a lista de produtos de um gênero específico e coleta a escolha do usuário.
-        
+        Exibe uma lista numerada e coleta a escolha do usuário.
+
         Parâmetros:
-        - genere: O gênero dos produtos a serem exibidos.
-        
+        - options: Os textos a serem exibidos.
+
         Retorna:
-        - Uma lista com os produtos disponíveis e a escolha do usuário.
-        
+        - A posição (a partir de 0) da opção escolhida.
+
         Lança:
         - InvalidChoice se a escolha for inválida.
         """
-        action = self._save_product(genere)
-        list_products = action.all_products()
-        index = 0
-        self._view.display_header("\033[34mEscolha um produto\033[m")
-        for product in list_products:
-            index += 1
-            print(f'''\033[32m{index} - \033[34m{product}\033[m''')
+        for index, option in enumerate(options, start=1):
+            print(f'''\033[32m{index} - \033[34m{option}\033[m''')
         try:
             print(self._view.draw_line())
             choice = int(input("\033[33mDigite aqui sua opção: \033[m"))
-            if choice <= index and choice > 0:
-                return list_products, choice - 1  # retornando a lista e a escolha -1 (array comeca em 0)
+            if choice <= len(options) and choice > 0:
+                return choice - 1  # array comeca em 0
             raise InvalidChoice("\033[31mOpção inválida! Tente novamente!\033[m")
         except (InvalidChoice, ValueError):
             raise InvalidChoice("\033[31mOpção inválida! Tente novamente!\033[m")
 
+    # Método para buscar ou listar os produtos e capturar a escolha do usuário
+    def _print_products(self, genere: str) -> str:
+        """
+        Busca ou lista os produtos de um gênero específico e coleta a escolha do usuário.
+
+        O usuário digita parte do nome (a busca aceita prefixos e pequenos erros de
+        digitação) e escolhe entre os resultados; se não digitar nada, todos os
+        produtos do gênero são listados.
+
+        Parâmetros:
+        - genere: O gênero dos produtos a serem exibidos.
+
+        Retorna:
+        - O nome do produto escolhido.
+
+        Lança:
+        - InvalidChoice se nenhum produto for encontrado ou a escolha for inválida.
+        """
+        action = self._action(genere)
+        self._view.display_header("\033[34mEscolha um produto\033[m")
+        text = input("\033[33mDigite parte do nome do produto (ou Enter para ver todos): \033[m").strip()
+        list_products = action.find_products(text) if text else action.all_products()
+        if not list_products:
+            raise InvalidChoice("\033[31mNenhum produto encontrado!\033[m")
+        return list_products[self._choose_from(list_products)]
+
+    # Método para buscar um produto pelo nome em todo o catálogo
+    def _find_product(self) -> tuple:
+        """
+        Busca um produto pelo nome em todos os tipos e gêneros.
+
+        Se o usuário não digitar nada, retorna None e a escolha segue pelos menus de
+        produto e gênero. Caso contrário, o tipo do produto escolhido passa a ser o
+        produto da tela (self._save_product).
+
+        Retorna:
+        - Uma tupla (gênero, nome do produto), ou None.
+
+        Lança:
+        - InvalidChoice se nenhum produto for encontrado ou a escolha for inválida.
+        """
+        text = input("\033[33mBuscar produto pelo nome (ou Enter para escolher pelos menus): \033[m").strip()
+        if not text:
+            return None
+        found = self._registry.search(text)
+        if not found:
+            raise InvalidChoice("\033[31mNenhum produto encontrado!\033[m")
+        self._view.display_header("\033[34mEscolha um produto\033[m")
+        product, genere, name = found[self._choose_from([f'{name} ({product} {genere})' for product, genere, name in found])]
+        self._save_product = product
+        os.system("cls")
+        return genere, name
+
     # Método para exibir os detalhes dos produtos
     def _print_products_details(self, genere: str) -> list:
         """
@@ -192,100 +232,100 @@ class Screen():
         - Uma lista com detalhes dos produtos.
         """
 
-        action = self._save_product(genere)
+        action = self._action(genere)
         list_products = action.all_products_details()
         return list_products
 
     # Método para aumentar a quantidade de um produto no estoque
-    def _increase_product(self, genere: str):
+    def _increase_product(self, genere: str, product: str = None):
         """
         Aumenta a quantidade de um produto.
         
         Parâmetros:
         - genere: O gênero do produto.
+        - product: O nome do produto, se já foi escolhido pela busca; se omitido, é escolhido na lista.
         """
         
-        action = self._save_product(genere)
-        products, choice = self._print_products(genere)
-        products_details = self._print_products_details(genere)
+        action = self._action(genere)
+        product = product or self._print_products(genere)
         os.system("cls")
-        self._view.display_header(f"\033[34mDetalhes do produto {products[choice]}\033[m")
-        print(products_details[choice])
+        self._view.display_header(f"\033[34mDetalhes do produto {product}\033[m")
+        print(action.product_details(product))
         while True:
             try:
                 print(self._view.draw_line())
                 add_quantity = int(input("\033[33mDigite a quantidade que deseja adicionar: \033[m"))
-                validate = action.increase_quantity(products[choice], add_quantity)
+                validate = action.increase_quantity(product, add_quantity)
                 if validate:
                     print("\033[32mQuantidade adicionada!\033[m")
-                    products_details = self._print_products_details(genere)
-                    self._view.display_header(f"\033[34mNovo total: {products_details[choice]}\033[m")
+                    self._view.display_header(f"\033[34mNovo total: {action.product_details(product)}\033[m")
                     sleep(2)
                     os.system("cls")
                     return
             except:
                 raise ValueError("Valor inválido, digite um valor válido!")
 
-    def _add_products_cart(self, genere: str) -> None:
+    def _add_products_cart(self, genere: str, product: str = None) -> None:
         """
         Adiciona um produto ao carrinho de compras com a quantidade especificada.
 
         Este método permite ao usuário selecionar um produto de um gênero específico,
         visualizar seus detalhes e adicionar uma quantidade desejada ao carrinho. 
-        Ele também armazena informações necessárias para atualizar o estoque 
-        após a confirmação da compra.
+        O item guarda o tipo e o gênero do produto, necessários para atualizar
+        o estoque após a confirmação da compra, e reserva as unidades até a compra.
 
         Parâmetros:
         - genere: O gênero do produto a ser adicionado ao carrinho.
+        - product: O nome do produto, se já foi escolhido pela busca; se omitido, é escolhido na lista.
 
         Lança:
         - ValueError: Se a quantidade fornecida não for válida.
         """
-        action = self._save_product(genere)  # Instancia o objeto do produto com base no gênero
-        products, choice = self._print_products(genere)  # Exibe os produtos e obtém a escolha do usuário
-        products_details = self._print_products_details(genere)  # Obtém os detalhes dos produtos
+        action = self._action(genere)  # Instancia o objeto do produto com base no gênero
+        product = product or self._print_products(genere)  # Exibe os produtos e obtém a escolha do usuário
         os.system("cls")
-        self._view.display_header(f"\033[34mDetalhes do produto {products[choice]}\033[m")  # Mostra os detalhes do produto escolhido
-        print(products_details[choice])
+        self._view.display_header(f"\033[34mDetalhes do produto {product}\033[m")  # Mostra os detalhes do produto escolhido
+        print(action.product_details(product))
+        print(f"\033[34mDisponível (sem as reservas de outros carrinhos): {action.available(action.product, action.gender, product)}\033[m")
 
         while True:
             try:
                 cart = self._cart  # Obtém o objeto carrinho
                 print(self._view.draw_line())
                 quantity = int(input("\033[33mDigite a quantidade que deseja do produto: \033[m"))  # Solicita a quantidade desejada
-                price = action.show_price(products[choice])  # Obtém o preço do produto
-                cart.add_item(products[choice], quantity, price)  # Adiciona o item ao carrinho
-                self._list_cart.append({'product': self._save_product,
-                                        'genere': genere})  # Armazena informações para atualização do estoque após a compra
+                price = action.show_price(product)  # Obtém o preço do produto
+                cart.add_item(product, quantity, price, action.product, action.gender)  # Adiciona o item ao carrinho
                 return  # Sai do loop após adicionar o item ao carrinho
+            except InsufficientStock as e:
+                print(f"\033[31m{e}\033[m")  # Nada foi reservado nem adicionado ao carrinho
+                return
             except ValueError:
                 print("Valor inválido, digite um valor válido!")  # Exibe mensagem de erro se a entrada for inválida
 
             
     # Método para diminuir a quantidade de um produto no estoque (venda)
-    def _decrease_stock(self, genere: str) -> None:
+    def _decrease_stock(self, genere: str, product: str = None) -> None:
         """
         Diminui a quantidade de um produto.
         
         Parâmetros:
         - genere: O gênero do produto.
+        - product: O nome do produto, se já foi escolhido pela busca; se omitido, é escolhido na lista.
         """
 
-        action = self._save_product(genere)
-        products, choice = self._print_products(genere)
-        products_details = self._print_products_details(genere)
+        action = self._action(genere)
+        product = product or self._print_products(genere)
         os.system("cls")
-        self._view.display_header(f"\033[34mDetalhes do produto {products[choice]}\033[m")
-        print(products_details[choice])
+        self._view.display_header(f"\033[34mDetalhes do produto {product}\033[m")
+        print(action.product_details(product))
         while True:
             try:
                 print(self._view.draw_line())
                 decrease_quantity = int(input("\033[33mDigite a quantidade que deseja retirar: \033[m"))
-                validate = action.decrease_quantity(products[choice], decrease_quantity)
+                validate = action.decrease_quantity(product, decrease_quantity)
                 if validate:
                     print("\033[32mQuantidade retirada!\033[m")
-                    products_details = self._print_products_details(genere)
-                    print(f"Novo total: {products_details[choice]}")
+                    print(f"Novo total: {action.product_details(product)}")
                     sleep(2)
                     os.system("cls")
                     return
@@ -301,7 +341,7 @@ class Screen():
         - genere: O gênero do produto.
         """
 
-        action = self._save_product(genere)
+        action = self._action(genere)
         while True:
             try:
                 product = input("\033[33mDigite o produto: \033[m")
@@ -317,28 +357,27 @@ class Screen():
                 raise ValueError("Valor inválido, digite um valor válido!")
 
     # Método para alterar o preço de um produto
-    def _change_product_price(self, genere: str) -> None:
+    def _change_product_price(self, genere: str, product: str = None) -> None:
         """
         Altera o preço de um produto.
         
         Parâmetros:
         - genere: O gênero do produto.
+        - product: O nome do produto, se já foi escolhido pela busca; se omitido, é escolhido na lista.
         """
 
-        action = self._save_product(genere)
-        products, choice = self._print_products(genere)
-        products_details = self._print_products_details(genere)
+        action = self._action(genere)
+        product = product or self._print_products(genere)
         os.system("cls")
-        self._view.display_header(f"\033[34mDetalhes do produto {products[choice]}\033[m")
-        print(products_details[choice])
+        self._view.display_header(f"\033[34mDetalhes do produto {product}\033[m")
+        print(action.product_details(product))
         while True:
             try:
                 price = float(input("\033[33mDigite o novo preço do produto: \033[m"))
-                validate = action.edit_price(products[choice], price)
+                validate = action.edit_price(product, price)
                 if validate:
                     print("\033[32mPreço alterado!\033[m")
-                    products_details = self._print_products_details(genere)
-                    self._view.display_header(f"\033[32mNovo preço: {products_details[choice]}\033[m")
+                    self._view.display_header(f"\033[32mNovo preço: {action.product_details(product)}\033[m")
                     sleep(2)
                     os.system("cls")
                     return
@@ -346,106 +385,58 @@ class Screen():
                 raise ValueError("\033[31mValor inválido, digite um valor válido!\033[m")
 
     # Método para lidar com operações CRUD com base na escolha inicial
-    def _handle_crud(self, genere: str) -> None:
+    def _handle_crud(self, genere: str, product: str = None) -> None:
         """
         Gerencia operações de CRUD com base na escolha inicial do usuário.
         
         Parâmetros:
         - genere: O gênero do produto.
+        - product: O nome do produto, se já foi escolhido pela busca.
         """
         if self._initial_choice == 1: 
-            self._increase_product(genere)
+            self._increase_product(genere, product)
         elif self._initial_choice == 2: 
             self._create_product(genere)
         elif self._initial_choice == 3: 
-            self._change_product_price(genere)
+            self._change_product_price(genere, product)
         elif self._initial_choice == 4: 
-            self._decrease_stock(genere)
+            self._decrease_stock(genere, product)
         elif self._initial_choice == 5: 
-            self._add_products_cart(genere)
-
-    # Métodos para lidar com cada tipo de produto com base no gênero
-    def _handle_unisex(self) -> None:
-        """
-        Lida com operações em produtos unissex.
-        """
-        self._handle_crud('unisex')
-
-    def _handle_male(self) -> None:
-        """
-        Lida com operações em produtos masculinos.
-        """
-        self._handle_crud('masculino')  
-
-    def _handle_female(self) -> None:
-        """
-        Lida com operações em produtos femininos.
-        """
-        self._handle_crud('feminino')  
-
-    def _handle_child(self) -> None:
-        """
-        Lida com operações em produtos infantis.
-        """ 
-        self._handle_crud('infantil')  
-
-    # Método para lidar com a escolha de gênero usando o dicionário
-    def _handle_choice(self, genere : int) -> None:
-        """
-        Chama a função apropriada com base na escolha do usuário.
-        
-        Parâmetros:
-        - genere: A escolha do gênero feita pelo usuário.
-        """
-        action = self._choice_actions.get(genere)
-        action()  # Executa o método correspondente à escolha do gênero
+            self._add_products_cart(genere, product)
 
     # Método para verificar produtos com quantidade zero
     def _check_zero_products(self) -> list:
         """
-        Verifica quais produtos estão com quantidade zero.
+        Verifica quais produtos estão com quantidade zero, em todos os tipos e gêneros do catálogo.
         
         Retorna:
         - Uma lista de produtos com quantidade zero.
         """
-        generes = ['unisex', 'masculino', 'feminino', 'infantil']
         validates = []
+        for category, genere, zero in self._registry.out_of_stock():
+            if len(self._registry.genders(category)) > 1:
+                validates.append(f'\033[33m{category.capitalize()} {genere} em falta:\033[m')
+            else:
+                validates.append(f'\033[33m{category.capitalize()} em falta:\033[m')
+            validates.append(zero)
+        return validates
 
-        # Verifica shampoo em falta
-        shampoo_zero = self._shampoo(generes[1]).check_zero_quantity()
-        if shampoo_zero:
-            validates.append(f'\033[33mShampoo {generes[1]} em falta:\033[m')
-            validates.append(shampoo_zero)
-
-        shampoo_zero = self._shampoo(generes[2]).check_zero_quantity()
-        if shampoo_zero:
-            validates.append(f'\033[33mShampoo {generes[2]} em falta:\033[m')
-            validates.append(shampoo_zero)
-
-        # Verifica batom em falta
-        lipstick_zero = self._lipstick(generes[0]).check_zero_quantity()
-        if lipstick_zero:
-            validates.append('\033[33mBatom em falta:\033[m')
-            validates.append(lipstick_zero)
-
-        # Verifica perfume em falta
-        perfume_zero = self._perfume(generes[1]).check_zero_quantity()
-        if perfume_zero:
-            validates.append(f'\033[33mPerfume {generes[1]} em falta:\033[m')
-            validates.append(perfume_zero)
-
-        perfume_zero = self._perfume(generes[2]).check_zero_quantity()
-        if perfume_zero:
-            validates.append(f'\033[33mPerfume {generes[2]} em falta:\033[m')
-            validates.append(perfume_zero)
-
-        perfume_zero = self._perfume(generes[3]).check_zero_quantity()
-        if perfume_zero:
-            validates.append(f'\033[33mPerfume {generes[3]} em falta:\033[m')
-            validates.append(perfume_zero)
+    def _check_reorder_products(self) -> list:
+        """
+        Verifica quais produtos ainda têm estoque, mas vendem rápido o bastante para
+        acabar antes de uma reposição chegar (ponto de reposição do livro de vendas).
 
+        Retorna:
+        - Uma lista de avisos, do produto com menos dias de estoque para o com mais.
+        """
+        validates = []
+        for alert in Controller().reorder_alerts():
+            category, genere, name = alert['produto']
+            validates.append(f"\033[33mRepor em breve: {name} ({category} {genere}) - "
+                             f"{alert['quantidade']} em estoque, cerca de {alert['cobertura']} dias "
+                             f"({alert['velocidade']} por dia)\033[m")
         return validates
-    
+
     def _handle_cart(self) -> None:
         """
         Gerencia a funcionalidade do carrinho de compras.
@@ -460,7 +451,9 @@ class Screen():
         No caso de finalizar a compra:
         - Mostra o total da compra.
         - Pede confirmação do usuário.
-        - Atualiza a quantidade dos produtos no estoque.
+        - Atualiza a quantidade dos produtos no estoque de uma só vez (Cart.checkout);
+          se algum item não tiver estoque suficiente, nada é baixado e o carrinho é
+          esvaziado, liberando as reservas.
 
         Lança:
         - Qualquer exceção ocorrida durante a adição ao carrinho ou atualização do estoque.
@@ -470,7 +463,11 @@ class Screen():
                 os.system("cls")
                 action = self._cart  # Obtém o objeto carrinho
                 self._view.display_header('\033[34mCARRINHO DE COMPRAS\033[m')
-                self._product_menu()  # Executa a progressão de menus para selecionar o produto
+                found = self._find_product()  # Busca o produto pelo nome, se o usuário digitar
+                if found:
+                    self._handle_crud(*found)
+                else:
+                    self._product_menu()  # Executa a progressão de menus para selecionar o produto
                 action.display_cart()  # Exibe os itens atualmente no carrinho
                 total = action.get_total()  # Calcula o total da compra
                 print(f"\033[33mTotal da compra: {total}\033[m")
@@ -484,20 +481,18 @@ class Screen():
         while True:
             payment = input("\033[33mDeseja finalizar a compra? (s/n): \033[m")
             if payment.lower() != 's':
+                self._cart.cancel()  # Libera as reservas dos itens do carrinho
                 return  # Se o usuário não quiser finalizar a compra, retorna ao menu inicial
-            else: 
-                print('\033[32mCompra Efetuada com sucesso!\033[m')
+            try:
+                self._cart.checkout()  # Valida e baixa o estoque de todos os itens em uma única gravação
+            except (InsufficientStock, InvalidProduct) as e:
+                # A sessão é única: o carrinho é esvaziado para não deixar o estoque reservado
+                self._cart.cancel()
+                print(f"\033[31mCompra não efetuada! {e}\033[m")
                 sleep(1)
-            index = 0  # Variável de controle para iterar sobre os itens do carrinho
-            cart_item_list = self._cart.get_list()  # Obtém a lista de produtos do carrinho
-            for items in self._list_cart:  # Itera sobre os itens armazenados em list_cart
-                action = items['product']  # Obtém o objeto produto (self._save_product)
-                genere = items['genere']  # Obtém o gênero do produto
-                product_type = cart_item_list[index]['product']  # Nome do produto no carrinho
-                decrease_quantity = cart_item_list[index]['quantity']  # Quantidade do produto no carrinho
-                action(genere).decrease_quantity(product_type, decrease_quantity)  # Atualiza a quantidade do produto no estoque
-                index += 1  # Incrementa o índice para o próximo item do carrinho
-            
+                return
+            print('\033[32mCompra Efetuada com sucesso!\033[m')
+            sleep(1)
             return  # Retorna ao menu inicial após finalizar a compra
 
 
@@ -509,7 +504,7 @@ class Screen():
         """
 
         while True:
-            validates = self._check_zero_products()
+            validates = self._check_zero_products() + self._check_reorder_products()
             if validates:
                 for zero_products in validates:
                     print(zero_products)
@@ -532,8 +527,15 @@ class Screen():
                 if self._initial_choice == 5:
                     self._handle_cart()
                 
-                else:
+                elif self._initial_choice == 2:
                     self._product_menu()
+
+                else:
+                    found = self._find_product()  # Busca o produto pelo nome, se o usuário digitar
+                    if found:
+                        self._handle_crud(*found)
+                    else:
+                        self._product_menu()
                 return
             
             except (InvalidChoice, ValueError):
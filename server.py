@@ -0,0 +1,231 @@
+"""
+Servidor HTTP/JSON do estoque, com asyncio e sem dependências externas.
+
+Um único processo atende os terminais de venda e a loja virtual, em vez de cada
+um abrir o data.json. O catálogo fica em memória (BufferedStorage): as leituras
+são respondidas direto da memória e todas as alterações passam por uma única
+tarefa de escrita, que aplica em sequência as operações da fila e grava todas as
+alterações do lote de uma vez antes de responder. Se a gravação falhar, as
+alterações do lote são desfeitas também na memória e as operações respondem com erro.
+
+Rotas:
+- GET  /products/<produto>/<genero>         Detalhes de todos os produtos do gênero.
+- GET  /products/<produto>/<genero>/<nome>  Quantidade e preço de um produto.
+- GET  /search?q=<texto>                    Busca produtos pelo nome.
+- GET  /out-of-stock                        Produtos em falta de todo o catálogo.
+- GET  /metrics[?format=json]               Métricas de desempenho (com --metrics), no
+                                            formato do Prometheus ou em JSON.
+- POST /restock, /sell, /checkout, /reprice, /add
+       Corpo JSON como as operações do modo em lote (batch.py); /checkout é o
+       mesmo que /sell com "itens".
+
+Uso (na raiz do projeto):
+    python server.py --port 8080
+    python server.py --storage sqlite --data data.db
+    python server.py --metrics
+"""
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs, unquote
+from batch import Batch
+from services.products.controlers.controller import Controller
+from services.products.controlers.storage import JsonStorage
+from services.products.controlers.bufferedstorage import BufferedStorage
+from services.products.controlers.productsexceptions import *
+from services.products.controlers import metrics
+
+# Código HTTP de cada erro das operações
+STATUS = {
+    'InvalidProduct': 404,
+    'ExistingProduct': 409,
+    'InsufficientStock': 409,
+    'InvalidPrice': 422,
+    'KeyError': 400,
+    'ValueError': 400,
+    'TypeError': 400,
+}
+
+# Operação do modo em lote executada por cada rota de alteração
+WRITES = {'restock': 'restock', 'sell': 'sell', 'checkout': 'sell', 'reprice': 'reprice', 'add': 'add'}
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           409: 'Conflict', 422: 'Unprocessable Entity', 500: 'Internal Server Error'}
+
+
+class InventoryServer:
+    """
+    Classe InventoryServer com o servidor HTTP/JSON do estoque.
+
+    Atributos:
+    - storage (BufferedStorage): O catálogo em memória, gravado em lotes.
+    - max_batch (int): Quantidade máxima de operações gravadas juntas.
+
+    Métodos:
+    - start(self, host, port): Inicia o servidor e a tarefa de escrita.
+    - write(self, operation) -> dict: Envia uma operação para a tarefa de escrita e aguarda o resultado.
+    - handle(self, method, path, body) -> tuple: Atende uma requisição e retorna (status, resposta).
+    """
+
+    def __init__(self, storage: BufferedStorage, max_batch: int = 256) -> None:
+        self.storage = storage
+        self.max_batch = max_batch
+        Controller.use_storage(storage)  # Os controladores passam a usar o catálogo em memória
+        self._batch = Batch()
+        self._queue = None
+        # Uma única thread grava na origem: as gravações ficam em ordem e a conexão do SQLite em uma só thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inventory-writer')
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8080):
+        self._queue = asyncio.Queue()
+        asyncio.get_running_loop().create_task(self._writer())
+        return await asyncio.start_server(self._connection, host, port)
+
+    async def _writer(self) -> None:
+        """
+        Tarefa única de escrita: aplica as operações da fila em ordem e grava cada lote de uma vez.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty() and len(batch) < self.max_batch:
+                batch.append(self._queue.get_nowait())
+            results = [self._batch.execute(operation) for operation, _ in batch]
+            rows = self.storage.take_pending()
+            if rows:
+                try:
+                    # Grava fora do laço de eventos: as leituras continuam sendo atendidas da memória
+                    await loop.run_in_executor(self._executor, self.storage.backend.upsert_many, rows)
+                except Exception as e:
+                    # Nenhuma outra operação roda durante a gravação, então o lote pode ser desfeito inteiro
+                    self.storage.rollback_pending()
+                    error = {'ok': False, 'erro': type(e).__name__, 'mensagem': f"Alteração não gravada: {e}"}
+                    results = [error if result['ok'] else result for result in results]
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    async def write(self, operation: dict) -> dict:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, future))
+        return await future
+
+    def _read(self, parts: list, query: dict) -> tuple:
+        """
+        Atende as rotas de leitura, direto da memória.
+        """
+        if parts[0] == 'products' and len(parts) in (3, 4):
+            action = self._batch.controller({'produto': parts[1], 'genero': parts[2]})
+            if len(parts) == 4:
+                return 200, {'ok': True, 'nome': parts[3], **action.product_details(parts[3])[1]}
+            return 200, {'ok': True, 'produtos': dict(action.all_products_details())}
+        if parts == ['search']:
+            found = Controller().search(query.get('q', [''])[0], int(query.get('limit', [10])[0]))
+            return 200, {'ok': True, 'produtos': [dict(zip(('produto', 'genero', 'nome'), key)) for key in found]}
+        if parts == ['metrics'] and metrics.registry is not None:
+            if query.get('format', [''])[0] == 'json':
+                return 200, metrics.registry.snapshot()
+            return 200, metrics.registry.to_prometheus()  # Texto: respondido sem conversão para JSON
+        if parts == ['out-of-stock']:
+            zero = self.storage.stock_index().all_zero()
+            return 200, {'ok': True, 'produtos': [{'produto': product, 'genero': gender, 'nomes': names}
+                                                  for (product, gender), names in zero.items()]}
+        return 404, {'ok': False, 'erro': 'NotFound', 'mensagem': 'Rota não encontrada'}
+
+    async def handle(self, method: str, path: str, body: bytes) -> tuple:
+        url = urlsplit(path)
+        parts = [unquote(part) for part in url.path.strip('/').split('/')]
+        try:
+            if method == 'GET':
+                return self._read(parts, parse_qs(url.query))
+            if len(parts) != 1 or parts[0] not in WRITES:
+                return 404, {'ok': False, 'erro': 'NotFound', 'mensagem': 'Rota não encontrada'}
+            if method != 'POST':
+                return 405, {'ok': False, 'erro': 'MethodNotAllowed', 'mensagem': 'Use POST para alterações'}
+            operation = json.loads(body or b'{}')
+            if not isinstance(operation, dict):
+                raise ValueError("O corpo precisa ser um objeto JSON")
+            operation['op'] = WRITES[parts[0]]
+            result = await self.write(operation)
+        except (InvalidProduct, ValueError) as e:
+            result = {'ok': False, 'erro': type(e).__name__, 'mensagem': str(e)}
+        return (200 if result['ok'] else STATUS.get(result['erro'], 500)), result
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Atende as requisições de uma conexão (HTTP/1.1 com keep-alive).
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+                status, result = await self.handle(method, path, body)
+                if isinstance(result, str):
+                    payload, content_type = result.encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+                else:
+                    payload, content_type = json.dumps(result, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8'
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                writer.write(f'HTTP/1.1 {status} {REASONS[status]}\r\n'
+                             f'Content-Type: {content_type}\r\n'
+                             f'Content-Length: {len(payload)}\r\n'
+                             f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode('latin-1') + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass  # Conexão encerrada ou requisição malformada: apenas fecha
+        finally:
+            writer.close()
+
+
+def open_storage(kind: str, path: str = None):
+    """
+    Abre o armazenamento de origem ('json', 'journal', 'sqlite' ou 'binary').
+    """
+    if kind == 'binary':
+        from services.products.controlers.binarystorage import BinaryStorage
+        return BinaryStorage(path or 'data.bin')
+    if kind == 'sqlite':
+        from services.products.controlers.sqlitestorage import SqliteStorage
+        # A conexão é aberta aqui e usada pela thread de escrita do servidor
+        return SqliteStorage(path or 'data.db', check_same_thread=False)
+    return JsonStorage(path or 'data.json', journaled=kind == 'journal')
+
+
+async def serve(host: str, port: int, storage) -> None:
+    server = InventoryServer(BufferedStorage(storage))
+    listener = await server.start(host, port)
+    print(f'Servidor do estoque em http://{host}:{port}', flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Servidor HTTP/JSON do estoque.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--storage', choices=('json', 'journal', 'sqlite', 'binary'), default='json')
+    parser.add_argument('--data', help='arquivo do catálogo (padrão: data.json, data.db ou data.bin)')
+    parser.add_argument('--metrics', action='store_true', help='ativa as métricas de desempenho em /metrics')
+    args = parser.parse_args()
+    if args.metrics:
+        Controller.enable_metrics()
+    try:
+        asyncio.run(serve(args.host, args.port, open_storage(args.storage, args.data)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
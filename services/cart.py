@@ -1,65 +1,217 @@
-from services.products import shampoo, lipstick, perfume
+from services.products.controlers.controller import Controller
+from services.products.controlers.productsexceptions import InvalidProduct
+from services.products.controlers import metrics
+
+class CartLine:
+    """
+    Classe CartLine para representar uma linha do carrinho.
+
+    Usa __slots__ para ocupar pouca memória mesmo em carrinhos com milhares de linhas.
+
+    Atributos:
+    - product (str): O nome do produto.
+    - quantity (int): A quantidade do produto.
+    - price (float): O preço unitário do produto.
+    - category (str): O tipo de produto (shampoo, perfume, batom).
+    - genere (str): O gênero do produto.
+    """
+    __slots__ = ('product', 'quantity', 'price', 'category', 'genere')
+
+    def __init__(self, product: str, quantity: int, price: float, category: str = None, genere: str = None) -> None:
+        self.product = product
+        self.quantity = quantity
+        self.price = price
+        self.category = category
+        self.genere = genere
+
+    @property
+    def sku(self) -> tuple:
+        """
+        A chave que identifica o produto no carrinho: (tipo, gênero, nome).
+        """
+        return (self.category, self.genere, self.product)
+
+    @property
+    def subtotal_cents(self) -> int:
+        """
+        O total da linha, em centavos.
+        """
+        return self.quantity * round(self.price * 100)
+
 
 class Cart():
     """
     Classe Cart para gerenciar o carrinho de compras.
-    
+
+    As linhas ficam em um dicionário indexado pelo produto (tipo, gênero, nome):
+    adicionar de novo um produto que já está no carrinho soma a quantidade na linha
+    existente. O total é mantido em centavos e atualizado a cada inclusão ou
+    remoção, então nenhuma operação precisa percorrer o carrinho inteiro.
+
+    Os produtos podem ser informados pelo código inteiro (SKU, ver
+    Controller.sku_id) em vez do nome, tipo e gênero; o preço, se omitido, é o do
+    catálogo, lido direto do vetor de preços.
+
+    Itens com tipo e gênero reservam o estoque ao entrar no carrinho (ver
+    Controller.reserve): as unidades ficam indisponíveis para os outros carrinhos
+    até a compra, a remoção do item ou o vencimento da reserva.
+
     Atributos:
-    - items (list): Lista de dicionários contendo produtos, suas quantidades e preços.
-    
+    - lines (dict): Linhas do carrinho (CartLine), indexadas pelo produto.
+
     Métodos:
-    - add_item(self, product, genere, quantity, price): Adiciona um item ao carrinho.
+    - add_item(self, product, quantity, price, category, genere): Adiciona um item ao carrinho.
+    - remove_item(self, product, category, genere, quantity): Remove um item (ou parte dele) do carrinho.
+    - get_list(self): Retorna os itens do carrinho como dicionários.
     - display_cart(self): Exibe o conteúdo do carrinho.
-    - get_total(self): Calcula o total do carrinho.
+    - get_total(self): Retorna o total do carrinho.
     - checkout(self): Processa a finalização da compra, atualizando o estoque.
+    - cancel(self): Esvazia o carrinho e libera as reservas.
     """
-    
+
     def __init__(self) -> None:
-        self._items = []
-    
-    def add_item(self, product : str, quantity : int, price : float ) -> None:
+        self._lines = {}  # Exemplo: {('shampoo', 'masculino', 'Men shampoo'): CartLine(...)}
+        self._total_cents = 0
+
+    def add_item(self, product : str, quantity : int, price : float = None, category : str = None, genere : str = None) -> None:
         """
         Adiciona um item ao carrinho.
-        
+
+        Se o produto já estiver no carrinho, a quantidade é somada à linha existente
+        e o preço unitário passa a ser o informado. Com tipo e gênero, as unidades
+        são reservadas antes de entrar no carrinho.
+
         Parâmetros:
-        - product (str): O nome do produto.
-        - genere (str): O gênero do produto.
+        - product (str): O nome do produto, ou o seu código (int) no lugar do nome, tipo e gênero.
         - quantity (int): A quantidade do produto.
-        - price (float): O preço do produto.
-        """
-        self._items.append({
-            'product': product,
-            'quantity': quantity,
-            'price': price
-        })
-    
+        - price (float): O preço do produto; se omitido, é o preço do catálogo (com o código, ou com tipo e gênero).
+        - category (str): O tipo de produto (shampoo, perfume, batom), usado na baixa do estoque.
+        - genere (str): O gênero do produto, usado na baixa do estoque.
+
+        Lança:
+        - InvalidProduct se o produto não for encontrado.
+        - InsufficientStock se não houver unidades disponíveis para reservar.
+        - ValueError se o preço for omitido sem o código nem o tipo e o gênero.
+        """
+        if isinstance(product, int):
+            if price is None:
+                price = Controller().price_by_id(product)
+            category, genere, product = Controller().sku(product)
+        elif price is None:
+            # O preço é conferido antes da reserva, para que uma falha não deixe unidades reservadas
+            if category is None or genere is None:
+                raise ValueError("Informe o preço, ou o tipo e o gênero para usar o preço do catálogo!")
+            price = Controller().storage.get(category, genere, product)['preco']
+        if category is not None and genere is not None:
+            Controller().reserve(self, category, genere, product, quantity)  # Lança InsufficientStock sem alterar o carrinho
+        sku = (category, genere, product)
+        line = self._lines.get(sku)
+        if line is None:
+            line = self._lines[sku] = CartLine(product, quantity, price, category, genere)
+        else:
+            self._total_cents -= line.subtotal_cents
+            line.quantity += quantity
+            line.price = price
+        self._total_cents += line.subtotal_cents
+
+    def remove_item(self, product : str, category : str = None, genere : str = None, quantity : int = None) -> None:
+        """
+        Remove um item do carrinho.
+
+        Parâmetros:
+        - product (str): O nome do produto, ou o seu código (int) no lugar do nome, tipo e gênero.
+        - category (str): O tipo de produto.
+        - genere (str): O gênero do produto.
+        - quantity (int): A quantidade a remover; se omitida (ou maior que a da linha), remove a linha inteira.
+
+        Lança:
+        - InvalidProduct se o produto não estiver no carrinho.
+        """
+        if isinstance(product, int):
+            category, genere, product = Controller().sku(product)
+        sku = (category, genere, product)
+        line = self._lines.get(sku)
+        if line is None:
+            raise InvalidProduct(f"Produto não está no carrinho: {product}")
+        if category is not None and genere is not None:
+            Controller().release(self, category, genere, product, quantity)
+        self._total_cents -= line.subtotal_cents
+        if quantity is None or quantity >= line.quantity:
+            del self._lines[sku]
+            return
+        line.quantity -= quantity
+        self._total_cents += line.subtotal_cents
+
     def get_list(self) -> list:
         """
         Retorna a lista de items do carrinho
         """
-        return self._items
+        return [{'product': line.product,
+                 'quantity': line.quantity,
+                 'price': line.price,
+                 'category': line.category,
+                 'genere': line.genere} for line in self._lines.values()]
 
     def display_cart(self) -> None:
         """
         Exibe o conteúdo do carrinho.
-        
+
         Retorna:
         - None
         """
-        if not self._items:
+        if not self._lines:
             print("O carrinho está vazio.")
             return
-        
+
         print("Produtos no carrinho:")
-        for item in self._items:
-            print(f"{item['product']} - Quantidade: {item['quantity']} - Preço: {item['price']} - Total: {item['quantity'] * item['price']}")
-    
+        for line in self._lines.values():
+            print(f"{line.product} - Quantidade: {line.quantity} - Preço: {line.price} - Total: {line.subtotal_cents / 100}")
+
     def get_total(self) -> float:
         """
-        Calcula o total do carrinho.
-        
+        Retorna o total do carrinho, mantido a cada inclusão ou remoção.
+
         Retorna:
         - float: O total do carrinho.
         """
-        total = sum(item['quantity'] * item['price'] for item in self._items)
+        return self._total_cents / 100
+
+    def checkout(self) -> float:
+        """
+        Finaliza a compra, baixando o estoque de todos os itens de uma só vez.
+
+        A baixa é tudo ou nada: se algum item não tiver estoque suficiente, nenhum
+        estoque é alterado e o carrinho continua como estava. Unidades reservadas
+        por outros carrinhos não entram na conta; as reservas deste carrinho são
+        usadas e liberadas.
+
+        Retorna:
+        - float: O total da compra finalizada.
+
+        Lança:
+        - InvalidProduct se algum item não tiver tipo e gênero ou não for encontrado.
+        - InsufficientStock se algum item não tiver estoque suficiente.
+        """
+        lines = []
+        prices = {}  # Preço cobrado de cada item, registrado no livro de vendas
+        for line in self._lines.values():
+            if line.category is None or line.genere is None:
+                raise InvalidProduct(f"Item sem tipo ou gênero: {line.product}")
+            lines.append((line.category, line.genere, line.product, line.quantity))
+            prices[line.sku] = line.price
+        total = self.get_total()
+        Controller().apply_sale(lines, owner=self, prices=prices)  # Uma única leitura e uma única gravação para a compra inteira
+        self._lines = {}
+        self._total_cents = 0
         return total
+
+    def cancel(self) -> None:
+        """
+        Esvazia o carrinho sem finalizar a compra, liberando as reservas de estoque.
+        """
+        Controller().release(self)
+        self._lines = {}
+        self._total_cents = 0
+
+
+metrics.instrument(Cart, ('get_total', 'checkout'), 'cart')
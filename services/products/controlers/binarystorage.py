@@ -0,0 +1,616 @@
+import mmap
+import os
+import struct
+import sys
+import zlib
+from .storage import Storage, JsonStorage, VERSION_KEY, catalog_version, check_sale, check_deltas, iter_catalog
+from .stockindex import StockIndex
+from .searchindex import SearchIndex
+from .filelock import FileLock
+from .productsexceptions import *
+from . import metrics
+
+# Cabeçalho: assinatura, versão do formato, versão do catálogo ('_versao'), quantidade de
+# grupos, registros e strings, e a posição de cada seção no arquivo
+HEADER = struct.Struct('<4sHxxQIIIQQQQ')
+MAGIC = b'INVB'
+FORMAT_VERSION = 1
+# Índice de grupos: tipo e gênero (números na tabela de strings), primeiro registro e quantidade
+GROUP = struct.Struct('<IIII')
+# Registro de tamanho fixo de cada produto: nome (número na tabela de strings), quantidade e preço
+RECORD = struct.Struct('<Iqd')
+# Posição (número do registro) no índice ordenado por nome e na tabela de strings
+SLOT = struct.Struct('<I')
+# Versão do catálogo, gravada no cabeçalho logo após a assinatura e a versão do formato
+VERSION = struct.Struct('<Q')
+VERSION_AT = 8
+# Registro do log de refazer do modo in_place: registro alterado, quantidade, preço,
+# versão do catálogo após a alteração e CRC32 dos campos anteriores
+REDO = struct.Struct('<IqdQI')
+
+
+def encode_catalog(data: dict) -> bytes:
+    """
+    Converte um catálogo no formato de data.json para o formato binário.
+
+    Layout do arquivo:
+    - cabeçalho (HEADER);
+    - índice de grupos (GROUP), um por (tipo, gênero), na ordem do catálogo;
+    - registros (RECORD), contíguos por grupo e na ordem do catálogo;
+    - índice ordenado: para cada grupo, os números dos seus registros ordenados
+      pelo nome (UTF-8), para a busca binária;
+    - tabela de strings: as posições de início de cada string (mais a posição
+      final) seguidas dos textos em UTF-8, cada texto guardado uma única vez.
+
+    Retorna:
+    - O conteúdo do arquivo.
+    """
+    strings = {}
+
+    def string_id(text: str) -> int:
+        return strings.setdefault(text, len(strings))
+
+    groups, records, order = [], [], []
+    for product, genders in data.items():
+        if product.startswith('_'):
+            continue
+        for gender, products in genders.items():
+            first = len(records)
+            names = []
+            for type, info in products.items():
+                names.append((type.encode('utf-8'), len(records)))
+                records.append(RECORD.pack(string_id(type), info['quantidade'], info['preco']))
+            groups.append(GROUP.pack(string_id(product), string_id(gender), first, len(records) - first))
+            order.extend(SLOT.pack(index) for _, index in sorted(names))
+
+    texts = [text.encode('utf-8') for text in strings]
+    offsets, position = [], 0
+    for text in texts:
+        offsets.append(SLOT.pack(position))
+        position += len(text)
+    offsets.append(SLOT.pack(position))
+
+    groups_at = HEADER.size
+    records_at = groups_at + len(groups) * GROUP.size
+    order_at = records_at + len(records) * RECORD.size
+    strings_at = order_at + len(order) * SLOT.size
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, catalog_version(data), len(groups), len(records), len(texts),
+                         groups_at, records_at, order_at, strings_at)
+    return b''.join((header, *groups, *records, *order, *offsets, *texts))
+
+
+def write_binary(path: str, data: dict) -> int:
+    """
+    Grava o catálogo no formato binário, com troca atômica do arquivo.
+
+    Retorna:
+    - A quantidade de bytes gravados.
+    """
+    content = encode_catalog(data)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+    if metrics.registry is not None:
+        metrics.registry.add_bytes('binary', written=len(content))
+    return len(content)
+
+
+class BinaryCatalog:
+    """
+    Classe BinaryCatalog para ler um catálogo binário mapeado em memória (mmap).
+
+    Abrir o arquivo lê só o cabeçalho e o índice de grupos; os registros e os
+    nomes ficam no mapeamento e são lidos sob demanda, então o sistema operacional
+    carrega apenas as páginas usadas. A busca de um produto é binária sobre o
+    índice ordenado do seu grupo: O(log n) registros, sem montar dicionários.
+
+    Com `writable`, o mapeamento é compartilhado para escrita e write_record altera
+    um registro no próprio arquivo (modo in_place do BinaryStorage).
+
+    Atributos:
+    - version (int): A versão do catálogo ('_versao'), lida do cabeçalho.
+    - size (int): A quantidade de produtos.
+
+    Métodos:
+    - find(self, product, gender, type) -> int: O número do registro de um produto.
+    - record(self, index) -> tuple: A quantidade e o preço de um registro.
+    - write_record(self, index, quantity, price): Altera um registro no próprio arquivo.
+    - items(self, product, gender) -> list: Os produtos de um gênero, na ordem do catálogo.
+    - iter_products(self): Percorre todos os produtos.
+    - to_dict(self) -> dict: O catálogo completo no formato de data.json.
+    - close(self): Libera o mapeamento.
+    """
+
+    def __init__(self, path: str, writable: bool = False) -> None:
+        with open(path, 'r+b' if writable else 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        (magic, format_version, _, group_count, self.size, string_count,
+         groups_at, self._records_at, self._order_at, strings_at) = HEADER.unpack_from(self._map)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"Arquivo de catálogo binário inválido: {path}")
+        self._strings_at = strings_at
+        self._texts_at = strings_at + (string_count + 1) * SLOT.size
+        self._groups = {}  # Exemplo: {('shampoo', 'masculino'): (primeiro registro, quantidade)}
+        self._names = {}   # Nomes já decodificados de cada grupo, pelo primeiro registro
+        for category_id, gender_id, first, count in GROUP.iter_unpack(
+                self._map[groups_at:groups_at + group_count * GROUP.size]):
+            self._groups[(self._string(category_id), self._string(gender_id))] = (first, count)
+
+    def close(self) -> None:
+        self._map.close()
+
+    @property
+    def version(self) -> int:
+        return VERSION.unpack_from(self._map, VERSION_AT)[0]
+
+    @version.setter
+    def version(self, version: int) -> None:
+        VERSION.pack_into(self._map, VERSION_AT, version)
+
+    def flush(self) -> None:
+        """
+        Grava no disco as alterações feitas no mapeamento.
+        """
+        self._map.flush()
+
+    def _text(self, string_id: int) -> bytes:
+        start, end = struct.unpack_from('<II', self._map, self._strings_at + string_id * SLOT.size)
+        return self._map[self._texts_at + start:self._texts_at + end]
+
+    def _string(self, string_id: int) -> str:
+        return self._text(string_id).decode('utf-8')
+
+    def groups(self) -> list:
+        """
+        Retorna os pares (tipo, gênero) do catálogo, inclusive os sem produtos.
+        """
+        return list(self._groups)
+
+    def find(self, product: str, gender: str, type: str) -> int:
+        """
+        Retorna o número do registro de um produto.
+
+        Lança:
+        - InvalidProduct se o produto não for encontrado.
+        """
+        group = self._groups.get((product, gender))
+        if group is None:
+            raise InvalidProduct("Produto não encontrado!")
+        first, count = group
+        wanted = type.encode('utf-8')
+        low, high = first, first + count
+        while low < high:
+            middle = (low + high) // 2
+            index = SLOT.unpack_from(self._map, self._order_at + middle * SLOT.size)[0]
+            name = self._text(RECORD.unpack_from(self._map, self._records_at + index * RECORD.size)[0])
+            if name < wanted:
+                low = middle + 1
+            elif name > wanted:
+                high = middle
+            else:
+                return index
+        raise InvalidProduct("Produto não encontrado!")
+
+    def record(self, index: int) -> tuple:
+        """
+        Retorna (quantidade, preço) de um registro.
+        """
+        return RECORD.unpack_from(self._map, self._records_at + index * RECORD.size)[1:]
+
+    def write_record(self, index: int, quantity: int, price: float) -> None:
+        """
+        Altera a quantidade e o preço de um registro no próprio arquivo (mapeamento para escrita).
+        """
+        struct.pack_into('<qd', self._map, self._records_at + index * RECORD.size + SLOT.size, quantity, price)
+
+    def _group_items(self, first: int, count: int):
+        start = self._records_at + first * RECORD.size
+        records = RECORD.iter_unpack(self._map[start:start + count * RECORD.size])
+        names = self._names.get(first)
+        if names is None:
+            # Os nomes de um arquivo mapeado não mudam: cada grupo é decodificado uma única vez
+            records = list(records)
+            names = self._names[first] = [self._string(name_id) for name_id, _, _ in records]
+        for name, (_, quantity, price) in zip(names, records):
+            yield name, {'quantidade': quantity, 'preco': price}
+
+    def items(self, product: str, gender: str) -> list:
+        """
+        Retorna (tipo, informações) dos produtos de um gênero, na ordem do catálogo.
+
+        Lança:
+        - InvalidProduct se o tipo ou o gênero não existirem.
+        """
+        group = self._groups.get((product, gender))
+        if group is None:
+            raise InvalidProduct("Produto não encontrado!")
+        return list(self._group_items(*group))
+
+    def iter_products(self):
+        for (product, gender), group in self._groups.items():
+            for type, info in self._group_items(*group):
+                yield product, gender, type, info
+
+    def to_dict(self) -> dict:
+        data = {}
+        for (product, gender), group in self._groups.items():
+            data.setdefault(product, {})[gender] = dict(self._group_items(*group))
+        if self.version:
+            data[VERSION_KEY] = self.version
+        return data
+
+
+class BinaryStorage(Storage):
+    """
+    Armazenamento em um arquivo binário compacto ('data.bin'), lido com mmap.
+
+    Os produtos são registros de tamanho fixo (quantidade e preço) agrupados por
+    tipo e gênero, com os nomes em uma tabela de strings (ver encode_catalog). O
+    arquivo tem cerca de um terço do tamanho do data.json com indentação e não
+    precisa ser interpretado ao abrir: consultas de um produto ou de um gênero
+    leem só as páginas envolvidas (BinaryCatalog).
+
+    Cada alteração regrava o arquivo inteiro com troca atômica, com o bloqueio
+    '<arquivo>.lock' (FileLock) entre processos, como o JsonStorage sem log. Se
+    outro processo substituir o arquivo, o mapeamento é refeito na próxima leitura.
+
+    No modo in_place, alterações de quantidade e preço (entradas, baixas, vendas,
+    remarcações) não regravam o arquivo: cada produto tem um registro fixo, achado
+    pelo índice ordenado de nomes, e a alteração escreve só os seus bytes no
+    mapeamento, com custo que não depende do tamanho do catálogo. Antes disso a
+    alteração é acrescentada ao log de refazer '<arquivo>.redo', com CRC32 e a
+    versão do catálogo; ao abrir o arquivo (ou quando outro processo deixou
+    registros no log), todos os registros válidos são reaplicados em ordem e um
+    registro incompleto no fim do log é descartado. A cada `checkpoint_every`
+    alterações o mapeamento é gravado em disco e o log esvaziado. Inclusões de
+    produtos continuam regravando o arquivo, sempre depois de um checkpoint, então
+    o log só tem registros do arquivo atual.
+
+    O JSON continua sendo o formato de importação e exportação: veja
+    convert_json_to_binary e convert_binary_to_json.
+
+    Atributos:
+    - path (str): O caminho do arquivo binário.
+    - in_place (bool): Se quantidades e preços são alterados no próprio arquivo.
+    - sync (bool): No modo in_place, se o log é sincronizado com o disco (fsync) a cada alteração.
+    - checkpoint_every (int): Alterações no log que disparam a gravação do mapeamento.
+    - lock (FileLock): O bloqueio entre processos.
+
+    Métodos:
+    - checkpoint(self): Grava o mapeamento em disco e esvazia o log de refazer.
+    - close(self): Libera o mapeamento do arquivo.
+    """
+
+    def __init__(self, path: str = 'data.bin', in_place: bool = False, sync: bool = False,
+                 checkpoint_every: int = 1000, lock_timeout: float = 10.0) -> None:
+        self.path = path
+        self.in_place = in_place
+        self.sync = sync
+        self.checkpoint_every = checkpoint_every
+        self.lock = FileLock(path + '.lock', timeout=lock_timeout)
+        self._redo_path = path + '.redo'
+        self._redo_offset = 0  # Posição no log até onde os registros já foram conferidos
+        self._catalog = None
+        self._stamp = None
+        self._version = None   # Última versão vista: outra diferente indica alteração de outro processo
+        if not os.path.exists(path):
+            write_binary(path, {})
+
+    def close(self) -> None:
+        if self._catalog is not None:
+            self._catalog.close()
+            self._catalog = None
+
+    def _view(self) -> BinaryCatalog:
+        """
+        Retorna o catálogo mapeado, refazendo o mapeamento se o arquivo foi substituído.
+
+        As regravações sempre trocam o arquivo, e um arquivo mapeado não tem o seu
+        inode reaproveitado, então o inode identifica a versão do arquivo.
+        """
+        st = os.stat(self.path)
+        stamp = (st.st_dev, st.st_ino)
+        if stamp != self._stamp:
+            self.close()
+            self._catalog = BinaryCatalog(self.path, writable=self.in_place)
+            self._stamp = stamp
+            self._index = self._search = None  # O arquivo mudou: os índices serão remontados
+            if self.in_place:
+                self._redo_offset = 0
+                with self.lock:
+                    self._recover(self._catalog)
+        elif self._catalog.version != self._version:
+            self._index = None  # Outro processo alterou quantidades no próprio arquivo
+        self._version = self._catalog.version
+        return self._catalog
+
+    def _recover(self, catalog: BinaryCatalog) -> int:
+        """
+        Reaplica os registros do log de refazer que ainda não chegaram ao arquivo.
+
+        Lê só a parte do log ainda não conferida por este processo e reaplica todos
+        os registros válidos, em ordem, sem comparar com a versão do cabeçalho: as
+        páginas do mapeamento não chegam ao disco em ordem, então o cabeçalho pode
+        ter uma versão mais nova que registros ainda não gravados. Os registros têm
+        valores absolutos, então reaplicar um registro já gravado não muda nada. No
+        fim, a versão do cabeçalho passa a ser a maior entre ela e a dos registros.
+        Deve ser chamado com o bloqueio: um registro inválido é o fim de uma
+        gravação interrompida, e o log é truncado nele.
+
+        Retorna:
+        - A quantidade de registros reaplicados.
+        """
+        size = os.path.getsize(self._redo_path) if os.path.exists(self._redo_path) else 0
+        if size == self._redo_offset:
+            return 0
+        if size < self._redo_offset:
+            self._redo_offset = 0  # Outro processo esvaziou o log no checkpoint
+        with open(self._redo_path, 'rb') as file:
+            file.seek(self._redo_offset)
+            data = file.read()
+        applied = 0
+        valid = 0
+        latest = catalog.version
+        for index, quantity, price, version, crc in REDO.iter_unpack(data[:len(data) - len(data) % REDO.size]):
+            if zlib.crc32(data[valid:valid + REDO.size - 4]) != crc:
+                break
+            valid += REDO.size
+            catalog.write_record(index, quantity, price)
+            latest = max(latest, version)
+            applied += 1
+        if latest != catalog.version:
+            catalog.version = latest
+        if valid < len(data):
+            with open(self._redo_path, 'r+b') as file:
+                file.truncate(self._redo_offset + valid)
+        self._redo_offset += valid
+        return applied
+
+    def _update(self, compute) -> list:
+        """
+        Altera registros no próprio arquivo (modo in_place), com o catálogo bloqueado.
+
+        A função `compute(catalog)` valida a alteração e retorna uma lista de
+        (registro, produto, gênero, tipo, quantidade, preço) com os valores novos.
+        Os registros vão primeiro para o log de refazer (uma única escrita) e só
+        depois para o mapeamento, seguidos da versão no cabeçalho.
+
+        Retorna:
+        - A lista retornada por `compute`.
+        """
+        with self.lock:
+            catalog = self._view()
+            self._recover(catalog)  # Registros deixados por um processo interrompido
+            changes = compute(catalog)
+            version = catalog.version
+            entries = []
+            for index, _, _, _, quantity, price in changes:
+                version += 1
+                fields = REDO.pack(index, quantity, price, version, 0)[:-4]
+                entries.append(fields + struct.pack('<I', zlib.crc32(fields)))
+            log = b''.join(entries)
+            with open(self._redo_path, 'ab') as file:
+                file.write(log)
+                file.flush()
+                if self.sync:
+                    os.fsync(file.fileno())
+            self._redo_offset += len(log)
+            for index, _, _, _, quantity, price in changes:
+                catalog.write_record(index, quantity, price)
+            catalog.version = self._version = version
+            if metrics.registry is not None:
+                metrics.registry.add_bytes('redo', written=len(log))
+                metrics.registry.add_bytes('binary', written=len(changes) * RECORD.size)
+            if self._redo_offset >= self.checkpoint_every * REDO.size:
+                self.checkpoint()
+        for _, product, gender, type, quantity, _ in changes:
+            self._touch(product, gender, type, quantity)
+        return changes
+
+    def checkpoint(self) -> None:
+        """
+        Grava em disco as alterações feitas no mapeamento e esvazia o log de refazer.
+        """
+        if not self.in_place:
+            return
+        with self.lock:
+            self._view().flush()
+            with open(self._redo_path, 'wb'):
+                pass
+            self._redo_offset = 0
+
+    def compact(self) -> None:
+        self.checkpoint()
+
+    def load(self) -> dict:
+        return self._view().to_dict()
+
+    def iter_products(self):
+        return self._view().iter_products()
+
+    def stock_index(self) -> StockIndex:
+        self._view()  # Descarta os índices se outro processo alterou o arquivo
+        return super().stock_index()
+
+    def search_index(self) -> SearchIndex:
+        self._view()
+        return super().search_index()
+
+    def save(self, data: dict) -> None:
+        with self.lock:
+            data[VERSION_KEY] = self._view().version + 1
+            self._write(data)
+        self._index = self._search = None
+
+    def _write(self, data: dict) -> None:
+        if self.in_place:
+            # Grava o mapeamento e esvazia o log antes de trocar o arquivo: registros
+            # do arquivo antigo nunca são reaplicados no novo, que tem outra disposição
+            self.checkpoint()
+        write_binary(self.path, data)
+        self._view()
+
+    def get(self, product: str, gender: str, type: str) -> dict:
+        catalog = self._view()
+        quantity, price = catalog.record(catalog.find(product, gender, type))
+        return {'quantidade': quantity, 'preco': price}
+
+    def items(self, product: str, gender: str) -> list:
+        return self._view().items(product, gender)
+
+    def _mutate(self, change) -> list:
+        """
+        Aplica uma alteração no catálogo e regrava o arquivo, com o catálogo bloqueado.
+
+        A função `change(data)` altera os dados carregados e retorna as quantidades
+        alteradas, como tuplas (produto, gênero, tipo, quantidade), para os índices.
+        """
+        with self.lock:
+            catalog = self._view()  # Com o bloqueio, o arquivo lido é o mais recente
+            data = catalog.to_dict()
+            touched = change(data)
+            data[VERSION_KEY] = catalog.version + 1
+            index, search = self._index, self._search
+            self._write(data)
+            self._index, self._search = index, search  # O próprio processo alterou o arquivo: mantém os índices
+        for row in touched:
+            self._touch(*row)
+        return touched
+
+    def set_price(self, product: str, gender: str, type: str, price: float) -> None:
+        self.set_prices([(product, gender, type, price)])
+
+    def set_prices(self, changes: list) -> None:
+        if self.in_place:
+            def compute(catalog):
+                rows = []
+                for product, gender, type, price in changes:
+                    index = catalog.find(product, gender, type)
+                    rows.append((index, product, gender, type, catalog.record(index)[0], price))
+                return rows
+            self._update(compute)
+            return
+
+        def change(data):
+            infos = [JsonStorage._find(data, product, gender, type) for product, gender, type, _ in changes]
+            for info, (_, _, _, price) in zip(infos, changes):
+                info['preco'] = price
+            return []
+        self._mutate(change)
+
+    def add_quantity(self, product: str, gender: str, type: str, delta: int) -> int:
+        if self.in_place:
+            def compute(catalog):
+                index = catalog.find(product, gender, type)
+                quantity, price = catalog.record(index)
+                return [(index, product, gender, type, max(quantity + delta, 0), price)]
+            return self._update(compute)[0][4]
+
+        def change(data):
+            info = JsonStorage._find(data, product, gender, type)
+            info['quantidade'] = max(info['quantidade'] + delta, 0)
+            return [(product, gender, type, info['quantidade'])]
+        return self._mutate(change)[0][3]
+
+    def insert(self, product: str, gender: str, type: str, quantity: int, price: float) -> None:
+        def change(data):
+            try:
+                bucket = data[product][gender]
+            except KeyError:
+                raise InvalidProduct("Produto não encontrado!")
+            if type in bucket:
+                raise ExistingProduct("Já existe este produto, tente adicionar quantidade ao estoque!")
+            bucket[type] = {'quantidade': quantity, 'preco': price}
+            return [(product, gender, type, quantity)]
+        self._mutate(change)
+
+    def upsert_many(self, rows: list, add_quantity: bool = False) -> None:
+        def change(data):
+            if add_quantity:
+                check_deltas(rows, lambda *sku: JsonStorage._find(data, *sku))
+            touched = []
+            for product, gender, type, quantity, price in rows:
+                bucket = data.setdefault(product, {}).setdefault(gender, {})
+                if add_quantity and type in bucket:
+                    quantity += bucket[type]['quantidade']
+                bucket[type] = {'quantidade': quantity, 'preco': price}
+                touched.append((product, gender, type, quantity))
+            return touched
+        self._mutate(change)
+
+    def apply_sale(self, lines: list) -> None:
+        if self.in_place:
+            def compute(catalog):
+                totals = check_sale(lines, self.get)
+                rows = []
+                for (product, gender, type), quantity in totals.items():
+                    index = catalog.find(product, gender, type)
+                    available, price = catalog.record(index)
+                    rows.append((index, product, gender, type, available - quantity, price))
+                return rows
+            self._update(compute)
+            return
+
+        def change(data):
+            totals = check_sale(lines, lambda *sku: JsonStorage._find(data, *sku))
+            touched = []
+            for (product, gender, type), quantity in totals.items():
+                info = JsonStorage._find(data, product, gender, type)
+                info['quantidade'] -= quantity
+                touched.append((product, gender, type, info['quantidade']))
+            return touched
+        self._mutate(change)
+
+
+def convert_json_to_binary(json_path: str = 'data.json', binary_path: str = 'data.bin') -> int:
+    """
+    Converte um catálogo JSON (formato data.json) para o formato binário.
+
+    Parâmetros:
+    - json_path (str): O arquivo JSON de origem.
+    - binary_path (str): O arquivo binário de destino; o conteúdo anterior é substituído.
+
+    Retorna:
+    - A quantidade de produtos convertidos.
+    """
+    data = JsonStorage(json_path).load()
+    write_binary(binary_path, data)
+    return sum(1 for _ in iter_catalog(data))
+
+
+def convert_binary_to_json(binary_path: str = 'data.bin', json_path: str = 'data.json') -> int:
+    """
+    Converte um catálogo binário para JSON (formato data.json), com a mesma versão.
+
+    Parâmetros:
+    - binary_path (str): O arquivo binário de origem.
+    - json_path (str): O arquivo JSON de destino; o conteúdo anterior é substituído.
+
+    Retorna:
+    - A quantidade de produtos convertidos.
+    """
+    catalog = BinaryCatalog(binary_path)
+    try:
+        data = catalog.to_dict()
+    finally:
+        catalog.close()
+    JsonStorage(json_path)._write(data)
+    return sum(1 for _ in iter_catalog(data))
+
+
+# _write regrava o arquivo inteiro; _update grava as alterações no mapeamento (in_place)
+metrics.instrument(BinaryStorage, ('load', 'save', '_write', '_update'), 'binary')
+
+
+if __name__ == '__main__':
+    # Uso: python -m services.products.controlers.binarystorage data.json data.bin
+    #      python -m services.products.controlers.binarystorage data.bin data.json
+    source = sys.argv[1] if len(sys.argv) > 1 else 'data.json'
+    to_json = source.endswith('.bin')
+    target = sys.argv[2] if len(sys.argv) > 2 else ('data.json' if to_json else 'data.bin')
+    convert = convert_binary_to_json if to_json else convert_json_to_binary
+    print(f'{convert(source, target)} produtos convertidos.')
@@ -0,0 +1,185 @@
+from .storage import Storage, check_sale, check_deltas
+from .productsexceptions import *
+
+class BufferedStorage(Storage):
+    """
+    Armazenamento em memória que grava as alterações em lote em outro armazenamento.
+
+    O catálogo é lido uma vez do armazenamento de origem (JsonStorage, SqliteStorage,
+    ...) e, a partir daí, leituras e alterações acontecem só na memória. Cada
+    produto alterado é marcado como pendente; flush grava todos os pendentes com
+    uma única chamada a upsert_many (uma escrita do arquivo, ou uma transação).
+
+    Pressupõe que este processo é o único a alterar o catálogo enquanto estiver
+    em uso, como no servidor HTTP: alterações feitas por outros processos na
+    origem não são vistas.
+
+    Atributos:
+    - backend (Storage): O armazenamento onde os lotes são gravados.
+
+    Métodos (além dos de Storage):
+    - pending(self) -> int: Quantidade de produtos alterados ainda não gravados.
+    - take_pending(self) -> list: Retira os pendentes, como linhas para upsert_many.
+    - restore_pending(self, rows): Devolve linhas que não puderam ser gravadas.
+    - rollback_pending(self): Desfaz na memória as alterações retiradas por take_pending.
+    - flush(self) -> int: Grava os pendentes na origem e retorna quantos foram gravados.
+    """
+
+    def __init__(self, backend: Storage) -> None:
+        self.backend = backend
+        self._data = self._copy(backend.load())
+        self._dirty = set()  # Exemplo: {('shampoo', 'masculino', 'Men shampoo')}
+        self._before = {}    # Valores antes da primeira alteração ainda não gravada (None se o produto é novo)
+        self._taken = {}     # Os mesmos valores, dos produtos retirados pelo último take_pending
+
+    @staticmethod
+    def _copy(data: dict) -> dict:
+        # Cópia própria: o dicionário da origem pode ser o do cache do catálogo
+        return {product: {gender: {type: dict(info) for type, info in products.items()}
+                          for gender, products in genders.items()}
+                for product, genders in data.items() if not product.startswith('_')}
+
+    def _find(self, product: str, gender: str, type: str) -> dict:
+        try:
+            return self._data[product][gender][type]
+        except KeyError:
+            raise InvalidProduct("Produto não encontrado!")
+
+    def _change(self, product: str, gender: str, type: str, bucket: dict) -> None:
+        """
+        Marca um produto como pendente, guardando antes o valor ainda não alterado.
+        """
+        key = (product, gender, type)
+        if key not in self._before:
+            info = bucket.get(type)
+            self._before[key] = dict(info) if info is not None else None
+        self._dirty.add(key)
+
+    def load(self) -> dict:
+        return self._data
+
+    def save(self, data: dict) -> None:
+        self.backend.save(data)
+        self._data = self._copy(self.backend.load())
+        self._dirty.clear()
+        self._before = {}
+        self._taken = {}
+        self._index = self._search = None
+
+    def get(self, product: str, gender: str, type: str) -> dict:
+        return self._find(product, gender, type)
+
+    def items(self, product: str, gender: str) -> list:
+        try:
+            return list(self._data[product][gender].items())
+        except KeyError:
+            return []
+
+    def set_price(self, product: str, gender: str, type: str, price: float) -> None:
+        info = self._find(product, gender, type)
+        self._change(product, gender, type, self._data[product][gender])
+        info['preco'] = price
+
+    def set_prices(self, changes: list) -> None:
+        # Confere todos os produtos antes de alterar qualquer preço
+        infos = [self._find(product, gender, type) for product, gender, type, _ in changes]
+        for info, (product, gender, type, price) in zip(infos, changes):
+            self._change(product, gender, type, self._data[product][gender])
+            info['preco'] = price
+
+    def add_quantity(self, product: str, gender: str, type: str, delta: int) -> int:
+        info = self._find(product, gender, type)
+        self._change(product, gender, type, self._data[product][gender])
+        info['quantidade'] = max(info['quantidade'] + delta, 0)
+        self._touch(product, gender, type, info['quantidade'])
+        return info['quantidade']
+
+    def insert(self, product: str, gender: str, type: str, quantity: int, price: float) -> None:
+        try:
+            bucket = self._data[product][gender]
+        except KeyError:
+            raise InvalidProduct("Produto não encontrado!")
+        if type in bucket:
+            raise ExistingProduct("Já existe este produto, tente adicionar quantidade ao estoque!")
+        self._change(product, gender, type, bucket)
+        bucket[type] = {'quantidade': quantity, 'preco': price}
+        self._touch(product, gender, type, quantity)
+
+    def upsert_many(self, rows: list, add_quantity: bool = False) -> None:
+        if add_quantity:
+            check_deltas(rows, self.get)
+        for product, gender, type, quantity, price in rows:
+            bucket = self._data.setdefault(product, {}).setdefault(gender, {})
+            if add_quantity and type in bucket:
+                quantity += bucket[type]['quantidade']
+            self._change(product, gender, type, bucket)
+            bucket[type] = {'quantidade': quantity, 'preco': price}
+            self._touch(product, gender, type, quantity)
+
+    def apply_sale(self, lines: list) -> None:
+        check_sale(lines, self.get)  # Valida todas as linhas antes de alterar qualquer estoque
+        for product, gender, type, quantity in lines:
+            self.add_quantity(product, gender, type, -quantity)
+
+    def compact(self) -> None:
+        self.flush()
+        self.backend.compact()
+
+    def pending(self) -> int:
+        return len(self._dirty)
+
+    def take_pending(self) -> list:
+        """
+        Retira os produtos pendentes, como linhas (produto, gênero, tipo, quantidade, preço).
+
+        As linhas têm os valores atuais, então podem ser gravadas fora da thread
+        principal enquanto novas alterações continuam na memória.
+        """
+        rows = []
+        for product, gender, type in self._dirty:
+            info = self._data[product][gender][type]
+            rows.append((product, gender, type, info['quantidade'], info['preco']))
+        self._dirty = set()
+        self._taken, self._before = self._before, {}
+        return rows
+
+    def restore_pending(self, rows: list) -> None:
+        """
+        Marca de novo como pendentes as linhas que não puderam ser gravadas.
+        """
+        self._dirty.update((product, gender, type) for product, gender, type, _, _ in rows)
+        for key, info in self._before.items():
+            self._taken.setdefault(key, info)  # Prevalece o valor mais antigo
+        self._before, self._taken = self._taken, {}
+
+    def rollback_pending(self) -> None:
+        """
+        Desfaz na memória as alterações retiradas pelo último take_pending, que
+        não puderam ser gravadas, voltando aos valores da última gravação.
+
+        Deve ser chamado antes de qualquer nova alteração.
+        """
+        for (product, gender, type), info in self._taken.items():
+            bucket = self._data[product][gender]
+            if info is None:
+                bucket.pop(type, None)  # Produto incluído no lote desfeito
+            else:
+                bucket[type] = info
+        self._taken = {}
+        self._index = self._search = None  # Os índices serão remontados a partir da memória
+
+    def flush(self) -> int:
+        """
+        Grava todos os produtos pendentes na origem, com uma única gravação.
+
+        Retorna:
+        - A quantidade de produtos gravados.
+        """
+        rows = self.take_pending()
+        if rows:
+            try:
+                self.backend.upsert_many(rows)
+            except Exception:
+                self.restore_pending(rows)
+                raise
+        return len(rows)
@@ -0,0 +1,134 @@
+import csv
+import json
+import math
+import os
+import sys
+from .productsexceptions import *
+
+# Colunas dos arquivos de importação e exportação
+FIELDS = ('produto', 'genero', 'nome', 'quantidade', 'preco')
+
+
+def detect_format(path: str, fmt: str = None) -> str:
+    """
+    Retorna o formato do arquivo ('csv' ou 'jsonl'), pelo parâmetro ou pela extensão.
+
+    Lança:
+    - ValueError se o formato não for reconhecido.
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt == 'json':
+        fmt = 'jsonl'
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError(f"Formato não suportado: {fmt!r} (use csv ou jsonl)")
+    return fmt
+
+
+def export_rows(products, path: str, fmt: str = None) -> int:
+    """
+    Grava os produtos em um arquivo CSV ou JSONL, uma linha por produto.
+
+    Os produtos são gravados à medida que são lidos, sem montar uma lista antes.
+
+    Parâmetros:
+    - products: Tuplas (produto, gênero, tipo, informações), como as de Storage.iter_products.
+    - path (str): O arquivo de destino.
+    - fmt (str): 'csv' ou 'jsonl'; se omitido, vem da extensão do arquivo.
+
+    Retorna:
+    - A quantidade de produtos exportados.
+    """
+    fmt = detect_format(path, fmt)
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        if fmt == 'csv':
+            writer = csv.writer(file)
+            writer.writerow(FIELDS)
+            for product, gender, type, info in products:
+                writer.writerow((product, gender, type, info['quantidade'], info['preco']))
+                count += 1
+        else:
+            for product, gender, type, info in products:
+                row = dict(zip(FIELDS, (product, gender, type, info['quantidade'], info['preco'])))
+                file.write(json.dumps(row, ensure_ascii=False) + '\n')
+                count += 1
+    return count
+
+
+def read_rows(path: str, fmt: str = None):
+    """
+    Lê um arquivo CSV ou JSONL linha a linha, validando cada produto.
+
+    Parâmetros:
+    - path (str): O arquivo de origem.
+    - fmt (str): 'csv' ou 'jsonl'; se omitido, vem da extensão do arquivo.
+
+    Retorna:
+    - Um gerador de tuplas (produto, gênero, tipo, quantidade, preço).
+
+    Lança:
+    - ValueError se alguma linha estiver incompleta ou com quantidade inválida.
+    - InvalidPrice se algum preço for 0 ou menor, ou não for um número finito (nan, inf).
+    """
+    fmt = detect_format(path, fmt)
+    with open(path, 'r', newline='', encoding='utf-8') as file:
+        if fmt == 'csv':
+            rows = csv.DictReader(file)
+        else:
+            rows = (json.loads(line) for line in file if line.strip())
+        for line_number, row in enumerate(rows, start=2 if fmt == 'csv' else 1):
+            try:
+                product, gender, type = row['produto'], row['genero'], row['nome']
+                quantity = int(row['quantidade'])
+                price = float(row['preco'])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"Linha {line_number} inválida: {row}")
+            if quantity < 0:
+                raise ValueError(f"Linha {line_number}: a quantidade não pode ser negativa!")
+            if not math.isfinite(price):  # float() aceita 'nan' e 'inf', e nan <= 0 é falso
+                raise InvalidPrice(f"Linha {line_number}: o preço precisa ser um número finito!")
+            if price <= 0:
+                raise InvalidPrice(f"Linha {line_number}: o preço não pode ser 0 ou menor!")
+            yield product, gender, type, quantity, price
+
+
+def import_rows(storage, path: str, fmt: str = None, batch_size: int = 50000, add_quantity: bool = False) -> int:
+    """
+    Importa um arquivo CSV ou JSONL para o armazenamento, em lotes.
+
+    Cada lote de `batch_size` linhas é gravado com uma única operação
+    (Storage.upsert_many), então a memória usada não depende do tamanho do arquivo.
+    Se uma linha for inválida, os lotes anteriores já estão gravados.
+
+    Parâmetros:
+    - storage (Storage): O armazenamento de destino.
+    - path (str): O arquivo de origem.
+    - fmt (str): 'csv' ou 'jsonl'; se omitido, vem da extensão do arquivo.
+    - batch_size (int): Quantidade de linhas por gravação.
+    - add_quantity (bool): Soma a quantidade ao estoque de produtos existentes em vez de substituí-la.
+
+    Retorna:
+    - A quantidade de linhas importadas.
+    """
+    count = 0
+    batch = []
+    for row in read_rows(path, fmt):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            storage.upsert_many(batch, add_quantity)
+            count += len(batch)
+            batch = []
+    if batch:
+        storage.upsert_many(batch, add_quantity)
+        count += len(batch)
+    return count
+
+
+if __name__ == '__main__':
+    # Uso: python -m services.products.controlers.catalogio (import|export) <arquivo.csv|arquivo.jsonl>
+    from .controller import Controller
+    command, path = sys.argv[1:3]
+    if command == 'export':
+        print(f'{Controller().export_catalog(path)} produtos exportados.')
+    else:
+        print(f'{Controller().import_catalog(path)} produtos importados.')
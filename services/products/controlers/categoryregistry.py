@@ -0,0 +1,159 @@
+from .productcontroller import *
+from .unitofwork import UnitOfWork
+
+class CategoryRegistry:
+    """
+    Classe CategoryRegistry com os tipos de produto e gêneros que existem no catálogo.
+
+    Os tipos e gêneros vêm do próprio catálogo, lidos de uma só vez, em vez de
+    classes e menus escritos à mão: um tipo ou gênero novo no catálogo aparece no
+    registro sem alterar o código. Os controladores (ProductController) são criados
+    sob demanda, um por (tipo, gênero), e reaproveitados.
+
+    As operações sobre o catálogo inteiro percorrem uma única vez uma única cópia
+    carregada, em vez de criar um controlador e ler o arquivo para cada par.
+
+    Métodos:
+    - refresh(self): Relê os tipos e gêneros do catálogo.
+    - categories(self) -> list: Os tipos de produto, na ordem do catálogo.
+    - genders(self, category) -> list: Os gêneros de um tipo de produto.
+    - pairs(self) -> list: Todos os pares (tipo, gênero).
+    - controller(self, category, gender) -> ProductController: O controlador de um par.
+    - out_of_stock(self) -> list: Produtos em falta de todo o catálogo, por par.
+    - valuation(self) -> dict: Unidades e valor do estoque, por par e no total.
+    - search(self, text, limit=10) -> list: Busca produtos pelo nome em todo o catálogo.
+    """
+
+    def __init__(self) -> None:
+        self._genders = None  # Exemplo: {'shampoo': ['masculino', 'feminino'], 'batom': ['unisex']}
+        self._controllers = {}  # Exemplo: {('shampoo', 'masculino'): ProductController(...)}
+        self._storage = None
+
+    def _current(self) -> dict:
+        """
+        Retorna os gêneros por tipo, relendo o catálogo na primeira vez ou se o
+        armazenamento do processo foi trocado (Controller.use_storage).
+        """
+        if self._genders is None or self._storage is not self._base_storage():
+            self.refresh()
+        return self._genders
+
+    @staticmethod
+    def _base_storage():
+        """
+        Retorna o armazenamento do processo; dentro de uma transação, o de origem.
+        """
+        storage = Controller().storage
+        return storage.backend if isinstance(storage, UnitOfWork) else storage
+
+    def refresh(self) -> None:
+        """
+        Relê os tipos e gêneros do catálogo e descarta os controladores criados.
+
+        Gêneros ainda sem produtos também entram, para que possam receber produtos novos.
+        """
+        self._storage = self._base_storage()
+        genders = {}
+        for product, products in self._storage.load().items():
+            if product.startswith('_'):
+                continue  # Chaves de controle, como '_versao'
+            genders[product] = list(products)
+        self._genders = genders
+        self._controllers = {}
+
+    def categories(self) -> list:
+        """
+        Retorna os tipos de produto, na ordem em que aparecem no catálogo.
+        """
+        return list(self._current())
+
+    def genders(self, category: str) -> list:
+        """
+        Retorna os gêneros de um tipo de produto (vazia se o tipo não existir).
+        """
+        return list(self._current().get(category, ()))
+
+    def pairs(self) -> list:
+        """
+        Retorna todos os pares (tipo, gênero) do catálogo.
+        """
+        return [(category, gender) for category, genders in self._current().items() for gender in genders]
+
+    def controller(self, category: str, gender: str) -> ProductController:
+        """
+        Retorna o controlador de um tipo e gênero, criando-o na primeira vez.
+
+        Se o par não estiver no registro, o catálogo é relido uma vez antes de
+        desistir (outro processo ou uma importação pode tê-lo incluído).
+
+        Lança:
+        - InvalidProduct se o tipo ou o gênero não existirem no catálogo.
+        """
+        key = (category, gender)
+        action = self._controllers.get(key)
+        if action is not None and self._storage is self._base_storage():
+            return action
+        if gender not in self._current().get(category, ()):
+            self.refresh()
+            if category not in self._genders:
+                raise InvalidProduct(f"Tipo de produto desconhecido: {category}")
+            if gender not in self._genders[category]:
+                raise InvalidProduct(f"Gênero desconhecido para {category}: {gender}")
+        action = self._controllers[key] = ProductController(gender, category)
+        return action
+
+    def out_of_stock(self) -> list:
+        """
+        Retorna os produtos em falta de todo o catálogo, na ordem dos pares.
+
+        Consulta o índice de estoque, montado em uma única passada pelo catálogo e
+        depois mantido pelas alterações.
+
+        Retorna:
+        - Uma lista de tuplas (tipo, gênero, nomes), só com os pares que têm produtos em falta.
+        """
+        zero = self._storage_for_scan().stock_index().all_zero()
+        ordered = [(category, gender, zero.pop((category, gender))) for category, gender in self.pairs()
+                   if (category, gender) in zero]
+        # Pares que entraram no catálogo depois da última leitura dos tipos
+        ordered.extend((category, gender, names) for (category, gender), names in zero.items())
+        return ordered
+
+    def valuation(self) -> dict:
+        """
+        Retorna as unidades e o valor do estoque de todo o catálogo, em uma única passada.
+
+        Retorna:
+        - Um dicionário com 'unidades', 'valor' e 'grupos' ({(tipo, gênero): {'unidades', 'valor'}}).
+        """
+        groups = {}
+        units = 0
+        cents = 0
+        for product, gender, type, info in self._storage_for_scan().iter_products():
+            group = groups.get((product, gender))
+            if group is None:
+                group = groups[(product, gender)] = [0, 0]
+            value = info['quantidade'] * round(info['preco'] * 100)  # Em centavos, sem erro de arredondamento
+            group[0] += info['quantidade']
+            group[1] += value
+            units += info['quantidade']
+            cents += value
+        return {'unidades': units, 'valor': cents / 100,
+                'grupos': {key: {'unidades': group[0], 'valor': group[1] / 100} for key, group in groups.items()}}
+
+    def search(self, text: str, limit: int = 10) -> list:
+        """
+        Busca produtos pelo nome em todo o catálogo (ver Controller.search).
+
+        Retorna:
+        - Uma lista de tuplas (tipo, gênero, nome).
+        """
+        return Controller().search(text, limit)
+
+    def _storage_for_scan(self):
+        """
+        Retorna o armazenamento atual do processo (com as alterações de uma
+        transação em andamento), relendo os tipos se ele foi trocado.
+        """
+        self._current()
+        return Controller().storage
@@ -0,0 +1,135 @@
+try:
+    import numpy as np
+except ImportError:  # O numpy é opcional: só é necessário para as análises em colunas
+    np = None
+
+class ColumnarSnapshot:
+    """
+    Classe ColumnarSnapshot com uma cópia do catálogo organizada em colunas (NumPy).
+
+    Cada produto ocupa a mesma posição em todos os vetores: quantidade e preço
+    (em centavos, inteiros) ficam em vetores contíguos e o tipo e o gênero viram
+    códigos inteiros pequenos. Assim, valor do estoque, filtros e somas por tipo
+    são operações vetorizadas, sem percorrer dicionários produto a produto.
+
+    É uma fotografia: alterações feitas no catálogo depois da criação não aparecem.
+
+    Atributos:
+    - names (list): Os nomes dos produtos, na ordem dos vetores.
+    - quantity (numpy.ndarray): Quantidades (int64).
+    - price_cents (numpy.ndarray): Preços em centavos (int64).
+    - category (numpy.ndarray): Código do tipo de produto (o menor inteiro sem sinal que comporta
+      todos os tipos: uint8 até 256), índice em `categories`.
+    - gender (numpy.ndarray): Código do gênero (como `category`), índice em `genders`.
+    - categories (list): Os tipos de produto, na ordem dos códigos.
+    - genders (list): Os gêneros, na ordem dos códigos.
+
+    Métodos:
+    - from_catalog(cls, products) -> ColumnarSnapshot: Monta a fotografia a partir do catálogo.
+    - mask(self, category=None, gender=None): Filtro booleano por tipo e gênero.
+    - total_value(self, category=None, gender=None) -> float: Valor total do estoque.
+    - units_by_category(self) -> dict: Unidades em estoque por tipo de produto.
+    - value_by_category(self) -> dict: Valor do estoque por tipo de produto.
+    - below(self, threshold, category=None, gender=None) -> list: Produtos abaixo de uma quantidade.
+    """
+
+    def __init__(self, names: list, quantity, price_cents, category, gender,
+                 categories: list, genders: list) -> None:
+        self.names = names
+        self.quantity = quantity
+        self.price_cents = price_cents
+        self.category = category
+        self.gender = gender
+        self.categories = categories
+        self.genders = genders
+
+    @classmethod
+    def from_catalog(cls, products) -> 'ColumnarSnapshot':
+        """
+        Monta a fotografia em colunas a partir do catálogo.
+
+        Parâmetros:
+        - products: Tuplas (produto, gênero, tipo, informações), como as de iter_catalog.
+
+        Lança:
+        - ImportError se o numpy não estiver instalado.
+        """
+        if np is None:
+            raise ImportError("O numpy é necessário para a análise em colunas: pip install numpy")
+        category_codes = {}
+        gender_codes = {}
+        names = []
+        quantities = []
+        prices = []
+        categories = []
+        genders = []
+        for product, gender, type, info in products:
+            names.append(type)
+            quantities.append(info['quantidade'])
+            prices.append(round(info['preco'] * 100))
+            categories.append(category_codes.setdefault(product, len(category_codes)))
+            genders.append(gender_codes.setdefault(gender, len(gender_codes)))
+        return cls(
+            names,
+            np.array(quantities, dtype=np.int64),
+            np.array(prices, dtype=np.int64),
+            # O tipo dos códigos depende de quantos valores existem: uint8 passaria de 255 para 0
+            np.array(categories, dtype=np.min_scalar_type(max(len(category_codes) - 1, 0))),
+            np.array(genders, dtype=np.min_scalar_type(max(len(gender_codes) - 1, 0))),
+            list(category_codes),
+            list(gender_codes),
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def mask(self, category: str = None, gender: str = None):
+        """
+        Retorna um filtro booleano com os produtos do tipo e gênero informados.
+
+        Um tipo ou gênero que não existe no catálogo não seleciona nenhum produto.
+        """
+        selected = np.ones(len(self.names), dtype=bool)
+        if category is not None:
+            if category not in self.categories:
+                return np.zeros(len(self.names), dtype=bool)
+            selected &= self.category == self.categories.index(category)
+        if gender is not None:
+            if gender not in self.genders:
+                return np.zeros(len(self.names), dtype=bool)
+            selected &= self.gender == self.genders.index(gender)
+        return selected
+
+    def total_value(self, category: str = None, gender: str = None) -> float:
+        """
+        Retorna o valor total do estoque (quantidade x preço), opcionalmente filtrado.
+        """
+        selected = self.mask(category, gender)
+        cents = np.dot(self.quantity[selected], self.price_cents[selected])
+        return int(cents) / 100
+
+    def units_by_category(self) -> dict:
+        """
+        Retorna as unidades em estoque de cada tipo de produto.
+        """
+        units = np.bincount(self.category, weights=self.quantity, minlength=len(self.categories))
+        return {name: int(units[code]) for code, name in enumerate(self.categories)}
+
+    def value_by_category(self) -> dict:
+        """
+        Retorna o valor do estoque de cada tipo de produto.
+        """
+        cents = np.bincount(self.category, weights=self.quantity * self.price_cents,
+                            minlength=len(self.categories))
+        return {name: int(cents[code]) / 100 for code, name in enumerate(self.categories)}
+
+    def below(self, threshold: int, category: str = None, gender: str = None) -> list:
+        """
+        Retorna os produtos com quantidade menor que `threshold`.
+
+        Retorna:
+        - Uma lista de tuplas (tipo de produto, gênero, nome, quantidade).
+        """
+        positions = np.flatnonzero(self.mask(category, gender) & (self.quantity < threshold))
+        return [(self.categories[self.category[i]], self.genders[self.gender[i]],
+                 self.names[i], int(self.quantity[i])) for i in positions]
@@ -1,52 +1,652 @@
-import json
-import os
+import contextlib
+import fnmatch
+import math
+from .storage import *
+from .unitofwork import UnitOfWork
+from .reservations import ReservationBook
+from .eventlog import EventLog, RECEIPT, SALE, ADJUSTMENT, PRICE, ADD
+from .salesledger import SalesLedger
+from .skutable import SkuTable
+from . import catalogio
+from . import metrics
 
 class Controller:
     """
-    Classe Controller para gerenciar a leitura e escrita de dados em um arquivo JSON.
-    
-    Esta classe fornece métodos para carregar dados de um arquivo JSON e salvar 
-    dados de volta no arquivo. Se o arquivo JSON não existir, ele será criado.
-    
+    Classe Controller para gerenciar a leitura e escrita dos dados do catálogo.
+
+    Os dados ficam em um armazenamento (Storage) compartilhado por todo o processo.
+    Por padrão é o arquivo 'data.json' (JsonStorage), com o catálogo interpretado
+    mantido em cache; outro armazenamento, como o SqliteStorage, pode ser escolhido
+    com use_storage. Se o arquivo JSON não existir, ele será criado.
+
+    Dentro de uma transação (Controller.transaction), o armazenamento do processo
+    é uma cópia de trabalho (UnitOfWork) gravada de uma só vez no fim.
+
+    Cada produto também tem um código inteiro estável (SKU, ver SkuTable): os
+    métodos *_by_id consultam quantidade e preço direto nos vetores da tabela de
+    códigos, mantidos a cada alteração feita pelos controladores.
+
+    As reservas de estoque dos carrinhos em aberto (ReservationBook) também são
+    compartilhadas pelo processo e ficam só em memória.
+
     Atributos:
-    - json_file (str): O nome do arquivo JSON usado para armazenar os dados.
-    
+    - storage (Storage): O armazenamento usado por todos os controladores.
+    - reservations (ReservationBook): As reservas de estoque do processo.
+    - events (EventLog): O histórico de movimentações, se ativado com enable_events.
+    - sales (SalesLedger): O livro de vendas, se ativado com enable_sales.
+    - skus (SkuTable): A tabela de códigos dos produtos, criada no primeiro uso (ou com enable_skus).
+
     Métodos:
-    - load_json(self): Carrega os dados do arquivo JSON.
-    - save_json(self, data): Salva os dados no arquivo JSON.
+    - load_json(self): Carrega o catálogo completo.
+    - save_json(self, data): Salva o catálogo completo.
+    - apply_sale(self, lines, owner=None, prices=None): Baixa o estoque de uma venda inteira de uma só vez.
+    - reorder_alerts(self) -> list: Produtos que atingiram o ponto de reposição.
+    - available(self, product, gender, type) -> int: Quantidade em estoque menos a reservada.
+    - reserve(self, owner, product, gender, type, quantity) -> int: Reserva unidades para um carrinho.
+    - release(self, owner, ...) -> int: Libera reservas de um carrinho.
+    - reprice(self, ...) -> int: Altera o preço de vários produtos com uma única gravação.
+    - search(self, text, limit=10, category=None, gender=None) -> list: Busca produtos pelo nome.
+    - sku_id(self, product, gender, type) -> int: O código (SKU) de um produto.
+    - sku(self, sku_id) -> tuple: O produto (produto, gênero, tipo) de um código.
+    - find_ids(self, name) -> list: Códigos dos produtos com um nome.
+    - group_ids(self, product, gender) -> list: Faixas de códigos de um tipo e gênero.
+    - stock_by_id(self, sku_id) -> int: Quantidade em estoque pelo código.
+    - price_by_id(self, sku_id) -> float: Preço pelo código.
+    - columnar_snapshot(self) -> ColumnarSnapshot: Fotografia do catálogo em colunas (NumPy).
+    - import_catalog(self, path, ...) -> int: Importa produtos de um arquivo CSV ou JSONL.
+    - export_catalog(self, path, fmt=None) -> int: Exporta o catálogo para CSV ou JSONL.
+    - compact(self): Incorpora alterações pendentes (log) ao armazenamento principal.
+    - transaction(cls) -> UnitOfWork: Agrupa várias alterações em uma única gravação (tudo ou nada).
+    - use_storage(cls, storage): Define o armazenamento usado pelo processo.
+    - enable_journal(cls, compact_every=1000): Ativa o modo com log no arquivo JSON.
+    - disable_journal(cls): Desativa o modo com log.
+    - enable_events(cls, path='data.events', snapshot_every=100000): Ativa o histórico de movimentações.
+    - disable_events(cls): Desativa o histórico de movimentações.
+    - enable_sales(cls, path='data.sales', ...) -> SalesLedger: Ativa o livro de vendas.
+    - disable_sales(cls): Desativa o livro de vendas.
+    - enable_skus(cls, path='data.skus') -> SkuTable: Define o arquivo dos códigos dos produtos.
+    - disable_skus(cls): Fecha a tabela de códigos.
+    - enable_metrics(cls, window=1024) -> MetricsRegistry: Ativa a instrumentação de desempenho.
+    - disable_metrics(cls): Desativa a instrumentação de desempenho.
+    - cache_stats() -> dict: Retorna os contadores do cache do catálogo.
     """
+    storage = None
+    reservations = None
+    events = None
+    sales = None
+    skus = None
+
     def __init__(self) -> None:
-        self._json_file = 'data.json'
-    
+        if Controller.storage is None:
+            Controller.storage = JsonStorage('data.json')
+        if Controller.reservations is None:
+            Controller.reservations = ReservationBook()
+        self._reservations = Controller.reservations
+
+    @property
+    def _storage(self) -> Storage:
+        """
+        O armazenamento atual do processo (a cópia de trabalho, dentro de uma transação).
+        """
+        return Controller.storage
+
+    def _after_commit(self, action) -> None:
+        """
+        Executa uma ação agora ou, dentro de uma transação, depois da gravação.
+        """
+        if isinstance(Controller.storage, UnitOfWork):
+            Controller.storage.after_commit(action)
+        else:
+            action()
+
 
     def load_json(self):
         """
-        Carrega os dados do arquivo JSON.
+        Carrega os dados do catálogo.
 
         Se o arquivo JSON não existir, cria um novo arquivo vazio e retorna um dicionário vazio.
 
         Retorna:
         - dict: Os dados carregados do arquivo JSON.
         """
-        # Verifica se o arquivo JSON existe
-        if os.path.exists(self._json_file):
-            # Abre o arquivo JSON e carrega os dados
-            with open(self._json_file, 'r') as file:
-                return json.load(file)
-        else:
-            # Se o arquivo não existir, cria um novo arquivo vazio
-            print("JSON file not found. Creating a new file.")
-            with open(self._json_file, 'w') as file:
-                json.dump({}, file)
-            return {}
+        return self._storage.load()
 
     def save_json(self, data):
         """
-        Salva os dados no arquivo JSON.
+        Salva os dados do catálogo.
 
         Parâmetros:
         - data (dict): Os dados a serem salvos no arquivo JSON.
         """
-        # Abre o arquivo JSON em modo de escrita e salva os dados
-        with open(self._json_file, 'w') as file:
-            json.dump(data, file, indent=4)
+        self._storage.save(data)
+
+    def apply_sale(self, lines: list, owner=None, prices: dict = None) -> None:
+        """
+        Baixa o estoque de todas as linhas de uma venda de uma só vez.
+
+        Todas as linhas são validadas antes de qualquer alteração; se alguma não
+        tiver estoque suficiente, nada é alterado. As baixas são gravadas com uma
+        única escrita atômica (ou uma única transação, no SQLite).
+
+        Com `owner`, a venda respeita as reservas dos outros carrinhos (só pode usar
+        o estoque disponível mais o reservado pelo próprio dono) e, depois da baixa,
+        as reservas do dono são liberadas.
+
+        Com o livro de vendas ativado, os itens da venda são registrados nele com
+        uma única escrita.
+
+        Parâmetros:
+        - lines (list): Tuplas (produto, gênero, tipo, quantidade),
+          ex. [('shampoo', 'masculino', 'Men shampoo', 2)].
+        - owner: O dono das reservas usadas pela venda (o carrinho).
+        - prices (dict): Preço unitário cobrado de cada produto, por (produto, gênero, tipo);
+          os que faltarem usam o preço atual do catálogo.
+
+        Lança:
+        - InvalidProduct se algum produto não for encontrado.
+        - InsufficientStock se algum produto não tiver estoque suficiente.
+        """
+        if owner is not None:
+            requested = {}
+            for product, gender, type, quantity in lines:
+                sku = (product, gender, type)
+                requested[sku] = requested.get(sku, 0) + quantity
+            for sku, quantity in requested.items():
+                # Unidades reservadas por outros carrinhos não podem ser vendidas
+                usable = self.available(*sku) + self._reservations.held(owner, sku)
+                if quantity > usable:
+                    raise InsufficientStock(f"Estoque insuficiente: {sku[2]} (pedido: {quantity}, disponível: {usable})")
+        self._storage.apply_sale(lines)
+        self._record(SALE, [line[:3] for line in lines])
+        if Controller.sales is not None:
+            prices = prices or {}
+            rows = []
+            for product, gender, type, quantity in lines:
+                sku = (product, gender, type)
+                price = prices[sku] if sku in prices else self._storage.get(*sku)['preco']
+                rows.append((product, gender, type, quantity, price))
+            sales = Controller.sales
+            self._after_commit(lambda: sales.record(rows))  # Uma única escrita para a venda inteira
+        if owner is not None:
+            self._after_commit(lambda: self._reservations.release(owner))
+
+    def reorder_alerts(self) -> list:
+        """
+        Retorna os produtos que ainda têm estoque, mas já atingiram o ponto de reposição
+        (pela velocidade de venda do livro de vendas), para avisar antes de zerarem.
+
+        Retorna:
+        - Uma lista de dicionários com 'produto' ((produto, gênero, tipo)), 'quantidade',
+          'velocidade', 'ponto_reposicao' e 'cobertura' (dias), da menor para a maior
+          cobertura; vazia se o livro de vendas não estiver ativado.
+        """
+        if Controller.sales is None:
+            return []
+
+        def stock(sku):
+            try:
+                return self._storage.get(*sku)['quantidade']
+            except InvalidProduct:
+                return None
+        return Controller.sales.alerts(stock)
+
+    def _record(self, kind: int, skus: list) -> None:
+        """
+        Registra no histórico (se ativado) o estado atual dos produtos alterados e
+        o atualiza nos vetores da tabela de códigos (se criada).
+
+        Parâmetros:
+        - kind (int): O tipo de movimentação (RECEIPT, SALE, ADJUSTMENT, PRICE ou ADD).
+        - skus (list): Tuplas (produto, gênero, tipo) dos produtos alterados.
+        """
+        if Controller.events is None and Controller.skus is None:
+            return
+        rows = []
+        for product, gender, type in skus:
+            info = self._storage.get(product, gender, type)
+            rows.append((product, gender, type, info['quantidade'], info['preco']))
+        if Controller.skus is not None:
+            table = Controller.skus
+            self._after_commit(lambda: table.update(rows))
+        if Controller.events is not None:
+            events = Controller.events
+            self._after_commit(lambda: events.record(kind, rows))
+
+    def available(self, product: str, gender: str, type: str) -> int:
+        """
+        Retorna a quantidade disponível de um produto: em estoque menos a reservada.
+
+        Consulta só o produto (na memória), sem reler o catálogo.
+
+        Lança:
+        - InvalidProduct se o produto não for encontrado.
+        """
+        on_hand = self._storage.get(product, gender, type)['quantidade']
+        return self._reservations.available((product, gender, type), on_hand)
+
+    def reserve(self, owner, product: str, gender: str, type: str, quantity: int) -> int:
+        """
+        Reserva unidades de um produto para um carrinho, renovando a validade da reserva.
+
+        Parâmetros:
+        - owner: O dono da reserva (o carrinho).
+        - product (str): O tipo de produto (shampoo, perfume, batom).
+        - gender (str): O gênero do produto.
+        - type (str): O nome do produto.
+        - quantity (int): A quantidade a reservar.
+
+        Retorna:
+        - O total reservado pelo dono para o produto.
+
+        Lança:
+        - InvalidProduct se o produto não for encontrado.
+        - InsufficientStock se não houver unidades disponíveis suficientes.
+        """
+        on_hand = self._storage.get(product, gender, type)['quantidade']
+        return self._reservations.reserve(owner, (product, gender, type), quantity, on_hand)
+
+    def release(self, owner, product: str = None, gender: str = None, type: str = None,
+                quantity: int = None) -> int:
+        """
+        Libera as reservas de um carrinho: de um produto (ou parte delas) ou todas.
+
+        Retorna:
+        - A quantidade de unidades liberadas.
+        """
+        sku = (product, gender, type) if type is not None else None
+        return self._reservations.release(owner, sku, quantity)
+
+    def reprice(self, percent: float = None, amount: float = None, prices: dict = None,
+                category: str = None, gender: str = None, pattern: str = None) -> int:
+        """
+        Altera o preço de vários produtos de uma só vez (remarcação em massa).
+
+        Informe exatamente uma forma de alteração: percentual, valor fixo ou um mapa
+        de preços. Os produtos podem ser filtrados por tipo, gênero e padrão de nome
+        (curingas como em 'Shampoo*', sem diferenciar maiúsculas). Todos os preços
+        novos são calculados e validados em memória e gravados de uma única vez:
+        se algum for inválido, nenhum preço é alterado.
+
+        Parâmetros:
+        - percent (float): Variação percentual (ex. 10 aumenta 10%, -15 reduz 15%).
+        - amount (float): Valor somado ao preço atual (pode ser negativo).
+        - prices (dict): Preço novo de cada produto, pelo nome (ex. {'Men shampoo': 18.9}).
+        - category (str): Filtra pelo tipo de produto (shampoo, perfume, batom).
+        - gender (str): Filtra pelo gênero.
+        - pattern (str): Filtra pelo nome do produto.
+
+        Retorna:
+        - A quantidade de produtos com preço alterado.
+
+        Lança:
+        - ValueError se não for informada exatamente uma forma de alteração.
+        - InvalidPrice se algum preço novo for 0 ou menor, ou não for um número finito (nan, inf).
+        """
+        if sum(option is not None for option in (percent, amount, prices)) != 1:
+            raise ValueError("Informe apenas um entre percent, amount e prices!")
+        pattern = pattern.lower() if pattern is not None else None
+        changes = []
+        for product, product_gender, type, info in self._storage.iter_products():
+            if category is not None and product != category:
+                continue
+            if gender is not None and product_gender != gender:
+                continue
+            if pattern is not None and not fnmatch.fnmatchcase(type.lower(), pattern):
+                continue
+            if prices is not None:
+                if type not in prices:
+                    continue
+                price = prices[type]
+            elif percent is not None:
+                price = info['preco'] * (1 + percent / 100)
+            else:
+                price = info['preco'] + amount
+            price = round(price, 2)
+            if not math.isfinite(price) or price <= 0:  # nan <= 0 é falso: sem isfinite, NaN seria gravado
+                raise InvalidPrice(f"O preço precisa ser um número maior que 0! ({type}: {price})")
+            changes.append((product, product_gender, type, price))
+        if changes:
+            self._storage.set_prices(changes)  # Uma única gravação para todas as alterações
+            self._record(PRICE, [change[:3] for change in changes])
+        return len(changes)
+
+    def search(self, text: str, limit: int = 10, category: str = None, gender: str = None) -> list:
+        """
+        Busca produtos pelo nome (ou parte dele) em todo o catálogo.
+
+        Aceita prefixos ('malb') e pequenos erros de digitação ('shampo'); os
+        resultados vêm do mais para o menos relevante. O índice de busca é montado
+        uma vez e atualizado a cada produto incluído.
+
+        Parâmetros:
+        - text (str): O texto digitado.
+        - limit (int): A quantidade máxima de resultados.
+        - category (str): Filtra pelo tipo de produto (shampoo, perfume, batom).
+        - gender (str): Filtra pelo gênero.
+
+        Retorna:
+        - Uma lista de tuplas (produto, gênero, tipo), ex. [('shampoo', 'masculino', 'Men shampoo')].
+        """
+        return self._storage.search_index().search(text, limit, category, gender)
+
+    def _skus(self) -> SkuTable:
+        """
+        Retorna a tabela de códigos, com os vetores lidos do armazenamento atual.
+
+        Os vetores são preenchidos em uma única passada pelo catálogo na primeira
+        vez e de novo só quando o armazenamento descarta o seu índice de estoque
+        (catálogo substituído ou alterado por outro processo); nas demais vezes,
+        as alterações dos controladores já os mantêm atualizados. A cada chamada,
+        stock_index confere antes se o armazenamento mudou (no JSON, uma consulta
+        à assinatura do arquivo; no SQLite, PRAGMA data_version).
+        """
+        if Controller.skus is None:
+            Controller.enable_skus()
+        table = Controller.skus
+        storage = self._storage
+        if not isinstance(storage, UnitOfWork):  # Na transação, os valores vêm da cópia de trabalho
+            index = storage.stock_index()
+            if table.source is not index:
+                table.refresh(storage.iter_products(), index)
+        return table
+
+    def sku_id(self, product: str, gender: str, type: str) -> int:
+        """
+        Retorna o código (SKU) de um produto, atribuindo-o se ainda não tiver.
+
+        Lança:
+        - InvalidProduct se o produto não for encontrado.
+        """
+        table = self._skus()
+        try:
+            return table.id_of(product, gender, type)
+        except InvalidProduct:
+            self._storage.get(product, gender, type)  # Lança InvalidProduct se o produto não existir
+            return table.assign([(product, gender, type)])[0]
+
+    def sku(self, sku_id: int) -> tuple:
+        """
+        Retorna o produto de um código, como (produto, gênero, tipo).
+
+        Lança:
+        - InvalidProduct se o código não existir.
+        """
+        return self._skus().key(sku_id)
+
+    def find_ids(self, name: str) -> list:
+        """
+        Retorna os códigos dos produtos com o nome informado (o mesmo nome pode
+        existir em tipos ou gêneros diferentes).
+        """
+        return self._skus().find(name)
+
+    def group_ids(self, product: str, gender: str) -> list:
+        """
+        Retorna as faixas (range) de códigos dos produtos de um tipo e gênero.
+        """
+        return self._skus().group(product, gender)
+
+    def stock_by_id(self, sku_id: int) -> int:
+        """
+        Retorna a quantidade em estoque de um produto pelo código, direto do vetor.
+
+        Lança:
+        - InvalidProduct se o código não existir ou o produto não estiver no catálogo.
+        """
+        table = self._skus()
+        if isinstance(self._storage, UnitOfWork):
+            return self._storage.get(*table.key(sku_id))['quantidade']
+        return table.stock(sku_id)
+
+    def price_by_id(self, sku_id: int) -> float:
+        """
+        Retorna o preço de um produto pelo código, direto do vetor.
+
+        Lança:
+        - InvalidProduct se o código não existir ou o produto não estiver no catálogo.
+        """
+        table = self._skus()
+        if isinstance(self._storage, UnitOfWork):
+            return self._storage.get(*table.key(sku_id))['preco']
+        return table.price(sku_id)
+
+    def columnar_snapshot(self) -> 'ColumnarSnapshot':
+        """
+        Retorna uma fotografia do catálogo inteiro em colunas, para análises vetorizadas
+        (valor do estoque, unidades por tipo, produtos abaixo de um limite).
+
+        Requer o numpy, que é opcional.
+
+        Lança:
+        - ImportError se o numpy não estiver instalado.
+        """
+        from .columnar import ColumnarSnapshot  # Importado só aqui: carregar o numpy atrasa a partida
+        return ColumnarSnapshot.from_catalog(self._storage.iter_products())
+
+    def import_catalog(self, path: str, fmt: str = None, batch_size: int = 50000, add_quantity: bool = False) -> int:
+        """
+        Importa produtos de um arquivo CSV ou JSONL (colunas produto, genero, nome,
+        quantidade, preco), incluindo os novos e atualizando os existentes.
+
+        O arquivo é lido linha a linha e gravado em lotes de `batch_size` produtos.
+
+        Parâmetros:
+        - path (str): O arquivo de origem.
+        - fmt (str): 'csv' ou 'jsonl'; se omitido, vem da extensão do arquivo.
+        - batch_size (int): Quantidade de produtos por gravação.
+        - add_quantity (bool): Soma a quantidade ao estoque existente em vez de substituí-la.
+
+        Retorna:
+        - A quantidade de produtos importados.
+        """
+        count = catalogio.import_rows(self._storage, path, fmt, batch_size, add_quantity)
+        if Controller.skus is not None:
+            table = Controller.skus
+            self._after_commit(lambda: setattr(table, 'source', None))  # Os vetores serão preenchidos de novo
+        if Controller.events is not None:
+            events = Controller.events
+            # Registra as diferenças como ajustes (dentro de uma transação, depois da gravação)
+            self._after_commit(lambda: events.reconcile(Controller.storage.iter_products()))
+        return count
+
+    def export_catalog(self, path: str, fmt: str = None) -> int:
+        """
+        Exporta o catálogo inteiro para um arquivo CSV ou JSONL, produto a produto.
+
+        Parâmetros:
+        - path (str): O arquivo de destino.
+        - fmt (str): 'csv' ou 'jsonl'; se omitido, vem da extensão do arquivo.
+
+        Retorna:
+        - A quantidade de produtos exportados.
+        """
+        return catalogio.export_rows(self._storage.iter_products(), path, fmt)
+
+    def compact(self) -> None:
+        """
+        Incorpora as alterações pendentes no log ao armazenamento principal.
+        """
+        self._storage.compact()
+
+    @classmethod
+    @contextlib.contextmanager
+    def transaction(cls):
+        """
+        Agrupa as alterações feitas pelos controladores em uma única gravação.
+
+        Dentro do bloco `with`, todas as alterações (de qualquer controlador do
+        processo) vão para uma cópia de trabalho em memória e as leituras já as
+        enxergam. Na saída, tudo é gravado de uma só vez (arquivo temporário,
+        fsync e troca atômica, ou uma transação no SQLite); se ocorrer uma exceção,
+        nada é gravado e a exceção é relançada. O histórico de movimentações, o
+        livro de vendas e a liberação de reservas só acontecem depois da gravação.
+
+        Transações aninhadas fazem parte da transação externa.
+
+        Na gravação, as baixas são conferidas de novo com a origem bloqueada; se
+        outro processo vendeu as mesmas unidades nesse meio tempo, nada é gravado e
+        é lançada ConcurrentModification.
+
+        Exemplo:
+            with Controller.transaction():
+                for name, quantity in delivery:
+                    shampoo.increase_quantity(name, quantity)
+
+        Retorna:
+        - O UnitOfWork da transação.
+        """
+        backend = Controller().storage
+        if isinstance(backend, UnitOfWork):
+            yield backend  # Já dentro de uma transação
+            return
+        work = UnitOfWork(backend)
+        Controller.storage = work
+        try:
+            yield work
+        finally:
+            Controller.storage = backend  # Ao desfazer, a cópia de trabalho é apenas descartada
+        work.commit()
+
+    @classmethod
+    def use_storage(cls, storage: Storage) -> None:
+        """
+        Define o armazenamento usado por todos os controladores do processo.
+
+        Parâmetros:
+        - storage (Storage): O novo armazenamento (JsonStorage, SqliteStorage, ...).
+        """
+        Controller.storage = storage
+
+    @classmethod
+    def enable_journal(cls, compact_every: int = 1000) -> None:
+        """
+        Ativa o modo com log para todos os controladores do processo.
+
+        Parâmetros:
+        - compact_every (int): Quantidade de registros que dispara a compactação.
+        """
+        cls.use_storage(JsonStorage('data.json', journaled=True, compact_every=compact_every))
+
+    @classmethod
+    def disable_journal(cls) -> None:
+        """
+        Desativa o modo com log, incorporando antes o log pendente ao snapshot.
+        """
+        if Controller.storage is not None:
+            Controller.storage.compact()
+        cls.use_storage(JsonStorage('data.json'))
+
+    @classmethod
+    def enable_events(cls, path: str = 'data.events', snapshot_every: int = 100000) -> EventLog:
+        """
+        Ativa o histórico binário de movimentações para todos os controladores do processo.
+
+        Produtos cujo estado no catálogo difere do histórico (todos, na primeira
+        vez) são registrados como ajustes, para que o histórico reconstrua o catálogo.
+
+        Parâmetros:
+        - path (str): O arquivo de eventos.
+        - snapshot_every (int): Quantidade de eventos entre snapshots.
+
+        Retorna:
+        - O EventLog ativado.
+        """
+        cls.disable_events()
+        events = EventLog(path, snapshot_every)
+        events.reconcile(Controller().storage.iter_products())
+        Controller.events = events
+        return events
+
+    @classmethod
+    def disable_events(cls) -> None:
+        """
+        Desativa o histórico de movimentações.
+        """
+        if Controller.events is not None:
+            Controller.events.close()
+            Controller.events = None
+
+    @classmethod
+    def enable_sales(cls, path: str = 'data.sales', window_days: int = 28, lead_time_days: float = 7,
+                     safety_days: float = 3, min_history_days: float = 7) -> SalesLedger:
+        """
+        Ativa o livro de vendas para todos os controladores do processo.
+
+        Parâmetros:
+        - path (str): O arquivo do livro de vendas.
+        - window_days (int): Janela (em dias) usada na velocidade de venda.
+        - lead_time_days (float): Prazo de entrega de uma reposição, em dias.
+        - safety_days (float): Dias de estoque de segurança no ponto de reposição.
+        - min_history_days (float): Dias de vendas registradas antes dos primeiros avisos de reposição.
+
+        Retorna:
+        - O SalesLedger ativado.
+        """
+        cls.disable_sales()
+        Controller.sales = SalesLedger(path, window_days, lead_time_days, safety_days, min_history_days)
+        return Controller.sales
+
+    @classmethod
+    def disable_sales(cls) -> None:
+        """
+        Desativa o livro de vendas.
+        """
+        if Controller.sales is not None:
+            Controller.sales.close()
+            Controller.sales = None
+
+    @classmethod
+    def enable_skus(cls, path: str = 'data.skus') -> SkuTable:
+        """
+        Define o arquivo dos códigos (SKU) dos produtos para todos os controladores do processo.
+
+        Sem esta chamada, a tabela é criada com 'data.skus' no primeiro uso de um código.
+
+        Retorna:
+        - A SkuTable ativada.
+        """
+        cls.disable_skus()
+        Controller.skus = SkuTable(path)
+        return Controller.skus
+
+    @classmethod
+    def disable_skus(cls) -> None:
+        """
+        Fecha a tabela de códigos dos produtos.
+        """
+        if Controller.skus is not None:
+            Controller.skus.close()
+            Controller.skus = None
+
+    @classmethod
+    def enable_metrics(cls, window: int = 1024) -> metrics.MetricsRegistry:
+        """
+        Ativa a instrumentação de desempenho (chamadas, tempos e bytes lidos e gravados)
+        de apply_sale, dos métodos do ProductController, do carrinho e da leitura e
+        gravação dos armazenamentos (JSON, binário e SQLite). Desativada, a
+        instrumentação não tem custo.
+
+        Parâmetros:
+        - window (int): Quantidade de durações recentes usadas nos percentis.
+
+        Retorna:
+        - O registro de métricas, com snapshot, to_json e to_prometheus.
+        """
+        return metrics.enable(window)
+
+    @classmethod
+    def disable_metrics(cls) -> None:
+        """
+        Desativa a instrumentação de desempenho, restaurando os métodos originais.
+        """
+        metrics.disable()
+
+    @staticmethod
+    def cache_stats() -> dict:
+        """
+        Retorna os contadores de acertos e falhas do cache do catálogo.
+        """
+        return catalog_cache.stats()
+
+
+metrics.instrument(Controller, ('apply_sale',), 'controller')
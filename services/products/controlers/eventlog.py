@@ -0,0 +1,291 @@
+import glob
+import os
+import struct
+import time
+from .skutable import SkuTable
+from .productsexceptions import *
+from . import metrics
+
+# Tipos de movimentação
+RECEIPT, SALE, ADJUSTMENT, PRICE, ADD = 1, 2, 3, 4, 5
+KINDS = {RECEIPT: 'entrada', SALE: 'venda', ADJUSTMENT: 'ajuste', PRICE: 'preco', ADD: 'inclusao'}
+
+# Registro de tamanho fixo: tipo, produto (id), momento (ms), variação, quantidade e preço (centavos) resultantes
+EVENT = struct.Struct('<BIqiqq')
+# Cabeçalho do snapshot: assinatura, quantidade de eventos incluídos, momento (ms) e quantidade de produtos
+SNAPSHOT_HEADER = struct.Struct('<4sQqI')
+SNAPSHOT_ROW = struct.Struct('<Iqq')
+SNAPSHOT_MAGIC = b'EVS1'
+
+# Tipos do numpy para os mesmos registros, definidos por _numpy
+EVENT_DTYPE = SNAPSHOT_DTYPE = None
+_np = False  # O numpy ainda não foi importado
+
+
+def _numpy():
+    """
+    Retorna o numpy, importado só na primeira reconstrução (carregá-lo atrasa a
+    partida do programa), ou None se não estiver instalado.
+    """
+    global _np, EVENT_DTYPE, SNAPSHOT_DTYPE
+    if _np is False:
+        try:
+            import numpy as np
+        except ImportError:  # O numpy é opcional: sem ele a reconstrução usa struct, mais devagar
+            np = None
+        if np is not None:
+            EVENT_DTYPE = np.dtype([('kind', 'u1'), ('sku', '<u4'), ('ts', '<i8'), ('delta', '<i4'),
+                                    ('quantity', '<i8'), ('price', '<i8')])
+            SNAPSHOT_DTYPE = np.dtype([('sku', '<u4'), ('quantity', '<i8'), ('price', '<i8')])
+        _np = np
+    return _np
+
+
+class EventLog:
+    """
+    Classe EventLog com o histórico binário de movimentações do estoque.
+
+    Cada movimentação (entrada, venda, ajuste, alteração de preço, inclusão) é
+    acrescentada ao arquivo como um registro binário de tamanho fixo (33 bytes) com
+    a variação e o estado resultante do produto (quantidade e preço). Os nomes
+    dos produtos ficam uma única vez em um arquivo ao lado ('.skus', uma SkuTable),
+    e os registros guardam só o número do produto; como na SkuTable, vários
+    processos podem gravar no mesmo histórico sem atribuir o mesmo número a
+    produtos diferentes.
+
+    Como cada registro tem o estado completo do produto, reconstruir o catálogo é
+    pegar o último registro de cada produto: com o numpy, o arquivo é lido direto
+    para um vetor e a reconstrução é vetorizada (dezenas de milhões de eventos por
+    segundo); sem ele, usa struct.iter_unpack.
+
+    A cada `snapshot_every` eventos é gravado um snapshot ('.<eventos>.snap') com
+    o estado de todos os produtos. A reconstrução parte do snapshot mais recente
+    anterior ao momento pedido e aplica só os eventos seguintes, então também
+    serve para ver o estoque em qualquer momento do passado.
+
+    Atributos:
+    - path (str): O arquivo de eventos.
+    - snapshot_every (int): Quantidade de eventos entre snapshots (0 desativa).
+
+    Métodos:
+    - record(self, kind, rows): Acrescenta movimentações ao histórico.
+    - reconcile(self, products) -> int: Registra como ajuste as diferenças para o catálogo.
+    - state(self) -> dict: Estado atual (quantidade e preço) de cada produto.
+    - replay(self, until=None) -> dict: Reconstrói o estado a partir dos arquivos, até um momento.
+    - replay_named(self, until=None) -> dict: Como replay, com os nomes dos produtos.
+    - history(self, product, gender, type) -> list: As movimentações de um produto.
+    - snapshot(self): Grava um snapshot do estado atual.
+    """
+
+    def __init__(self, path: str = 'data.events', snapshot_every: int = 100000, clock=time.time) -> None:
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self._clock = clock
+        self._skus = SkuTable(path + '.skus')  # Números dos produtos, atribuídos com bloqueio entre processos
+        self._state = self.replay()  # Começa do snapshot mais recente e aplica o restante do arquivo
+        self._count = self._event_count()
+        snapshots = self._snapshots()
+        self._since_snapshot = self._count - (snapshots[-1][0] if snapshots else 0)
+        self._file = open(path, 'ab')
+        self._file.truncate(self._count * EVENT.size)  # Descarta um registro incompleto no fim, se houver
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._file.close()
+        self._skus.close()
+
+    def _known_id(self, sku: tuple):
+        """
+        Retorna o número de um produto, ou None se ele ainda não tiver número.
+        """
+        try:
+            return self._skus.id_of(*sku)
+        except InvalidProduct:
+            return None
+
+    def _event_count(self) -> int:
+        return os.path.getsize(self.path) // EVENT.size if os.path.exists(self.path) else 0
+
+    def record(self, kind: int, rows: list) -> None:
+        """
+        Acrescenta movimentações ao histórico, com uma única escrita.
+
+        Parâmetros:
+        - kind (int): O tipo (RECEIPT, SALE, ADJUSTMENT, PRICE ou ADD).
+        - rows (list): Tuplas (produto, gênero, tipo, quantidade, preço), com a
+          quantidade e o preço resultantes; a variação é calculada a partir do
+          estado anterior do produto no histórico.
+        """
+        now = int(self._clock() * 1000)
+        # Os nomes novos vão para o disco (com uma única escrita) antes dos eventos que os usam
+        ids = self._skus.assign([row[:3] for row in rows])
+        records = []
+        for sku_id, (product, gender, type, quantity, price) in zip(ids, rows):
+            cents = round(price * 100)
+            previous = self._state.get(sku_id)
+            delta = quantity - (previous[0] if previous is not None else 0)
+            records.append(EVENT.pack(kind, sku_id, now, delta, quantity, cents))
+            self._state[sku_id] = (quantity, cents)
+        data = b''.join(records)
+        self._file.write(data)
+        self._file.flush()
+        if metrics.registry is not None:
+            metrics.registry.add_bytes('events', written=len(data))
+        self._count += len(records)
+        self._since_snapshot += len(records)
+        if self.snapshot_every and self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def reconcile(self, products) -> int:
+        """
+        Registra como ajuste cada produto do catálogo cujo estado difere do histórico.
+
+        Usado ao ativar o histórico (o catálogo inteiro vira o estado inicial) e
+        depois de alterações feitas por fora dos controladores, como importações.
+
+        Parâmetros:
+        - products: Tuplas (produto, gênero, tipo, informações), como as de iter_catalog.
+
+        Retorna:
+        - A quantidade de ajustes registrados.
+        """
+        rows = []
+        for product, gender, type, info in products:
+            sku_id = self._known_id((product, gender, type))
+            current = self._state.get(sku_id) if sku_id is not None else None
+            quantity, cents = info['quantidade'], round(info['preco'] * 100)
+            if current != (quantity, cents):
+                rows.append((product, gender, type, quantity, info['preco']))
+        if rows:
+            self.record(ADJUSTMENT, rows)
+        return len(rows)
+
+    def _named(self, state: dict) -> dict:
+        return {self._skus.key(sku_id): {'quantidade': quantity, 'preco': cents / 100}
+                for sku_id, (quantity, cents) in state.items()}
+
+    def state(self) -> dict:
+        """
+        Retorna o estado atual de cada produto registrado, sem ler os arquivos.
+
+        Retorna:
+        - Um dicionário {(produto, gênero, tipo): {'quantidade': ..., 'preco': ...}}.
+        """
+        return self._named(self._state)
+
+    def _snapshots(self) -> list:
+        """
+        Retorna (quantidade de eventos, caminho) de cada snapshot, em ordem.
+        """
+        snapshots = []
+        for path in glob.glob(glob.escape(self.path) + '.*.snap'):
+            try:
+                snapshots.append((int(path[len(self.path) + 1:-len('.snap')]), path))
+            except ValueError:
+                continue
+        return sorted(snapshots)
+
+    def _latest_snapshot(self, until: int = None) -> tuple:
+        """
+        Retorna (eventos incluídos, estado) do snapshot mais recente (anterior a `until`, em ms).
+        """
+        np = _numpy()
+        for count, path in reversed(self._snapshots()):
+            with open(path, 'rb') as file:
+                magic, events, timestamp, size = SNAPSHOT_HEADER.unpack(file.read(SNAPSHOT_HEADER.size))
+                if magic != SNAPSHOT_MAGIC or (until is not None and timestamp > until):
+                    continue
+                data = file.read(size * SNAPSHOT_ROW.size)
+            if np is not None:
+                rows = np.frombuffer(data, dtype=SNAPSHOT_DTYPE)
+                return events, dict(zip(rows['sku'].tolist(), zip(rows['quantity'].tolist(), rows['price'].tolist())))
+            return events, {sku_id: (quantity, cents) for sku_id, quantity, cents in SNAPSHOT_ROW.iter_unpack(data)}
+        return 0, {}
+
+    def snapshot(self) -> None:
+        """
+        Grava um snapshot do estado atual, com troca atômica do arquivo.
+        """
+        path = f'{self.path}.{self._count:012d}.snap'
+        rows = [SNAPSHOT_ROW.pack(sku_id, quantity, cents) for sku_id, (quantity, cents) in self._state.items()]
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, self._count, int(self._clock() * 1000), len(rows))
+        with open(path + '.tmp', 'wb') as file:
+            file.write(header + b''.join(rows))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(path + '.tmp', path)
+        self._since_snapshot = 0
+
+    def replay(self, until: float = None) -> dict:
+        """
+        Reconstrói o estado a partir dos arquivos: o snapshot mais recente mais os eventos seguintes.
+
+        Parâmetros:
+        - until (float): Momento (segundos desde a época, como time.time()) até o qual
+          os eventos são aplicados; se omitido, aplica todos.
+
+        Retorna:
+        - Um dicionário {número do produto: (quantidade, preço em centavos)}; use
+          replay_named para obter os nomes.
+        """
+        np = _numpy()
+        until_ms = int(until * 1000) if until is not None else None
+        start, state = self._latest_snapshot(until_ms)
+        if not os.path.exists(self.path):
+            return state
+        count = self._event_count() - start
+        if count <= 0:
+            return state
+        if np is not None:
+            events = np.fromfile(self.path, dtype=EVENT_DTYPE, count=count, offset=start * EVENT.size)
+            if metrics.registry is not None:
+                metrics.registry.add_bytes('events', read=events.nbytes)
+            if until_ms is not None:
+                # Os eventos são acrescentados em ordem de tempo: busca binária pelo corte
+                events = events[:np.searchsorted(events['ts'], until_ms, side='right')]
+            # Último evento de cada produto: o primeiro de cada um no vetor invertido
+            reversed_skus = events['sku'][::-1]
+            skus, positions = np.unique(reversed_skus, return_index=True)
+            last = events[len(events) - 1 - positions]
+            state.update(zip(skus.tolist(), zip(last['quantity'].tolist(), last['price'].tolist())))
+            return state
+        with open(self.path, 'rb') as file:
+            file.seek(start * EVENT.size)
+            data = file.read(count * EVENT.size)
+        if metrics.registry is not None:
+            metrics.registry.add_bytes('events', read=len(data))
+        for kind, sku_id, timestamp, delta, quantity, cents in EVENT.iter_unpack(data):
+            if until_ms is not None and timestamp > until_ms:
+                break
+            state[sku_id] = (quantity, cents)
+        return state
+
+    def replay_named(self, until: float = None) -> dict:
+        """
+        Como replay, mas com os produtos identificados por (produto, gênero, tipo).
+        """
+        return self._named(self.replay(until))
+
+    def history(self, product: str, gender: str, type: str) -> list:
+        """
+        Retorna as movimentações de um produto, da mais antiga para a mais recente.
+
+        Retorna:
+        - Uma lista de dicionários com tipo, momento (segundos), variação, quantidade e preço.
+        """
+        sku_id = self._known_id((product, gender, type))
+        if sku_id is None or not os.path.exists(self.path):
+            return []
+        np = _numpy()
+        if np is not None:
+            events = np.fromfile(self.path, dtype=EVENT_DTYPE, count=self._count)
+            rows = events[events['sku'] == sku_id].tolist()
+        else:
+            with open(self.path, 'rb') as file:
+                data = file.read(self._count * EVENT.size)
+            rows = [row for row in EVENT.iter_unpack(data) if row[1] == sku_id]
+        return [{'tipo': KINDS[kind], 'momento': timestamp / 1000, 'variacao': delta,
+                 'quantidade': quantity, 'preco': cents / 100}
+                for kind, _, timestamp, delta, quantity, cents in rows]
@@ -0,0 +1,107 @@
+import os
+import time
+from collections import deque
+from .productsexceptions import *
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class FileLock:
+    """
+    Classe FileLock para coordenar a escrita do catálogo entre processos.
+
+    Usa um bloqueio consultivo do sistema operacional (flock no Linux/macOS,
+    msvcrt.locking no Windows) sobre um arquivo '.lock' ao lado do catálogo.
+    A aquisição não bloqueia indefinidamente: tenta de novo em intervalos curtos
+    e desiste com LockTimeout depois de `timeout` segundos. O bloqueio é
+    reentrante dentro do mesmo objeto.
+
+    Atributos:
+    - path (str): O caminho do arquivo de bloqueio.
+    - timeout (float): Tempo máximo de espera pelo bloqueio, em segundos.
+    - hold_times (deque): Duração (em segundos) das últimas `history` vezes que o bloqueio foi mantido.
+    - hold_count (int): Quantas vezes o bloqueio foi mantido desde a criação.
+    - hold_total (float): Soma de todas as durações, em segundos.
+    - hold_max (float): A maior duração, em segundos.
+
+    Métodos:
+    - acquire(self): Obtém o bloqueio.
+    - release(self): Libera o bloqueio.
+    """
+
+    def __init__(self, path: str, timeout: float = 10.0, poll: float = 0.001, history: int = 4096) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._poll = poll
+        self._file = None
+        self._depth = 0
+        self._acquired_at = 0.0
+        # Só as durações mais recentes: processos longos (servidor, sessão interativa) não acumulam memória
+        self.hold_times = deque(maxlen=history)
+        self.hold_count = 0
+        self.hold_total = 0.0
+        self.hold_max = 0.0
+
+    def _try_lock(self) -> bool:
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self) -> None:
+        """
+        Obtém o bloqueio, esperando no máximo `timeout` segundos.
+
+        Lança:
+        - LockTimeout se outro processo mantiver o bloqueio por mais tempo que o limite.
+        """
+        if self._depth:
+            self._depth += 1
+            return
+        self._file = open(self.path, 'a+b')
+        deadline = time.monotonic() + self.timeout
+        delay = self._poll
+        while not self._try_lock():
+            if time.monotonic() >= deadline:
+                self._file.close()
+                self._file = None
+                raise LockTimeout(f"Não foi possível bloquear {self.path}: outro processo está gravando.")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)  # Espera crescente, limitada para não atrasar a retomada
+        self._depth = 1
+        self._acquired_at = time.perf_counter()
+
+    def release(self) -> None:
+        """
+        Libera o bloqueio.
+        """
+        self._depth -= 1
+        if self._depth:
+            return
+        held = time.perf_counter() - self._acquired_at
+        self.hold_times.append(held)
+        self.hold_count += 1
+        self.hold_total += held
+        self.hold_max = max(self.hold_max, held)
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
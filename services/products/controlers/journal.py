@@ -0,0 +1,114 @@
+import json
+import os
+from . import metrics
+
+class StockJournal:
+    """
+    Classe StockJournal para registrar alterações do estoque em um log só de acréscimo.
+
+    Cada alteração é gravada como uma linha JSON compacta ao final do arquivo de
+    log, então o custo de escrita não depende do tamanho do catálogo. Os registros
+    guardam o valor final (e não a diferença), por isso aplicá-los novamente sobre
+    um snapshot que já os contém não muda o resultado.
+
+    Formato dos registros:
+    - ["q", produto, gênero, tipo, quantidade]: Define a quantidade de um produto.
+    - ["p", produto, gênero, tipo, preço]: Define o preço de um produto.
+    - ["a", produto, gênero, tipo, quantidade, preço]: Adiciona um novo produto.
+
+    Métodos:
+    - extend(self, records): Grava vários registros com uma única escrita.
+    - replay(self, data): Aplica nos dados os registros ainda não lidos.
+    - is_current(self) -> bool: Verifica se o log não cresceu desde a última leitura.
+    - rewind(self): Faz a próxima leitura começar do início do log.
+    - truncate(self): Esvazia o log após a compactação.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._offset = 0  # Posição no log até onde os registros já foram aplicados
+        self.pending = 0  # Registros gravados desde a última compactação
+
+    def extend(self, records: list) -> None:
+        """
+        Grava vários registros ao final do log com uma única escrita.
+
+        Parâmetros:
+        - records (list): Os registros a serem gravados.
+        """
+        lines = ''.join(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n' for record in records)
+        with open(self._path, 'ab') as file:
+            data = lines.encode('utf-8')
+            file.write(data)
+            if metrics.registry is not None:
+                metrics.registry.add_bytes('journal', written=len(data))
+            self._offset = file.tell()
+        self.pending += len(records)
+
+    def replay(self, data: dict) -> int:
+        """
+        Aplica nos dados os registros gravados após a última leitura.
+
+        Parâmetros:
+        - data (dict): Os dados do snapshot a serem atualizados.
+
+        Retorna:
+        - A quantidade de registros aplicados.
+        """
+        applied = 0
+        if not os.path.exists(self._path) or os.path.getsize(self._path) <= self._offset:
+            return applied
+        with open(self._path, 'rb') as file:
+            file.seek(self._offset)
+            for line in file:
+                # Ignora uma última linha incompleta (gravação interrompida)
+                if not line.endswith(b'\n'):
+                    break
+                self._offset += len(line)
+                self.pending += 1
+                applied += 1
+                self.apply(data, json.loads(line))
+                if metrics.registry is not None:
+                    metrics.registry.add_bytes('journal', read=len(line))
+        return applied
+
+    @staticmethod
+    def apply(data: dict, record: list) -> None:
+        """
+        Aplica um único registro nos dados.
+
+        Parâmetros:
+        - data (dict): Os dados a serem atualizados.
+        - record (list): O registro a ser aplicado.
+        """
+        op, product, gender, type = record[:4]
+        data['_versao'] = data.get('_versao', 0) + 1  # Cada registro é uma nova versão do catálogo
+        if op == 'q':
+            data[product][gender][type]['quantidade'] = record[4]
+        elif op == 'p':
+            data[product][gender][type]['preco'] = record[4]
+        elif op == 'a':
+            data.setdefault(product, {}).setdefault(gender, {})[type] = {'quantidade': record[4], 'preco': record[5]}
+
+    def is_current(self) -> bool:
+        """
+        Verifica se nenhum outro processo gravou no log desde a última leitura.
+        """
+        size = os.path.getsize(self._path) if os.path.exists(self._path) else 0
+        return size == self._offset
+
+    def rewind(self) -> None:
+        """
+        Faz a próxima leitura começar do início do log (após recarregar o snapshot).
+        """
+        self._offset = 0
+        self.pending = 0
+
+    def truncate(self) -> None:
+        """
+        Esvazia o log depois que os registros foram incorporados ao snapshot.
+        """
+        with open(self._path, 'wb'):
+            pass
+        self._offset = 0
+        self.pending = 0
@@ -0,0 +1,271 @@
+import functools
+import json
+import threading
+import time
+from collections import deque
+
+# Registro ativo; None enquanto a instrumentação estiver desativada
+registry = None
+
+# Métodos instrumentáveis: (classe, nome do método, nome da métrica)
+_targets = []
+# Métodos originais substituídos ao ativar, para restaurar ao desativar
+_originals = []
+
+
+class Timer:
+    """
+    Classe Timer com as medições de um método instrumentado.
+
+    Guarda a quantidade de chamadas, o tempo total e os bytes lidos e gravados
+    durante as chamadas, além das últimas `window` durações, de onde saem os
+    percentis (p50, p95, p99) sem guardar todas as medições.
+
+    Atributos:
+    - count (int): Quantidade de chamadas.
+    - errors (int): Chamadas que terminaram com exceção.
+    - total (float): Tempo total, em segundos.
+    - max (float): A chamada mais demorada, em segundos.
+    - bytes_read (int): Bytes lidos do disco durante as chamadas.
+    - bytes_written (int): Bytes gravados no disco durante as chamadas.
+    """
+    __slots__ = ('count', 'errors', 'total', 'max', 'bytes_read', 'bytes_written', 'samples')
+
+    def __init__(self, window: int) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, seconds: float, failed: bool = False) -> None:
+        self.count += 1
+        self.errors += failed
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.samples.append(seconds)
+
+    def percentiles(self, fractions: tuple) -> dict:
+        samples = sorted(self.samples)
+        if not samples:
+            return {fraction: 0.0 for fraction in fractions}
+        return {fraction: samples[min(len(samples) - 1, int(len(samples) * fraction))] for fraction in fractions}
+
+
+class MetricsRegistry:
+    """
+    Classe MetricsRegistry com as métricas de desempenho do processo.
+
+    Cada método instrumentado tem um Timer com o seu nome (ex. 'json.load').
+    Os bytes lidos e gravados pelos armazenamentos são somados ao total de cada
+    arquivo ('json', 'journal', 'events') e a todas as chamadas instrumentadas em
+    andamento na thread: os bytes gravados por Cart.checkout aparecem em
+    'cart.checkout' e também nos métodos chamados por ele.
+
+    Atributos:
+    - window (int): Quantidade de durações recentes usadas nos percentis.
+    - timers (dict): Os Timer de cada método, pelo nome.
+    - io (dict): Bytes lidos e gravados de cada tipo de arquivo: {'json': [lidos, gravados]}.
+
+    Métodos:
+    - observe(self, name, seconds, failed=False): Registra uma chamada.
+    - add_bytes(self, kind, read=0, written=0): Registra bytes lidos ou gravados.
+    - snapshot(self) -> dict: As métricas atuais, com os percentis.
+    - to_json(self) -> str: As métricas em JSON.
+    - to_prometheus(self) -> str: As métricas no formato de texto do Prometheus.
+    - reset(self): Zera todas as métricas.
+    """
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, window: int = 1024) -> None:
+        self.window = window
+        self.timers = {}
+        self.io = {}
+        self._local = threading.local()  # Pilha de chamadas instrumentadas em andamento, por thread
+        self._lock = threading.Lock()
+
+    def _timer(self, name: str) -> Timer:
+        timer = self.timers.get(name)
+        if timer is None:
+            with self._lock:
+                timer = self.timers.setdefault(name, Timer(self.window))
+        return timer
+
+    def _active(self) -> list:
+        active = getattr(self._local, 'active', None)
+        if active is None:
+            active = self._local.active = []
+        return active
+
+    def observe(self, name: str, seconds: float, failed: bool = False) -> None:
+        """
+        Registra uma chamada de um método.
+
+        Parâmetros:
+        - name (str): O nome da métrica.
+        - seconds (float): A duração da chamada.
+        - failed (bool): Se a chamada terminou com exceção.
+        """
+        self._timer(name).observe(seconds, failed)
+
+    def add_bytes(self, kind: str, read: int = 0, written: int = 0) -> None:
+        """
+        Registra bytes lidos ou gravados em um arquivo.
+
+        Parâmetros:
+        - kind (str): O tipo de arquivo ('json', 'journal', 'events').
+        - read (int): Bytes lidos.
+        - written (int): Bytes gravados.
+        """
+        totals = self.io.get(kind)
+        if totals is None:
+            totals = self.io.setdefault(kind, [0, 0])
+        totals[0] += read
+        totals[1] += written
+        for timer in self._active():
+            timer.bytes_read += read
+            timer.bytes_written += written
+
+    def _called(self) -> list:
+        return [(name, timer) for name, timer in sorted(self.timers.items()) if timer.count]
+
+    def snapshot(self) -> dict:
+        """
+        Retorna as métricas atuais.
+
+        Retorna:
+        - Um dicionário com 'calls' (por método: chamadas, erros, tempos em ms e
+          bytes) e 'io' (bytes lidos e gravados de cada tipo de arquivo).
+        """
+        calls = {}
+        for name, timer in self._called():
+            percentiles = timer.percentiles(self.QUANTILES)
+            calls[name] = {
+                'count': timer.count,
+                'errors': timer.errors,
+                'total_ms': round(timer.total * 1000, 3),
+                'mean_ms': round(timer.total / timer.count * 1000, 3) if timer.count else 0.0,
+                **{f'p{round(fraction * 100)}_ms': round(value * 1000, 3) for fraction, value in percentiles.items()},
+                'max_ms': round(timer.max * 1000, 3),
+                'bytes_read': timer.bytes_read,
+                'bytes_written': timer.bytes_written,
+            }
+        io = {kind: {'bytes_read': read, 'bytes_written': written} for kind, (read, written) in sorted(self.io.items())}
+        return {'calls': calls, 'io': io}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        Retorna as métricas no formato de texto do Prometheus.
+
+        As durações são um 'summary' (inventory_call_seconds) com os percentis
+        das chamadas recentes; chamadas, erros e bytes são contadores.
+        """
+        lines = ['# HELP inventory_call_seconds Duração das chamadas instrumentadas.',
+                 '# TYPE inventory_call_seconds summary']
+        timers = self._called()
+        for name, timer in timers:
+            for fraction, value in timer.percentiles(self.QUANTILES).items():
+                lines.append(f'inventory_call_seconds{{method="{name}",quantile="{fraction}"}} {value:.9f}')
+            lines.append(f'inventory_call_seconds_sum{{method="{name}"}} {timer.total:.9f}')
+            lines.append(f'inventory_call_seconds_count{{method="{name}"}} {timer.count}')
+        lines += ['# HELP inventory_call_errors_total Chamadas instrumentadas que terminaram com exceção.',
+                  '# TYPE inventory_call_errors_total counter']
+        lines += [f'inventory_call_errors_total{{method="{name}"}} {timer.errors}' for name, timer in timers]
+        lines += ['# HELP inventory_call_bytes_total Bytes lidos e gravados durante as chamadas instrumentadas.',
+                  '# TYPE inventory_call_bytes_total counter']
+        for name, timer in timers:
+            lines.append(f'inventory_call_bytes_total{{method="{name}",direction="read"}} {timer.bytes_read}')
+            lines.append(f'inventory_call_bytes_total{{method="{name}",direction="written"}} {timer.bytes_written}')
+        lines += ['# HELP inventory_io_bytes_total Bytes lidos e gravados por tipo de arquivo.',
+                  '# TYPE inventory_io_bytes_total counter']
+        for kind, (read, written) in sorted(self.io.items()):
+            lines.append(f'inventory_io_bytes_total{{file="{kind}",direction="read"}} {read}')
+            lines.append(f'inventory_io_bytes_total{{file="{kind}",direction="written"}} {written}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        with self._lock:
+            for timer in self.timers.values():
+                timer.__init__(self.window)  # Os métodos instrumentados guardam o próprio Timer
+            self.io = {}
+
+
+def instrument(cls, names, prefix: str) -> None:
+    """
+    Declara métodos de uma classe como instrumentáveis.
+
+    Nada muda enquanto a instrumentação estiver desativada: os métodos só são
+    substituídos por versões medidas em enable (e restaurados em disable), então
+    o custo desativado é zero.
+
+    Parâmetros:
+    - cls: A classe.
+    - names: Os nomes dos métodos.
+    - prefix (str): O prefixo das métricas (ex. 'cart' gera 'cart.checkout').
+    """
+    for name in names:
+        _targets.append((cls, name, f'{prefix}.{name}'))
+    if registry is not None:
+        _wrap_targets(_targets[-len(names):])
+
+
+def _measured(function, name: str):
+    timer = registry._timer(name)
+    active = registry._active
+    clock = time.perf_counter
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        stack = active()
+        stack.append(timer)
+        start = clock()
+        failed = True
+        try:
+            result = function(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            timer.observe(clock() - start, failed)
+            stack.pop()
+    return wrapper
+
+
+def _wrap_targets(targets: list) -> None:
+    for cls, name, metric in targets:
+        original = cls.__dict__[name]
+        _originals.append((cls, name, original))
+        setattr(cls, name, _measured(original, metric))
+
+
+def enable(window: int = 1024) -> MetricsRegistry:
+    """
+    Ativa a instrumentação de todos os métodos declarados com instrument.
+
+    Parâmetros:
+    - window (int): Quantidade de durações recentes usadas nos percentis.
+
+    Retorna:
+    - O registro de métricas ativado.
+    """
+    global registry
+    disable()
+    registry = MetricsRegistry(window)
+    _wrap_targets(_targets)
+    return registry
+
+
+def disable() -> None:
+    """
+    Desativa a instrumentação, restaurando os métodos originais.
+    """
+    global registry
+    while _originals:
+        cls, name, original = _originals.pop()
+        setattr(cls, name, original)
+    registry = None
@@ -1,5 +1,7 @@
+import math
 from .controller import *
 from .productsexceptions import *
+from . import metrics
 
 class ProductController(Controller):
     """
@@ -9,6 +11,10 @@ class ProductController(Controller):
     permitindo editar preços, aumentar e diminuir quantidades, adicionar novos produtos,
     verificar produtos com quantidade zero e listar todos os produtos e seus detalhes.
 
+    Os métodos que recebem um produto (type) aceitam o nome ou o código inteiro
+    (SKU, ver Controller.sku_id); com o código, show_price e product_details leem
+    direto dos vetores da tabela de códigos.
+
     Métodos:
     - __init__(self, gender, product): Inicializa o controlador com o gênero e o produto específicos.
     - show_price(self, type: str) -> float: Retorna o preço do produto
@@ -16,9 +22,13 @@ class ProductController(Controller):
     - increase_quantity(self, type: str, quantity_increase: int) -> bool: Aumenta a quantidade de um tipo de produto.
     - decrease_quantity(self, type: str, quantity_decrease: int) -> bool: Diminui a quantidade de um tipo de produto.
     - add_product(self, type: str, quantity: int, price: float) -> bool: Adiciona um novo produto.
-    - check_zero_quantity(self) -> bool: Verifica produtos com quantidade zero.
+    - check_zero_quantity(self) -> list: Verifica produtos com quantidade zero.
+    - check_low_quantity(self) -> list: Verifica produtos com estoque baixo.
     - all_products(self) -> list: Retorna uma lista de todos os tipos de produtos.
     - all_products_details(self) -> list: Retorna uma lista com detalhes de todos os produtos.
+    - product_details(self, type: str) -> tuple: Retorna os detalhes de um produto.
+    - find_products(self, text: str, limit: int = 10) -> list: Busca produtos do gênero pelo nome.
+    - product_ids(self) -> list: Retorna os códigos de todos os produtos do gênero.
     """
     
     def __init__(self, gender, product) -> None:
@@ -33,12 +43,40 @@ class ProductController(Controller):
         self._gender = gender  # Gênero do produto
         self._product = product  # Tipo de produto
 
+    @property
+    def product(self) -> str:
+        """
+        O tipo de produto do controlador (shampoo, perfume, batom).
+        """
+        return self._product
+
+    @property
+    def gender(self) -> str:
+        """
+        O gênero do produto do controlador (masculino, feminino, etc.).
+        """
+        return self._gender
+
+    def _name(self, type) -> str:
+        """
+        Retorna o nome de um produto informado pelo nome ou pelo código.
+
+        Lança:
+        - InvalidProduct se o código não existir ou não for deste tipo e gênero.
+        """
+        if not isinstance(type, int):
+            return type
+        product, gender, name = self.sku(type)
+        if (product, gender) != (self._product, self._gender):
+            raise InvalidProduct(f"O código {type} não é de {self._product} {self._gender}!")
+        return name
+
     def show_price(self, type: str) -> float:
         """
         Retorna o preço de um produto.
         
         Parâmetros:
-        - type: O tipo específico de produto (ex. "Shampoo Anti-Caspa").
+        - type: O tipo específico de produto (ex. "Shampoo Anti-Caspa") ou o seu código (SKU).
         
         Retorna:
         - O preço do produto buscado
@@ -46,45 +84,41 @@ class ProductController(Controller):
         Lança:
         - InvalidProduct se o produto não for encontrado.
         """
-
-        data = self.load_json()  # Carrega os dados do arquivo JSON
-        try:
-            return data[self._product][self._gender][type]['preco'] # Retorna o preço do produto
-        except InvalidProduct:
-            raise InvalidProduct("Produto não encontrado!")  # Lança exceção se o produto não for encontrado
+        if isinstance(type, int):
+            self._name(type)
+            return self.price_by_id(type)  # Acesso direto ao vetor de preços
+        # Consulta apenas o produto buscado; lança InvalidProduct se ele não existir
+        return self._storage.get(self._product, self._gender, type)['preco']  # Retorna o preço do produto
 
     def edit_price(self, type: str, price: float) -> bool:
         """
         Edita o preço de um tipo de produto.
         
         Parâmetros:
-        - type: O tipo específico de produto (ex. "Shampoo Anti-Caspa").
+        - type: O tipo específico de produto (ex. "Shampoo Anti-Caspa") ou o seu código (SKU).
         - price: O novo preço a ser definido.
         
         Retorna:
         - True se o preço foi editado com sucesso.
         
         Lança:
-        - InvalidPrice se o preço for 0 ou menor.
+        - InvalidPrice se o preço for 0 ou menor, ou não for um número finito (nan, inf).
         - InvalidProduct se o produto não for encontrado.
         """
-        data = self.load_json()  # Carrega os dados do arquivo JSON
-        try:
-            if price > 0:
-                data[self._product][self._gender][type]['preco'] = price  # Atualiza o preço do produto
-                self.save_json(data)  # Salva os dados atualizados
-                return True
-            else:
-                raise InvalidPrice("O preço não pode ser 0 ou menor!")  # Lança exceção se o preço for inválido
-        except InvalidProduct:
-            raise InvalidProduct("Produto não encontrado!")  # Lança exceção se o produto não for encontrado
+        type = self._name(type)
+        if math.isfinite(price) and price > 0:
+            self._storage.set_price(self._product, self._gender, type, price)  # Atualiza o preço do produto
+            self._record(PRICE, [(self._product, self._gender, type)])
+            return True
+        else:
+            raise InvalidPrice("O preço não pode ser 0 ou menor!")  # Lança exceção se o preço for inválido
 
     def increase_quantity(self, type: str, quantity_increase: int) -> bool:
         """
         Aumenta a quantidade de um tipo de produto.
         
         Parâmetros:
-        - type: O tipo específico de produto (ex. "Shampoo Anti-Caspa").
+        - type: O tipo específico de produto (ex. "Shampoo Anti-Caspa") ou o seu código (SKU).
         - quantity_increase: A quantidade a ser adicionada.
         
         Retorna:
@@ -93,20 +127,17 @@ class ProductController(Controller):
         Lança:
         - InvalidProduct se o produto não for encontrado.
         """
-        data = self.load_json()  # Carrega os dados do arquivo JSON
-        try:
-            data[self._product][self._gender][type]['quantidade'] += quantity_increase  # Atualiza a quantidade do produto
-            self.save_json(data)  # Salva os dados atualizados
-            return True
-        except InvalidProduct:
-            raise InvalidProduct("Produto não encontrado!")  # Lança exceção se o produto não for encontrado
+        type = self._name(type)
+        self._storage.add_quantity(self._product, self._gender, type, quantity_increase)  # Atualiza a quantidade do produto
+        self._record(RECEIPT, [(self._product, self._gender, type)])
+        return True
 
     def decrease_quantity(self, type: str, quantity_decrease: int) -> bool:
         """
         Diminui a quantidade de um tipo de produto.
         
         Parâmetros:
-        - type: O tipo específico de produto (ex. "Shampoo Anti-Caspa").
+        - type: O tipo específico de produto (ex. "Shampoo Anti-Caspa") ou o seu código (SKU).
         - quantity_decrease: A quantidade a ser removida.
         
         Retorna:
@@ -115,21 +146,11 @@ class ProductController(Controller):
         Lança:
         - InvalidProduct se o produto não for encontrado.
         """
-        data = self.load_json()  # Carrega os dados do arquivo JSON
-        try:
-            current_quantity = data[self._product][self._gender][type]['quantidade']  # Quantidade atual do produto
-            if quantity_decrease >= current_quantity:
-                # Se a quantidade a ser removida for maior ou igual à quantidade atual, define a quantidade como 0
-                data[self._product][self._gender][type]['quantidade'] = 0
-                self.save_json(data)  # Salva os dados atualizados
-                return True
-            else:
-                # Caso contrário, subtrai a quantidade a ser removida
-                data[self._product][self._gender][type]['quantidade'] -= quantity_decrease
-                self.save_json(data)  # Salva os dados atualizados
-                return True
-        except InvalidProduct:
-            raise InvalidProduct("Produto não encontrado!")  # Lança exceção se o produto não for encontrado
+        type = self._name(type)
+        # Se a quantidade a ser removida for maior ou igual à quantidade atual, o armazenamento define a quantidade como 0
+        self._storage.add_quantity(self._product, self._gender, type, -quantity_decrease)
+        self._record(ADJUSTMENT, [(self._product, self._gender, type)])
+        return True
 
     def add_product(self, type: str, quantity: int, price: float) -> bool:
         """
@@ -147,38 +168,29 @@ class ProductController(Controller):
         - ExistingProduct se o produto já existir.
         - InvalidProduct se o produto não for encontrado.
         """
-        data = self.load_json()  # Carrega os dados do arquivo JSON
-        try:
-            if type not in data[self._product][self._gender]:
-                # Adiciona o novo produto se ele ainda não existir
-                data[self._product][self._gender][type] = {'quantidade': quantity, 'preco': price}
-                self.save_json(data)  # Salva os dados atualizados
-                return True
-            else:
-                raise ExistingProduct("Já existe este produto, tente adicionar quantidade ao estoque!")  # Lança exceção se o produto já existir
-        except InvalidProduct:
-            raise InvalidProduct("Produto inválido!")  # Lança exceção se o produto não for encontrado
+        # Lança ExistingProduct se o produto já existir
+        self._storage.insert(self._product, self._gender, type, quantity, price)  # Adiciona o novo produto
+        self._record(ADD, [(self._product, self._gender, type)])
+        return True
 
     def check_zero_quantity(self) -> list:
         """
         Verifica produtos com quantidade zero.
         
         Retorna:
-        - Uma lista de produtos com quantidade zero.
-        
-        Lança:
-        - InvalidProduct se o produto não for encontrado.
+        - Uma lista de produtos com quantidade zero (vazia se o gênero não existir).
+        """
+        # Consulta o índice de estoque mantido em memória, sem reler o catálogo
+        return self._storage.stock_index().zero(self._product, self._gender)
+
+    def check_low_quantity(self) -> list:
+        """
+        Verifica produtos com estoque baixo (maior que zero, mas no limite do índice de estoque).
+
+        Retorna:
+        - Uma lista de tuplas (tipo de produto, quantidade).
         """
-        data = self.load_json()  # Carrega os dados do arquivo JSON
-        zero_products = []
-        try:
-            # Itera sobre os produtos para verificar se a quantidade é zero
-            for product_type, product_info in data[self._product][self._gender].items():
-                if product_info['quantidade'] == 0:
-                    zero_products.append(product_type)
-            return zero_products
-        except:
-            raise InvalidProduct("Produto não encontrado!")  # Lança exceção se o produto não for encontrado
+        return self._storage.stock_index().low(self._product, self._gender)
 
     def all_products(self) -> list:
         """
@@ -187,10 +199,9 @@ class ProductController(Controller):
         Retorna:
         - Uma lista de strings, onde cada string é um tipo de produto.
         """
-        data = self.load_json()  # Carrega os dados do arquivo JSON
         products = []
         # Adiciona todos os tipos de produtos na lista
-        for product_type in data[self._product][self._gender]:
+        for product_type, _ in self._storage.items(self._product, self._gender):
             products.append(product_type)
         return products
 
@@ -201,9 +212,49 @@ class ProductController(Controller):
         Retorna:
         - Uma lista de tuplas, onde cada tupla contém o tipo de produto e suas informações.
         """
-        data = self.load_json()  # Carrega os dados do arquivo JSON
-        products = []
-        # Adiciona os detalhes de todos os produtos na lista
-        for product_type in data[self._product][self._gender].items():
-            products.append(product_type)
-        return products
+        # Retorna os detalhes de todos os produtos do gênero
+        return self._storage.items(self._product, self._gender)
+
+    def product_details(self, type: str) -> tuple:
+        """
+        Retorna os detalhes de um produto, no mesmo formato de all_products_details.
+
+        Parâmetros:
+        - type: O tipo específico de produto (ex. "Shampoo Anti-Caspa") ou o seu código (SKU).
+
+        Retorna:
+        - Uma tupla com o tipo de produto e suas informações.
+
+        Lança:
+        - InvalidProduct se o produto não for encontrado.
+        """
+        if isinstance(type, int):
+            name = self._name(type)
+            return name, {'quantidade': self.stock_by_id(type), 'preco': self.price_by_id(type)}
+        return type, self._storage.get(self._product, self._gender, type)
+
+    def find_products(self, text: str, limit: int = 10) -> list:
+        """
+        Busca produtos deste tipo e gênero pelo nome (ou parte dele).
+
+        Parâmetros:
+        - text: O texto digitado (aceita prefixos e pequenos erros de digitação).
+        - limit: A quantidade máxima de resultados.
+
+        Retorna:
+        - Uma lista com os nomes encontrados, do mais para o menos relevante.
+        """
+        return [type for _, _, type in self.search(text, limit, self._product, self._gender)]
+
+    def product_ids(self) -> list:
+        """
+        Retorna os códigos (SKU) de todos os produtos deste tipo e gênero, na ordem dos códigos.
+        """
+        ids = [self.sku_id(self._product, self._gender, type) for type, _ in self._storage.items(self._product, self._gender)]
+        return sorted(ids)
+
+
+metrics.instrument(ProductController, ('show_price', 'edit_price', 'increase_quantity', 'decrease_quantity',
+                                       'add_product', 'check_zero_quantity', 'check_low_quantity', 'all_products',
+                                       'all_products_details', 'product_details', 'find_products',
+                                       'product_ids'), 'product')
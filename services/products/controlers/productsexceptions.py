@@ -7,4 +7,13 @@ class ExistingProduct(Exception):
     pass
 
 class InvalidPrice(Exception):
+    pass
+
+class InsufficientStock(Exception):
+    pass
+
+class LockTimeout(Exception):
+    pass
+
+class ConcurrentModification(Exception):
     pass
\ No newline at end of file
@@ -0,0 +1,143 @@
+import heapq
+import itertools
+import time
+from .productsexceptions import *
+
+class ReservationBook:
+    """
+    Classe ReservationBook para reservar estoque para carrinhos em aberto.
+
+    Cada reserva pertence a um dono (um carrinho) e a um produto, identificado por
+    (produto, gênero, tipo), e vale por `ttl` segundos desde a última alteração.
+    O total reservado de cada produto fica em um dicionário, então a quantidade
+    disponível (em estoque menos reservado) custa O(1) por produto.
+
+    As reservas abandonadas expiram por um heap ordenado pelo vencimento: a cada
+    operação, as reservas vencidas no topo do heap são liberadas (sweep), sem
+    percorrer as demais. Renovar uma reserva apenas empilha o novo vencimento; a
+    entrada antiga é descartada quando chegar ao topo.
+
+    Atributos:
+    - ttl (float): Validade padrão das reservas, em segundos.
+
+    Métodos:
+    - reserve(self, owner, sku, quantity, on_hand, ttl=None) -> int: Reserva unidades de um produto.
+    - release(self, owner, sku=None, quantity=None) -> int: Libera reservas de um dono.
+    - reserved(self, sku) -> int: Total reservado de um produto.
+    - held(self, owner, sku) -> int: Quantidade reservada por um dono.
+    - available(self, sku, on_hand) -> int: Quantidade disponível de um produto.
+    - sweep(self) -> int: Libera as reservas vencidas.
+    """
+
+    def __init__(self, ttl: float = 900.0, clock=time.monotonic) -> None:
+        self.ttl = ttl
+        self._clock = clock
+        self._reserved = {}  # Exemplo: {('shampoo', 'masculino', 'Men shampoo'): 3}
+        self._holds = {}     # Exemplo: {(dono, ('shampoo', 'masculino', 'Men shampoo')): [2, vencimento]}
+        self._owners = {}    # Produtos reservados por cada dono: {dono: {sku, ...}}
+        self._heap = []      # Entradas (vencimento, ordem, (dono, sku))
+        self._order = itertools.count()  # Desempate no heap, sem comparar os donos
+
+    def sweep(self) -> int:
+        """
+        Libera as reservas vencidas.
+
+        Retorna:
+        - A quantidade de reservas liberadas.
+        """
+        now = self._clock()
+        expired = 0
+        while self._heap and self._heap[0][0] <= now:
+            expires, _, key = heapq.heappop(self._heap)
+            hold = self._holds.get(key)
+            if hold is not None and hold[1] == expires:  # Ignora entradas de reservas renovadas ou liberadas
+                self._drop(key)
+                expired += 1
+        return expired
+
+    def _drop(self, key: tuple, quantity: int = None) -> int:
+        hold = self._holds[key]
+        quantity = hold[0] if quantity is None or quantity >= hold[0] else quantity
+        hold[0] -= quantity
+        if hold[0] == 0:
+            del self._holds[key]
+            skus = self._owners[key[0]]
+            skus.discard(key[1])
+            if not skus:
+                del self._owners[key[0]]
+        sku = key[1]
+        self._reserved[sku] -= quantity
+        if self._reserved[sku] == 0:
+            del self._reserved[sku]
+        return quantity
+
+    def reserved(self, sku: tuple) -> int:
+        self.sweep()
+        return self._reserved.get(sku, 0)
+
+    def held(self, owner, sku: tuple) -> int:
+        self.sweep()
+        hold = self._holds.get((owner, sku))
+        return hold[0] if hold is not None else 0
+
+    def available(self, sku: tuple, on_hand: int) -> int:
+        """
+        Retorna a quantidade disponível de um produto: em estoque menos reservado.
+
+        Parâmetros:
+        - sku (tuple): O produto, como (produto, gênero, tipo).
+        - on_hand (int): A quantidade em estoque.
+        """
+        return max(on_hand - self.reserved(sku), 0)
+
+    def reserve(self, owner, sku: tuple, quantity: int, on_hand: int, ttl: float = None) -> int:
+        """
+        Reserva unidades de um produto para um dono, somando à reserva que ele já tiver.
+
+        A validade da reserva do dono para o produto é renovada.
+
+        Parâmetros:
+        - owner: O dono da reserva (por exemplo, o carrinho).
+        - sku (tuple): O produto, como (produto, gênero, tipo).
+        - quantity (int): A quantidade a reservar.
+        - on_hand (int): A quantidade em estoque.
+        - ttl (float): Validade em segundos (padrão: self.ttl).
+
+        Retorna:
+        - O total reservado pelo dono para o produto.
+
+        Lança:
+        - ValueError se a quantidade não for positiva.
+        - InsufficientStock se não houver unidades disponíveis suficientes.
+        """
+        if quantity <= 0:
+            raise ValueError("A quantidade precisa ser maior que 0!")
+        available = self.available(sku, on_hand)
+        if quantity > available:
+            raise InsufficientStock(f"Estoque insuficiente: {sku[2]} (pedido: {quantity}, disponível: {available})")
+        key = (owner, sku)
+        expires = self._clock() + (self.ttl if ttl is None else ttl)
+        hold = self._holds.setdefault(key, [0, expires])
+        self._owners.setdefault(owner, set()).add(sku)
+        hold[0] += quantity
+        hold[1] = expires
+        self._reserved[sku] = self._reserved.get(sku, 0) + quantity
+        heapq.heappush(self._heap, (expires, next(self._order), key))
+        return hold[0]
+
+    def release(self, owner, sku: tuple = None, quantity: int = None) -> int:
+        """
+        Libera reservas de um dono.
+
+        Parâmetros:
+        - owner: O dono da reserva.
+        - sku (tuple): O produto; se omitido, libera todas as reservas do dono.
+        - quantity (int): A quantidade a liberar; se omitida, libera a reserva inteira.
+
+        Retorna:
+        - A quantidade de unidades liberadas.
+        """
+        self.sweep()
+        if sku is not None:
+            return self._drop((owner, sku), quantity) if (owner, sku) in self._holds else 0
+        return sum(self._drop((owner, sku)) for sku in list(self._owners.get(owner, ())))
@@ -0,0 +1,184 @@
+import json
+import os
+import time
+
+DAY = 86400  # Segundos em um dia: as vendas são agregadas por dia
+
+
+class SalesLedger:
+    """
+    Classe SalesLedger com o livro de vendas e a previsão de reposição.
+
+    Cada venda finalizada é acrescentada ao arquivo como uma linha JSON compacta
+    por item, [momento, produto, gênero, tipo, quantidade, preço unitário], com
+    uma única escrita para a venda inteira.
+
+    Sobre o livro são mantidos agregados por janela: as vendas de cada dia ficam
+    em um balde ({dia: {produto: quantidade}}) e o total de cada produto nos
+    últimos `window_days` dias é atualizado a cada venda. Quando um dia sai da
+    janela, só o seu balde é descontado dos totais, então nenhuma consulta
+    percorre o histórico. O arquivo é lido uma única vez, ao abrir.
+
+    A previsão usa a velocidade de venda (unidades por dia na janela):
+    - ponto de reposição = velocidade × (prazo de entrega + dias de segurança);
+    - cobertura = quantidade em estoque / velocidade, em dias.
+    Enquanto o livro tiver menos de `min_history_days` dias, a velocidade ainda não
+    é confiável (a primeira venda valeria por um dia inteiro de vendas), então não
+    há ponto de reposição, cobertura nem avisos.
+
+    Atributos:
+    - path (str): O arquivo do livro de vendas.
+    - window_days (int): Tamanho da janela, em dias.
+    - lead_time_days (float): Prazo de entrega de uma reposição, em dias.
+    - safety_days (float): Dias de estoque de segurança.
+    - min_history_days (float): Dias de histórico necessários para prever a reposição.
+
+    Métodos:
+    - record(self, lines, when=None): Registra os itens de uma venda.
+    - velocity(self, sku) -> float: Unidades vendidas por dia na janela.
+    - forecast(self, sku, on_hand) -> dict: Velocidade, ponto de reposição e cobertura.
+    - alerts(self, stock) -> list: Produtos que atingiram o ponto de reposição.
+    - close(self): Fecha o arquivo.
+    """
+
+    def __init__(self, path: str = 'data.sales', window_days: int = 28, lead_time_days: float = 7,
+                 safety_days: float = 3, min_history_days: float = 7, clock=time.time) -> None:
+        self.path = path
+        self.window_days = window_days
+        self.lead_time_days = lead_time_days
+        self.safety_days = safety_days
+        self.min_history_days = min_history_days
+        self._clock = clock
+        self._days = {}       # Baldes da janela: {dia: {sku: quantidade}}
+        self._oldest = int(clock() // DAY) - window_days + 1  # Primeiro dia da janela
+        self._totals = {}     # Exemplo: {('shampoo', 'masculino', 'Men shampoo'): 12} (vendido na janela)
+        self._first = None    # Momento da primeira venda do livro
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    if not line.endswith('\n'):
+                        break  # Última linha incompleta (gravação interrompida)
+                    when, product, gender, type, quantity, _ = json.loads(line)
+                    self._add(when, (product, gender, type), quantity)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _expire(self, now: float) -> None:
+        """
+        Desconta dos totais os dias que saíram da janela (cada dia é descontado uma única vez).
+        """
+        oldest = int(now // DAY) - self.window_days + 1
+        if not self._days:
+            self._oldest = max(self._oldest, oldest)
+        while self._oldest < oldest:
+            for sku, quantity in self._days.pop(self._oldest, {}).items():
+                total = self._totals[sku] - quantity
+                if total:
+                    self._totals[sku] = total
+                else:
+                    del self._totals[sku]
+            self._oldest += 1
+
+    def _add(self, when: float, sku: tuple, quantity: int) -> None:
+        if self._first is None or when < self._first:
+            self._first = when
+        day = int(when // DAY)
+        if day < self._oldest:
+            return  # Venda anterior à janela
+        bucket = self._days.setdefault(day, {})
+        bucket[sku] = bucket.get(sku, 0) + quantity
+        self._totals[sku] = self._totals.get(sku, 0) + quantity
+
+    def record(self, lines: list, when: float = None) -> None:
+        """
+        Registra os itens de uma venda finalizada, com uma única escrita.
+
+        Parâmetros:
+        - lines (list): Tuplas (produto, gênero, tipo, quantidade, preço unitário).
+        - when (float): Momento da venda (segundos desde a época); padrão: agora.
+        """
+        when = round(self._clock() if when is None else when, 3)
+        self._file.write(''.join(json.dumps([when, *line], separators=(',', ':'), ensure_ascii=False) + '\n'
+                                 for line in lines))
+        self._file.flush()
+        self._expire(self._clock())
+        for product, gender, type, quantity, _ in lines:
+            self._add(when, (product, gender, type), quantity)
+
+    def _covered_days(self, now: float) -> float:
+        """
+        Dias cobertos pela janela: menos que `window_days` enquanto o livro for mais novo que a janela.
+        """
+        if self._first is None:
+            return float(self.window_days)
+        return min(float(self.window_days), max(1.0, (now - self._first) / DAY))
+
+    def _has_history(self, now: float) -> bool:
+        """
+        Verifica se o livro já tem os `min_history_days` dias de vendas necessários para a previsão.
+        """
+        return self._first is not None and (now - self._first) / DAY >= self.min_history_days
+
+    def velocity(self, sku: tuple) -> float:
+        """
+        Retorna a velocidade de venda de um produto: unidades por dia na janela.
+
+        Parâmetros:
+        - sku (tuple): O produto, como (produto, gênero, tipo).
+        """
+        now = self._clock()
+        self._expire(now)
+        return self._totals.get(sku, 0) / self._covered_days(now)
+
+    def forecast(self, sku: tuple, on_hand: int) -> dict:
+        """
+        Retorna a previsão de reposição de um produto.
+
+        Parâmetros:
+        - sku (tuple): O produto, como (produto, gênero, tipo).
+        - on_hand (int): A quantidade em estoque.
+
+        Retorna:
+        - Um dicionário com 'velocidade' (unidades por dia), 'ponto_reposicao'
+          (unidades) e 'cobertura' (dias de estoque; None se o produto não vende);
+          sem histórico suficiente, 'ponto_reposicao' e 'cobertura' são None.
+        """
+        velocity = self.velocity(sku)
+        if not self._has_history(self._clock()):
+            return {'velocidade': round(velocity, 3), 'ponto_reposicao': None, 'cobertura': None}
+        return {
+            'velocidade': round(velocity, 3),
+            'ponto_reposicao': round(velocity * (self.lead_time_days + self.safety_days), 1),
+            'cobertura': round(on_hand / velocity, 1) if velocity else None,
+        }
+
+    def alerts(self, stock) -> list:
+        """
+        Retorna os produtos que ainda têm estoque, mas já atingiram o ponto de reposição.
+
+        Só os produtos vendidos na janela são verificados (os demais não têm
+        velocidade), e só depois de `min_history_days` dias de histórico.
+
+        Parâmetros:
+        - stock: Função que retorna a quantidade em estoque de um produto (sku),
+          ou None se ele não existir mais.
+
+        Retorna:
+        - Uma lista de dicionários com 'produto' (sku), 'quantidade' e a previsão,
+          do produto com menos dias de cobertura para o com mais.
+        """
+        now = self._clock()
+        if not self._has_history(now):
+            return []
+        self._expire(now)
+        alerts = []
+        for sku in list(self._totals):
+            on_hand = stock(sku)
+            if not on_hand:
+                continue  # Produto removido ou já em falta (este aviso é o de estoque zero)
+            forecast = self.forecast(sku, on_hand)
+            if on_hand <= forecast['ponto_reposicao']:
+                alerts.append({'produto': sku, 'quantidade': on_hand, **forecast})
+        return sorted(alerts, key=lambda alert: alert['cobertura'])
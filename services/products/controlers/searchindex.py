@@ -0,0 +1,178 @@
+import bisect
+import heapq
+import re
+import unicodedata
+
+# Pontuação de cada forma de correspondência entre uma palavra da busca e uma palavra do nome
+EXACT, PREFIX, FUZZY = 3, 2, 1
+
+
+def normalize(text: str) -> list:
+    """
+    Retorna as palavras de um texto em minúsculas e sem acentos.
+
+    Exemplo: normalize('Perfume Maçã-Verde') -> ['perfume', 'maca', 'verde']
+    """
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+    return re.findall(r'[a-z0-9]+', text)
+
+
+def _trigrams(token: str) -> set:
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _distance(a: str, b: str, limit: int) -> int:
+    """
+    Distância de edição (inserção, remoção, troca e transposição) entre duas palavras.
+
+    Para assim que a distância passa de `limit`, retornando limit + 1.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SearchIndex:
+    """
+    Classe SearchIndex para buscar produtos pelo nome em todo o catálogo.
+
+    Cada nome é dividido em palavras normalizadas (minúsculas, sem acentos). O
+    índice guarda, para cada palavra, os produtos que a contêm; uma lista ordenada
+    das palavras, para buscar por prefixo com busca binária; e os trigramas de cada
+    palavra, para encontrar candidatas parecidas quando a busca tem erros de
+    digitação. Assim uma busca não percorre o catálogo, só as palavras candidatas.
+
+    Cada palavra da busca precisa corresponder a alguma palavra do nome, de forma
+    exata, como prefixo ou com poucos erros de digitação (1 erro a partir de 4
+    letras, 2 a partir de 8; palavras com números, como códigos, só exatas ou
+    por prefixo). Os resultados são ordenados pela soma das correspondências
+    (exata > prefixo > aproximada) e depois pelo nome mais curto.
+
+    Métodos:
+    - rebuild(self, products): Monta o índice a partir do catálogo completo.
+    - add(self, product, gender, type): Inclui um produto (sem efeito se já estiver no índice).
+    - search(self, text, limit=10, category=None, gender=None) -> list: Busca produtos pelo nome.
+    """
+
+    def __init__(self) -> None:
+        self._entries = {}   # Exemplo: {('shampoo', 'masculino', 'Men shampoo'): ('men', 'shampoo')}
+        self._postings = {}  # Exemplo: {'shampoo': {('shampoo', 'masculino', 'Men shampoo'), ...}}
+        self._tokens = []    # Palavras distintas, em ordem alfabética
+        self._grams = {}     # Exemplo: {' sh': {'shampoo', 'shine'}}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def rebuild(self, products) -> None:
+        """
+        Monta o índice a partir do catálogo completo.
+
+        Parâmetros:
+        - products: Tuplas (produto, gênero, tipo, informações), como as de iter_catalog.
+        """
+        self.__init__()
+        for product, gender, type, _ in products:
+            self._add((product, gender, type), False)
+        self._tokens = sorted(self._postings)  # Uma única ordenação, em vez de inserir palavra a palavra
+
+    def add(self, product: str, gender: str, type: str) -> None:
+        """
+        Inclui um produto no índice.
+
+        Parâmetros:
+        - product (str): O tipo de produto (shampoo, perfume, batom).
+        - gender (str): O gênero do produto.
+        - type (str): O nome do produto.
+        """
+        self._add((product, gender, type), True)
+
+    def _add(self, key: tuple, keep_sorted: bool) -> None:
+        if key in self._entries:
+            return
+        tokens = tuple(normalize(key[2]))
+        self._entries[key] = tokens
+        for token in tokens:
+            keys = self._postings.get(token)
+            if keys is None:
+                keys = self._postings[token] = set()
+                if keep_sorted:
+                    bisect.insort(self._tokens, token)
+                if token.isalpha():
+                    for gram in _trigrams(token):
+                        self._grams.setdefault(gram, set()).add(token)
+            keys.add(key)
+
+    def _matches(self, word: str) -> dict:
+        """
+        Retorna as palavras do índice que correspondem a uma palavra da busca, com a pontuação.
+        """
+        matches = {}
+        # Prefixo (inclui a própria palavra): faixa contígua da lista ordenada
+        for position in range(bisect.bisect_left(self._tokens, word), len(self._tokens)):
+            token = self._tokens[position]
+            if not token.startswith(word):
+                break
+            matches[token] = EXACT if token == word else PREFIX
+        # Erros de digitação: só palavras que compartilham algum trigrama com a busca
+        limit = 2 if len(word) >= 8 else 1 if len(word) >= 4 else 0
+        if limit and word.isalpha():
+            candidates = set()
+            for gram in _trigrams(word):
+                candidates.update(self._grams.get(gram, ()))
+            for token in candidates:
+                if token in matches:
+                    continue
+                # Compara com a palavra inteira e com o seu início, para aceitar buscas incompletas
+                if min(_distance(word, token, limit), _distance(word, token[:len(word)], limit)) <= limit:
+                    matches[token] = FUZZY
+        return matches
+
+    def search(self, text: str, limit: int = 10, category: str = None, gender: str = None) -> list:
+        """
+        Busca produtos pelo nome (ou parte dele).
+
+        Parâmetros:
+        - text (str): O texto digitado, ex. 'malb sham' ou 'shampo'.
+        - limit (int): A quantidade máxima de resultados.
+        - category (str): Filtra pelo tipo de produto.
+        - gender (str): Filtra pelo gênero.
+
+        Retorna:
+        - Uma lista de tuplas (produto, gênero, tipo), da mais para a menos relevante.
+        """
+        words = normalize(text)
+        if not words:
+            return []
+        scores = None
+        for word in words:
+            found = {}
+            for token, score in self._matches(word).items():
+                for key in self._postings[token]:
+                    if found.get(key, 0) < score:
+                        found[key] = score
+            if scores is None:
+                scores = found
+            else:
+                # Todas as palavras da busca precisam corresponder ao nome
+                scores = {key: scores[key] + score for key, score in found.items() if key in scores}
+            if not scores:
+                return []
+        results = (key for key in scores
+                   if (category is None or key[0] == category) and (gender is None or key[1] == gender))
+        return heapq.nsmallest(limit, results, key=lambda key: (-scores[key], len(key[2]), key[2]))
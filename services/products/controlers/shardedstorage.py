@@ -0,0 +1,211 @@
+import os
+import sys
+from .storage import Storage, JsonStorage, check_sale, check_deltas, iter_catalog
+from .stockindex import StockIndex
+from .searchindex import SearchIndex
+from .productsexceptions import *
+
+class ShardedJsonStorage(Storage):
+    """
+    Armazenamento JSON dividido em um arquivo (shard) por tipo de produto.
+
+    Cada shard tem o mesmo formato de data.json, mas só com o seu tipo de produto
+    (por exemplo 'data/shampoo.json'), ou só com um tipo e gênero quando
+    per_gender=True ('data/shampoo.masculino.json'). Cada shard é um JsonStorage
+    próprio, com cache, bloqueio e contador de versão, então um controlador como
+    Shampoo('masculino') lê e regrava apenas o seu shard.
+
+    Operações que cobrem o catálogo inteiro (load, iter_products, índice de
+    estoque) percorrem todos os shards do diretório. Uma venda com produtos de
+    shards diferentes bloqueia todos os shards envolvidos (sempre na mesma ordem)
+    e valida todas as linhas antes de gravar; cada shard é então gravado
+    separadamente.
+
+    Atributos:
+    - directory (str): O diretório dos shards.
+    - per_gender (bool): Se há um shard por tipo e gênero em vez de um por tipo.
+    """
+
+    def __init__(self, directory: str = 'data', per_gender: bool = False, **options) -> None:
+        self.directory = directory
+        self.per_gender = per_gender
+        self._options = options  # Repassadas a cada JsonStorage (journaled, compact_every, ...)
+        self._shards = {}
+        self._stamp = None  # Shards e releituras de cada um quando os índices foram conferidos
+        os.makedirs(directory, exist_ok=True)
+
+    def _shard_path(self, product: str, gender: str) -> str:
+        name = f'{product}.{gender}.json' if self.per_gender else f'{product}.json'
+        return os.path.join(self.directory, name)
+
+    def _shard(self, product: str, gender: str, create: bool = False) -> JsonStorage:
+        """
+        Retorna o shard de um tipo (e gênero) de produto.
+
+        Lança:
+        - InvalidProduct se o shard não existir e `create` for False.
+        """
+        path = self._shard_path(product, gender)
+        shard = self._shards.get(path)
+        if shard is None:
+            if not create and not os.path.exists(path):
+                raise InvalidProduct("Produto não encontrado!")
+            shard = self._shards[path] = JsonStorage(path, **self._options)
+            if not os.path.exists(path):
+                shard.save({product: {gender: {}}})
+        return shard
+
+    def _all_shards(self) -> list:
+        """
+        Retorna todos os shards existentes no diretório, em ordem de nome.
+        """
+        shards = []
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            if path not in self._shards:
+                self._shards[path] = JsonStorage(path, **self._options)
+            shards.append(self._shards[path])
+        return shards
+
+    def load(self) -> dict:
+        data = {}
+        for shard in self._all_shards():
+            for product, genders in shard.load().items():
+                if product.startswith('_'):
+                    continue  # Chaves de controle (como '_versao') são de cada shard
+                data.setdefault(product, {}).update(genders)
+        return data
+
+    def iter_products(self):
+        for shard in self._all_shards():
+            yield from iter_catalog(shard.load())
+
+    def _check_shards(self) -> None:
+        """
+        Descarta os índices se algum shard foi alterado por outro processo, ou se
+        shards foram criados ou removidos, como JsonStorage.stock_index faz com o seu arquivo.
+        """
+        shards = self._all_shards()
+        for shard in shards:
+            shard.load()  # Só uma consulta ao cache se o shard não mudou
+        stamp = tuple((shard.path, shard.reloads) for shard in shards)
+        if stamp != self._stamp:
+            self._stamp = stamp
+            self._index = self._search = None
+
+    def stock_index(self) -> StockIndex:
+        self._check_shards()
+        return super().stock_index()
+
+    def search_index(self) -> SearchIndex:
+        self._check_shards()
+        return super().search_index()
+
+    def save(self, data: dict) -> None:
+        shards = {}
+        for product, genders in data.items():
+            if product.startswith('_'):
+                continue
+            for gender, products in genders.items():
+                path = self._shard_path(product, gender)
+                # Copia os produtos: cada shard fica em cache com dicionários próprios
+                bucket = {type: dict(info) for type, info in products.items()}
+                shards.setdefault(path, (product, gender, {}))[2].setdefault(product, {})[gender] = bucket
+        for product, gender, shard_data in shards.values():
+            self._shard(product, gender, create=True).save(shard_data)
+        self._index = self._search = None
+
+    def get(self, product: str, gender: str, type: str) -> dict:
+        return self._shard(product, gender).get(product, gender, type)
+
+    def items(self, product: str, gender: str) -> list:
+        return self._shard(product, gender).items(product, gender)
+
+    def set_price(self, product: str, gender: str, type: str, price: float) -> None:
+        self._shard(product, gender).set_price(product, gender, type, price)
+
+    def set_prices(self, changes: list) -> None:
+        groups = {}
+        for change in changes:
+            groups.setdefault(self._shard_path(change[0], change[1]), []).append(change)
+        for group in groups.values():
+            self._shard(group[0][0], group[0][1]).set_prices(group)
+
+    def add_quantity(self, product: str, gender: str, type: str, delta: int) -> int:
+        quantity = self._shard(product, gender).add_quantity(product, gender, type, delta)
+        self._touch(product, gender, type, quantity)
+        return quantity
+
+    def insert(self, product: str, gender: str, type: str, quantity: int, price: float) -> None:
+        self._shard(product, gender).insert(product, gender, type, quantity, price)
+        self._touch(product, gender, type, quantity)
+
+    def upsert_many(self, rows: list, add_quantity: bool = False) -> None:
+        groups = {}
+        for row in rows:
+            groups.setdefault(self._shard_path(row[0], row[1]), []).append(row)
+        shards = [(self._shard(group[0][0], group[0][1], create=True), group) for _, group in sorted(groups.items())]
+        locked = []
+        try:
+            # Como em apply_sale: com todos os shards bloqueados, nenhuma baixa é gravada pela metade
+            for shard, _ in shards:
+                shard.lock.acquire()
+                locked.append(shard)
+            if add_quantity:
+                check_deltas(rows, self.get)
+            for shard, group in shards:
+                shard.upsert_many(group, add_quantity)
+        finally:
+            for shard in reversed(locked):
+                shard.lock.release()
+        self._index = self._search = None
+
+    def apply_sale(self, lines: list) -> None:
+        groups = {}
+        for line in lines:
+            groups.setdefault(self._shard_path(line[0], line[1]), []).append(line)
+        shards = [(path, self._shard(group[0][0], group[0][1]), group) for path, group in sorted(groups.items())]
+        locked = []
+        try:
+            # Bloqueia os shards sempre em ordem de nome, para que duas vendas não se bloqueiem mutuamente
+            for _, shard, _ in shards:
+                shard.lock.acquire()
+                locked.append(shard)
+            check_sale(lines, self.get)  # Valida todas as linhas antes de gravar qualquer shard
+            for _, shard, group in shards:
+                shard.apply_sale(group)
+        finally:
+            for shard in reversed(locked):
+                shard.lock.release()
+        for product, gender, type, _ in lines:
+            self._touch(product, gender, type, self.get(product, gender, type)['quantidade'])
+
+    def compact(self) -> None:
+        for shard in self._all_shards():
+            shard.compact()
+
+
+def migrate_to_shards(json_path: str = 'data.json', directory: str = 'data', per_gender: bool = False) -> int:
+    """
+    Divide um catálogo JSON monolítico (formato data.json) em shards por tipo de produto.
+
+    Parâmetros:
+    - json_path (str): O arquivo JSON de origem (não é alterado).
+    - directory (str): O diretório de destino dos shards.
+    - per_gender (bool): Cria um shard por tipo e gênero em vez de um por tipo.
+
+    Retorna:
+    - A quantidade de produtos migrados.
+    """
+    data = JsonStorage(json_path).load()
+    ShardedJsonStorage(directory, per_gender).save(data)
+    return sum(1 for _ in iter_catalog(data))
+
+
+if __name__ == '__main__':
+    # Uso: python -m services.products.controlers.shardedstorage [data.json] [diretório] [--per-gender]
+    arguments = [argument for argument in sys.argv[1:] if argument != '--per-gender']
+    total = migrate_to_shards(*arguments[:2], per_gender='--per-gender' in sys.argv)
+    print(f'{total} produtos migrados.')
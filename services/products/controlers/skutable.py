@@ -0,0 +1,213 @@
+import json
+import os
+from array import array
+from .filelock import FileLock
+from .productsexceptions import *
+
+ABSENT = -1  # Quantidade de um código cujo produto não está no catálogo atual
+
+
+class SkuTable:
+    """
+    Classe SkuTable com os códigos inteiros (SKU) dos produtos e o estoque em vetores.
+
+    Cada produto (produto, gênero, tipo) recebe um código inteiro denso e estável:
+    0, 1, 2, ... na ordem em que foi visto pela primeira vez. Os códigos ficam em
+    um arquivo só de acréscimo, uma linha JSON [produto, gênero, tipo] por código
+    (o número da linha é o código), então não mudam entre execuções nem quando o
+    catálogo é reordenado. Vários processos podem atribuir códigos: a atribuição é
+    feita com o bloqueio '<arquivo>.lock', depois de ler as linhas gravadas pelos outros.
+
+    A quantidade e o preço (em centavos) de cada produto ficam em vetores
+    (array) indexados pelo código, então consultar um produto pelo código é um
+    acesso direto, sem montar chaves nem percorrer dicionários.
+
+    Índices mantidos:
+    - nome -> códigos (o mesmo nome pode existir em tipos ou gêneros diferentes);
+    - (produto, gênero) -> faixas de códigos (contínuas na primeira atribuição;
+      produtos incluídos depois abrem faixas novas).
+
+    Atributos:
+    - path (str): O arquivo dos códigos.
+    - source: O índice de estoque do armazenamento de onde vieram os vetores (ver Controller).
+
+    Métodos:
+    - assign(self, keys) -> list: Códigos dos produtos, atribuindo os que faltarem.
+    - id_of(self, product, gender, type) -> int: O código de um produto já atribuído.
+    - key(self, sku_id) -> tuple: O produto (produto, gênero, tipo) de um código.
+    - find(self, name) -> list: Códigos dos produtos com um nome.
+    - group(self, product, gender) -> list: Faixas de códigos de um tipo e gênero.
+    - refresh(self, products, source=None): Preenche os vetores a partir do catálogo.
+    - update(self, rows): Atualiza quantidade e preço de produtos nos vetores.
+    - stock(self, sku_id) -> int: Quantidade em estoque pelo código.
+    - price(self, sku_id) -> float: Preço pelo código.
+    - close(self): Fecha o arquivo.
+    """
+
+    def __init__(self, path: str = 'data.skus', lock_timeout: float = 10.0) -> None:
+        self.path = path
+        self.lock = FileLock(path + '.lock', timeout=lock_timeout)
+        self.source = None
+        self._keys = []    # Código -> (produto, gênero, tipo)
+        self._ids = {}     # Exemplo: {('shampoo', 'masculino', 'Men shampoo'): 1}
+        self._names = {}   # Exemplo: {'Men shampoo': [1]}
+        self._groups = {}  # Exemplo: {('shampoo', 'masculino'): [range(0, 2)]}
+        self._offset = 0   # Posição no arquivo até onde os códigos já foram lidos
+        self.quantity = array('q')
+        self.price_cents = array('q')
+        self._read()
+        self._file = open(path, 'ab')
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _read(self) -> None:
+        """
+        Lê os códigos gravados (por este ou por outros processos) desde a última leitura.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as file:
+            file.seek(self._offset)
+            data = file.read()
+        end = data.rfind(b'\n') + 1  # Uma última linha incompleta é de uma gravação em andamento
+        for line in data[:end].splitlines():
+            self._add(tuple(json.loads(line)))
+        self._offset += end
+
+    def _add(self, key: tuple) -> int:
+        sku_id = len(self._keys)
+        self._keys.append(key)
+        self._ids[key] = sku_id
+        self._names.setdefault(key[2], []).append(sku_id)
+        ranges = self._groups.setdefault(key[:2], [])
+        if ranges and ranges[-1].stop == sku_id:
+            ranges[-1] = range(ranges[-1].start, sku_id + 1)
+        else:
+            ranges.append(range(sku_id, sku_id + 1))
+        self.quantity.append(ABSENT)
+        self.price_cents.append(0)
+        return sku_id
+
+    def assign(self, keys) -> list:
+        """
+        Retorna os códigos dos produtos, atribuindo (com uma única escrita) os que ainda não têm.
+
+        Parâmetros:
+        - keys: Tuplas (produto, gênero, tipo).
+
+        Retorna:
+        - Os códigos, na ordem das chaves.
+        """
+        keys = list(keys)
+        if all(key in self._ids for key in keys):
+            return [self._ids[key] for key in keys]
+        with self.lock:
+            self._read()  # Códigos atribuídos por outros processos vêm antes dos novos
+            lines = []
+            for key in keys:
+                if key not in self._ids:
+                    self._add(key)
+                    lines.append(json.dumps(list(key), separators=(',', ':'), ensure_ascii=False) + '\n')
+            data = ''.join(lines).encode('utf-8')
+            self._file.write(data)
+            self._file.flush()
+            self._offset += len(data)
+        return [self._ids[key] for key in keys]
+
+    def id_of(self, product: str, gender: str, type: str) -> int:
+        """
+        Retorna o código de um produto.
+
+        Lança:
+        - InvalidProduct se o produto ainda não tiver código.
+        """
+        try:
+            return self._ids[(product, gender, type)]
+        except KeyError:
+            raise InvalidProduct("Produto não encontrado!")
+
+    def key(self, sku_id: int) -> tuple:
+        """
+        Retorna o produto (produto, gênero, tipo) de um código.
+
+        Lança:
+        - InvalidProduct se o código não existir.
+        """
+        if not 0 <= sku_id < len(self._keys):
+            self._read()  # Pode ter sido atribuído por outro processo
+            if not 0 <= sku_id < len(self._keys):
+                raise InvalidProduct(f"Código de produto não encontrado: {sku_id}")
+        return self._keys[sku_id]
+
+    def find(self, name: str) -> list:
+        """
+        Retorna os códigos dos produtos com o nome informado.
+        """
+        return list(self._names.get(name, ()))
+
+    def group(self, product: str, gender: str) -> list:
+        """
+        Retorna as faixas (range) de códigos de um tipo e gênero.
+        """
+        return list(self._groups.get((product, gender), ()))
+
+    def refresh(self, products, source=None) -> None:
+        """
+        Preenche os vetores a partir do catálogo, em uma única passada.
+
+        Produtos ainda sem código recebem um (com uma única escrita); códigos de
+        produtos que não estão no catálogo ficam marcados como ausentes.
+
+        Parâmetros:
+        - products: Tuplas (produto, gênero, tipo, informações), como as de iter_catalog.
+        - source: O índice de estoque correspondente ao catálogo lido.
+        """
+        rows = [(product, gender, type, info['quantidade'], info['preco']) for product, gender, type, info in products]
+        ids = self.assign(row[:3] for row in rows)
+        quantity = array('q', [ABSENT]) * len(self._keys)
+        price_cents = array('q', bytes(8 * len(self._keys)))
+        for sku_id, row in zip(ids, rows):
+            quantity[sku_id] = row[3]
+            price_cents[sku_id] = round(row[4] * 100)
+        self.quantity = quantity
+        self.price_cents = price_cents
+        self.source = source
+
+    def update(self, rows) -> None:
+        """
+        Atualiza nos vetores a quantidade e o preço de produtos alterados.
+
+        Parâmetros:
+        - rows: Tuplas (produto, gênero, tipo, quantidade, preço).
+        """
+        rows = list(rows)
+        for sku_id, row in zip(self.assign(row[:3] for row in rows), rows):
+            self.quantity[sku_id] = row[3]
+            self.price_cents[sku_id] = round(row[4] * 100)
+
+    def stock(self, sku_id: int) -> int:
+        """
+        Retorna a quantidade em estoque de um produto pelo código.
+
+        Lança:
+        - InvalidProduct se o código não existir ou o produto não estiver no catálogo.
+        """
+        self.key(sku_id)
+        quantity = self.quantity[sku_id]
+        if quantity == ABSENT:
+            raise InvalidProduct("Produto não encontrado!")
+        return quantity
+
+    def price(self, sku_id: int) -> float:
+        """
+        Retorna o preço de um produto pelo código.
+
+        Lança:
+        - InvalidProduct se o código não existir ou o produto não estiver no catálogo.
+        """
+        self.stock(sku_id)
+        return self.price_cents[sku_id] / 100
@@ -0,0 +1,229 @@
+import sqlite3
+import sys
+from .storage import Storage, JsonStorage, check_sale, check_deltas, iter_catalog
+from .stockindex import StockIndex
+from .searchindex import SearchIndex
+from .productsexceptions import *
+from . import metrics
+
+class SqliteStorage(Storage):
+    """
+    Armazenamento em um banco SQLite, com uma linha por produto.
+
+    Cada operação do ProductController vira uma consulta ou atualização de uma
+    única linha, localizada pelo índice único (categoria, gênero, nome). O banco
+    usa o modo WAL, para que leituras não bloqueiem a escrita, e as instruções
+    SQL são constantes, então o sqlite3 reaproveita as instruções já preparadas.
+    A coordenação entre processos fica a cargo das transações do próprio SQLite.
+
+    Os pares (tipo, gênero) do catálogo ficam em uma tabela própria, como as chaves
+    de data.json: gêneros sem produtos continuam existindo, e incluir um produto
+    ou listar um gênero de um par desconhecido lança InvalidProduct, como no JsonStorage.
+
+    A conexão só pode ser usada pela thread que a abriu, salvo com
+    check_same_thread=False; nesse caso, quem a usa de outra thread (como a
+    tarefa de escrita do servidor HTTP) deve usar sempre uma única thread por vez.
+
+    Atributos:
+    - path (str): O caminho do arquivo do banco.
+
+    Métodos:
+    - close(self): Fecha a conexão com o banco.
+    """
+
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS products ('
+        ' id INTEGER PRIMARY KEY,'
+        ' category TEXT NOT NULL,'
+        ' gender TEXT NOT NULL,'
+        ' name TEXT NOT NULL,'
+        ' quantidade INTEGER NOT NULL,'
+        ' preco REAL NOT NULL)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_products_sku ON products (category, gender, name)',
+        'CREATE TABLE IF NOT EXISTS groups ('
+        ' category TEXT NOT NULL,'
+        ' gender TEXT NOT NULL,'
+        ' PRIMARY KEY (category, gender))',
+    )
+
+    _GET = 'SELECT quantidade, preco FROM products WHERE category = ? AND gender = ? AND name = ?'
+    _ITEMS = 'SELECT name, quantidade, preco FROM products WHERE category = ? AND gender = ? ORDER BY id'
+    _ALL = 'SELECT category, gender, name, quantidade, preco FROM products ORDER BY id'
+    _GROUP = 'SELECT 1 FROM groups WHERE category = ? AND gender = ?'
+    _GROUPS = 'SELECT category, gender FROM groups ORDER BY rowid'
+    _ADD_GROUP = 'INSERT OR IGNORE INTO groups (category, gender) VALUES (?, ?)'
+    _SET_PRICE = 'UPDATE products SET preco = ? WHERE category = ? AND gender = ? AND name = ?'
+    _ADD_QUANTITY = ('UPDATE products SET quantidade = MAX(quantidade + ?, 0)'
+                     ' WHERE category = ? AND gender = ? AND name = ?')
+    _INSERT = 'INSERT INTO products (category, gender, name, quantidade, preco) VALUES (?, ?, ?, ?, ?)'
+    _UPSERT = (_INSERT + ' ON CONFLICT (category, gender, name)'
+               ' DO UPDATE SET quantidade = excluded.quantidade, preco = excluded.preco')
+    _UPSERT_ADD = (_INSERT + ' ON CONFLICT (category, gender, name)'
+                   ' DO UPDATE SET quantidade = quantidade + excluded.quantidade, preco = excluded.preco')
+
+    def __init__(self, path: str = 'data.db', check_same_thread: bool = True) -> None:
+        self.path = path
+        # isolation_level=None: cada instrução é uma transação, salvo BEGIN explícito
+        # timeout: espera pelo bloqueio de escrita de outros processos antes de falhar
+        self._conn = sqlite3.connect(path, isolation_level=None, cached_statements=256, timeout=10.0,
+                                     check_same_thread=check_same_thread)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        for statement in self._SCHEMA:
+            self._conn.execute(statement)
+        if self._conn.execute('SELECT 1 FROM groups LIMIT 1').fetchone() is None:
+            # Banco criado antes da tabela de pares: os pares vêm dos produtos, na ordem do catálogo
+            self._conn.execute('INSERT OR IGNORE INTO groups (category, gender)'
+                               ' SELECT category, gender FROM products GROUP BY category, gender ORDER BY MIN(id)')
+        self._data_version = None
+
+    def close(self) -> None:
+        """
+        Fecha a conexão com o banco.
+        """
+        self._conn.close()
+
+    def _check_version(self) -> None:
+        """
+        Descarta os índices se outra conexão gravou no banco desde a última consulta.
+
+        PRAGMA data_version só muda com gravações de outras conexões; as desta
+        já mantêm os índices por _touch.
+        """
+        version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+        if version != self._data_version:
+            self._data_version = version
+            self._index = self._search = None
+
+    def stock_index(self) -> StockIndex:
+        self._check_version()
+        return super().stock_index()
+
+    def search_index(self) -> SearchIndex:
+        self._check_version()
+        return super().search_index()
+
+    def _check_group(self, product: str, gender: str) -> None:
+        """
+        Lança InvalidProduct se o par (tipo, gênero) não existir no catálogo.
+        """
+        if self._conn.execute(self._GROUP, (product, gender)).fetchone() is None:
+            raise InvalidProduct("Produto não encontrado!")
+
+    def load(self) -> dict:
+        data = {}
+        for category, gender in self._conn.execute(self._GROUPS):
+            data.setdefault(category, {})[gender] = {}  # Inclui os gêneros sem produtos
+        for category, gender, name, quantity, price in self._conn.execute(self._ALL):
+            data.setdefault(category, {}).setdefault(gender, {})[name] = {'quantidade': quantity, 'preco': price}
+        return data
+
+    def iter_products(self):
+        for category, gender, name, quantity, price in self._conn.execute(self._ALL):
+            yield category, gender, name, {'quantidade': quantity, 'preco': price}
+
+    def save(self, data: dict) -> None:
+        rows = [(category, gender, name, info['quantidade'], info['preco'])
+                for category, gender, name, info in iter_catalog(data)]
+        groups = [(category, gender) for category, genders in data.items() if not category.startswith('_')
+                  for gender in genders]
+        with self._conn:
+            self._conn.execute('BEGIN')
+            self._conn.execute('DELETE FROM products')
+            self._conn.execute('DELETE FROM groups')
+            self._conn.executemany(self._ADD_GROUP, groups)
+            self._conn.executemany(self._INSERT, rows)
+        self._index = self._search = None
+
+    def get(self, product: str, gender: str, type: str) -> dict:
+        row = self._conn.execute(self._GET, (product, gender, type)).fetchone()
+        if row is None:
+            raise InvalidProduct("Produto não encontrado!")
+        return {'quantidade': row[0], 'preco': row[1]}
+
+    def items(self, product: str, gender: str) -> list:
+        rows = [(name, {'quantidade': quantity, 'preco': price})
+                for name, quantity, price in self._conn.execute(self._ITEMS, (product, gender))]
+        if not rows:
+            self._check_group(product, gender)  # Gênero vazio: lista vazia; par desconhecido: erro
+        return rows
+
+    def set_price(self, product: str, gender: str, type: str, price: float) -> None:
+        if self._conn.execute(self._SET_PRICE, (price, product, gender, type)).rowcount == 0:
+            raise InvalidProduct("Produto não encontrado!")
+
+    def set_prices(self, changes: list) -> None:
+        with self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            for product, gender, type, price in changes:
+                if self._conn.execute(self._SET_PRICE, (price, product, gender, type)).rowcount == 0:
+                    raise InvalidProduct("Produto não encontrado!")  # Desfaz a transação inteira
+
+    def add_quantity(self, product: str, gender: str, type: str, delta: int) -> int:
+        with self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            if self._conn.execute(self._ADD_QUANTITY, (delta, product, gender, type)).rowcount == 0:
+                raise InvalidProduct("Produto não encontrado!")
+            quantity = self._conn.execute(self._GET, (product, gender, type)).fetchone()[0]
+        self._touch(product, gender, type, quantity)
+        return quantity
+
+    def insert(self, product: str, gender: str, type: str, quantity: int, price: float) -> None:
+        with self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            self._check_group(product, gender)
+            try:
+                self._conn.execute(self._INSERT, (product, gender, type, quantity, price))
+            except sqlite3.IntegrityError:
+                raise ExistingProduct("Já existe este produto, tente adicionar quantidade ao estoque!")
+        self._touch(product, gender, type, quantity)
+
+    def upsert_many(self, rows: list, add_quantity: bool = False) -> None:
+        with self._conn:
+            self._conn.execute('BEGIN IMMEDIATE')
+            if add_quantity:
+                check_deltas(rows, self.get)  # Com a escrita reservada, o estoque conferido é o que será alterado
+            self._conn.executemany(self._UPSERT_ADD if add_quantity else self._UPSERT, rows)
+            # Como no JsonStorage, importar produtos de um par novo cria o par
+            self._conn.executemany(self._ADD_GROUP, {(row[0], row[1]) for row in rows})
+        self._index = self._search = None  # As quantidades finais ficam só no banco: os índices serão remontados
+
+    def apply_sale(self, lines: list) -> None:
+        with self._conn:
+            # BEGIN IMMEDIATE reserva a escrita antes da validação, então ninguém altera o estoque no meio
+            self._conn.execute('BEGIN IMMEDIATE')
+            totals = check_sale(lines, self.get)
+            self._conn.executemany(self._ADD_QUANTITY, [(-quantity, product, gender, type)
+                                                        for (product, gender, type), quantity in totals.items()])
+            quantities = [(sku, self.get(*sku)['quantidade']) for sku in totals]
+        for sku, quantity in quantities:
+            self._touch(*sku, quantity)
+
+
+def migrate_json_to_sqlite(json_path: str = 'data.json', db_path: str = 'data.db') -> int:
+    """
+    Copia o catálogo de um arquivo JSON (formato data.json) para um banco SQLite.
+
+    Parâmetros:
+    - json_path (str): O arquivo JSON de origem.
+    - db_path (str): O banco SQLite de destino; o conteúdo anterior é substituído.
+
+    Retorna:
+    - A quantidade de produtos migrados.
+    """
+    data = JsonStorage(json_path).load()
+    storage = SqliteStorage(db_path)
+    try:
+        storage.save(data)
+        return sum(1 for _ in iter_catalog(data))
+    finally:
+        storage.close()
+
+
+metrics.instrument(SqliteStorage, ('load', 'save'), 'sqlite')
+
+
+if __name__ == '__main__':
+    # Uso: python -m services.products.controlers.sqlitestorage [data.json] [data.db]
+    total = migrate_json_to_sqlite(*sys.argv[1:3])
+    print(f'{total} produtos migrados.')
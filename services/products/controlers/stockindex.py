@@ -0,0 +1,73 @@
+class StockIndex:
+    """
+    Classe StockIndex para manter em memória os produtos em falta e com estoque baixo.
+
+    O índice é montado uma única vez a partir do catálogo e depois atualizado a
+    cada alteração de quantidade, então as consultas custam proporcional ao número
+    de produtos em falta (ou com estoque baixo), sem ler o arquivo de novo.
+
+    Atributos:
+    - low_threshold (int): Quantidade máxima (maior que 0) considerada estoque baixo.
+
+    Métodos:
+    - rebuild(self, products): Monta o índice a partir do catálogo completo.
+    - update(self, product, gender, type, quantity): Registra a nova quantidade de um produto.
+    - zero(self, product, gender) -> list: Produtos em falta de um gênero.
+    - low(self, product, gender) -> list: Produtos com estoque baixo de um gênero.
+    - all_zero(self) -> dict: Produtos em falta agrupados por (produto, gênero).
+    """
+
+    def __init__(self, low_threshold: int = 3) -> None:
+        self.low_threshold = low_threshold
+        self._zero = {}  # Exemplo: {('shampoo', 'masculino'): {'Men shampoo': 0}}
+        self._low = {}   # Exemplo: {('perfume', 'feminino'): {'Lily': 2}}
+
+    def rebuild(self, products) -> None:
+        """
+        Monta o índice a partir do catálogo completo.
+
+        Parâmetros:
+        - products: Tuplas (produto, gênero, tipo, informações), como as de iter_catalog.
+        """
+        self._zero = {}
+        self._low = {}
+        for product, gender, type, info in products:
+            self.update(product, gender, type, info['quantidade'])
+
+    def update(self, product: str, gender: str, type: str, quantity: int) -> None:
+        """
+        Registra a nova quantidade de um produto, movendo-o entre as listas.
+
+        Parâmetros:
+        - product (str): O tipo de produto (shampoo, perfume, batom).
+        - gender (str): O gênero do produto.
+        - type (str): O nome do produto.
+        - quantity (int): A quantidade atual do produto.
+        """
+        key = (product, gender)
+        for bucket in (self._zero, self._low):
+            entries = bucket.get(key)
+            if entries and type in entries:
+                del entries[type]
+        if quantity <= 0:
+            self._zero.setdefault(key, {})[type] = quantity
+        elif quantity <= self.low_threshold:
+            self._low.setdefault(key, {})[type] = quantity
+
+    def zero(self, product: str, gender: str) -> list:
+        """
+        Retorna os produtos em falta de um gênero.
+        """
+        return list(self._zero.get((product, gender), ()))
+
+    def low(self, product: str, gender: str) -> list:
+        """
+        Retorna (produto, quantidade) dos produtos com estoque baixo de um gênero.
+        """
+        return list(self._low.get((product, gender), {}).items())
+
+    def all_zero(self) -> dict:
+        """
+        Retorna os produtos em falta de todo o catálogo, agrupados por (produto, gênero).
+        """
+        return {key: list(entries) for key, entries in self._zero.items() if entries}
@@ -0,0 +1,546 @@
+import json
+import os
+from .journal import StockJournal
+from .stockindex import StockIndex
+from .searchindex import SearchIndex
+from .filelock import FileLock
+from . import metrics
+from .productsexceptions import *
+
+class CatalogCache:
+    """
+    Classe CatalogCache para manter o catálogo carregado em memória.
+
+    O cache é compartilhado por todo o processo: cada arquivo JSON é lido e
+    interpretado apenas uma vez e só volta a ser lido quando a sua assinatura
+    no disco (mtime, tamanho e inode) muda, por exemplo quando outro processo
+    altera o arquivo.
+
+    Atributos:
+    - hits (int): Quantidade de leituras atendidas pela memória.
+    - misses (int): Quantidade de leituras que precisaram interpretar o arquivo.
+
+    Métodos:
+    - get(self, path): Retorna os dados em cache se o arquivo não mudou.
+    - put(self, path, data): Guarda os dados com a assinatura atual do arquivo.
+    - invalidate(self, path=None): Descarta uma entrada (ou todas) do cache.
+    - stats(self) -> dict: Retorna os contadores de acertos e falhas.
+    """
+
+    def __init__(self) -> None:
+        self._entries = {}  # Exemplo: {'/caminho/data.json': (assinatura, dados)}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _stamp(path: str) -> tuple:
+        """
+        Retorna a assinatura do arquivo usada para detectar alterações.
+        """
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def get(self, path: str):
+        """
+        Retorna os dados em cache do arquivo, ou None se o arquivo mudou.
+
+        Parâmetros:
+        - path (str): O caminho do arquivo JSON.
+        """
+        path = os.path.abspath(path)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == self._stamp(path):
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, path: str, data: dict) -> None:
+        """
+        Guarda os dados do arquivo com a sua assinatura atual.
+
+        Parâmetros:
+        - path (str): O caminho do arquivo JSON.
+        - data (dict): Os dados correspondentes ao conteúdo do arquivo.
+        """
+        path = os.path.abspath(path)
+        self._entries[path] = (self._stamp(path), data)
+
+    def invalidate(self, path: str = None) -> None:
+        """
+        Descarta a entrada de um arquivo, ou todas se nenhum caminho for informado.
+        """
+        if path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(os.path.abspath(path), None)
+
+    def stats(self) -> dict:
+        """
+        Retorna os contadores de acertos e falhas do cache.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+# Cache único para todo o processo, compartilhado por todos os armazenamentos JSON
+catalog_cache = CatalogCache()
+
+# Chave do contador de versão gravado junto com o catálogo
+VERSION_KEY = '_versao'
+
+
+def catalog_version(data: dict) -> int:
+    """
+    Retorna o contador de versão do catálogo (0 se ainda não existir).
+    """
+    return data.get(VERSION_KEY, 0)
+
+
+def iter_catalog(data: dict):
+    """
+    Percorre todos os produtos de um catálogo no formato de data.json.
+
+    Chaves de controle no primeiro nível (começando com '_', como '_versao') são ignoradas.
+
+    Retorna:
+    - Um gerador de tuplas (produto, gênero, tipo, informações).
+    """
+    for product, genders in data.items():
+        if product.startswith('_'):
+            continue
+        for gender, products in genders.items():
+            for type, info in products.items():
+                yield product, gender, type, info
+
+
+class Storage:
+    """
+    Interface de armazenamento usada pelo Controller.
+
+    Um armazenamento guarda produtos identificados por (produto, gênero, tipo),
+    por exemplo ('shampoo', 'masculino', 'Men shampoo'), cada um com as chaves
+    'quantidade' e 'preco'. As operações são por produto, então cada implementação
+    decide se precisa ou não tocar o catálogo inteiro.
+
+    Métodos:
+    - load(self) -> dict: Retorna o catálogo completo no formato de data.json.
+    - iter_products(self): Percorre todos os produtos como (produto, gênero, tipo, informações).
+    - save(self, data): Substitui o catálogo completo.
+    - get(self, product, gender, type) -> dict: Retorna quantidade e preço de um produto.
+    - items(self, product, gender) -> list: Retorna (tipo, informações) de um gênero.
+    - set_price(self, product, gender, type, price): Define o preço de um produto.
+    - set_prices(self, changes): Define o preço de vários produtos com uma única gravação.
+    - add_quantity(self, product, gender, type, delta) -> int: Soma ao estoque, sem ficar negativo.
+    - insert(self, product, gender, type, quantity, price): Adiciona um novo produto.
+    - upsert_many(self, rows, add_quantity=False): Inclui ou atualiza vários produtos com uma única gravação.
+    - apply_sale(self, lines): Baixa o estoque de várias linhas de venda de uma vez (tudo ou nada).
+    - compact(self): Incorpora alterações pendentes ao armazenamento principal.
+    - stock_index(self) -> StockIndex: Retorna o índice de produtos em falta e com estoque baixo.
+    - search_index(self) -> SearchIndex: Retorna o índice de busca por nome.
+
+    As implementações chamam _touch a cada quantidade alterada (e a cada produto
+    incluído), para manter os índices atualizados sem varrer o catálogo, e descartam
+    os índices (self._index = self._search = None) quando o catálogo inteiro é substituído.
+    """
+    _index = None
+    _search = None
+
+    def load(self) -> dict:
+        raise NotImplementedError
+
+    def save(self, data: dict) -> None:
+        raise NotImplementedError
+
+    def iter_products(self):
+        return iter_catalog(self.load())
+
+    def get(self, product: str, gender: str, type: str) -> dict:
+        raise NotImplementedError
+
+    def items(self, product: str, gender: str) -> list:
+        raise NotImplementedError
+
+    def set_price(self, product: str, gender: str, type: str, price: float) -> None:
+        raise NotImplementedError
+
+    def set_prices(self, changes: list) -> None:
+        raise NotImplementedError
+
+    def add_quantity(self, product: str, gender: str, type: str, delta: int) -> int:
+        raise NotImplementedError
+
+    def insert(self, product: str, gender: str, type: str, quantity: int, price: float) -> None:
+        raise NotImplementedError
+
+    def upsert_many(self, rows: list, add_quantity: bool = False) -> None:
+        raise NotImplementedError
+
+    def apply_sale(self, lines: list) -> None:
+        raise NotImplementedError
+
+    def compact(self) -> None:
+        pass
+
+    def stock_index(self) -> StockIndex:
+        """
+        Retorna o índice de produtos em falta e com estoque baixo.
+
+        O índice é montado na primeira chamada e depois mantido pelas alterações,
+        então as consultas não leem o armazenamento.
+        """
+        if self._index is None:
+            index = StockIndex()
+            index.rebuild(iter_catalog(self.load()))
+            self._index = index
+        return self._index
+
+    def search_index(self) -> SearchIndex:
+        """
+        Retorna o índice de busca por nome de todo o catálogo.
+
+        O índice é montado na primeira chamada; produtos incluídos depois entram
+        nele por _touch, sem remontá-lo.
+        """
+        if self._search is None:
+            index = SearchIndex()
+            index.rebuild(self.iter_products())
+            self._search = index
+        return self._search
+
+    def _touch(self, product: str, gender: str, type: str, quantity: int) -> None:
+        """
+        Atualiza os índices de estoque e de busca, se já tiverem sido montados.
+        """
+        if self._index is not None:
+            self._index.update(product, gender, type, quantity)
+        if self._search is not None:
+            self._search.add(product, gender, type)
+
+
+def check_sale(lines: list, get) -> dict:
+    """
+    Valida as linhas de uma venda antes de qualquer alteração no estoque.
+
+    Linhas repetidas do mesmo produto são somadas, para que a validação considere
+    o total vendido de cada produto.
+
+    Parâmetros:
+    - lines (list): Tuplas (produto, gênero, tipo, quantidade).
+    - get: Função que retorna as informações de um produto (Storage.get).
+
+    Retorna:
+    - Um dicionário {(produto, gênero, tipo): quantidade total vendida}.
+
+    Lança:
+    - ValueError se alguma quantidade não for positiva.
+    - InvalidProduct se algum produto não for encontrado.
+    - InsufficientStock se algum produto não tiver estoque suficiente.
+    """
+    totals = {}
+    for product, gender, type, quantity in lines:
+        if quantity <= 0:
+            raise ValueError("A quantidade vendida deve ser maior que 0!")
+        key = (product, gender, type)
+        totals[key] = totals.get(key, 0) + quantity
+    missing = []
+    for (product, gender, type), quantity in totals.items():
+        available = get(product, gender, type)['quantidade']
+        if quantity > available:
+            missing.append(f'{type} (pedido: {quantity}, disponível: {available})')
+    if missing:
+        raise InsufficientStock("Estoque insuficiente: " + ', '.join(missing))
+    return totals
+
+
+def check_deltas(rows: list, get) -> None:
+    """
+    Valida as diferenças de quantidade de upsert_many(rows, add_quantity=True)
+    antes de qualquer alteração: nenhuma baixa pode deixar o estoque negativo.
+
+    Usada pelos armazenamentos com o catálogo bloqueado, então o estoque
+    conferido é o mesmo que será alterado.
+
+    Parâmetros:
+    - rows (list): Tuplas (produto, gênero, tipo, diferença de quantidade, preço).
+    - get: Função que retorna as informações de um produto (Storage.get).
+
+    Lança:
+    - InsufficientStock se alguma baixa for maior que o estoque atual.
+    """
+    missing = []
+    for product, gender, type, delta, _ in rows:
+        if delta >= 0:
+            continue
+        try:
+            available = get(product, gender, type)['quantidade']
+        except InvalidProduct:
+            available = 0
+        if available + delta < 0:
+            missing.append(f'{type} (pedido: {-delta}, disponível: {available})')
+    if missing:
+        raise InsufficientStock("Estoque insuficiente: " + ', '.join(missing))
+
+
+class JsonStorage(Storage):
+    """
+    Armazenamento em um arquivo JSON no formato data[produto][gênero][tipo].
+
+    O catálogo interpretado fica no cache do processo (CatalogCache). No modo com
+    log (journaled=True), cada alteração é gravada como um registro compacto em
+    '<arquivo>.journal' em vez de reescrever o arquivo inteiro; o log é incorporado
+    ao snapshot a cada `compact_every` registros.
+
+    Vários processos podem usar o mesmo arquivo: cada alteração é feita com o
+    bloqueio '<arquivo>.lock' (FileLock) e o catálogo guarda um contador de versão
+    (chave '_versao'). Se o arquivo mudou entre a leitura e a gravação, a alteração
+    é descartada e refeita sobre os dados novos, em vez de sobrescrevê-los.
+
+    Atributos:
+    - path (str): O caminho do arquivo JSON.
+    - journaled (bool): Se as alterações são gravadas no log em vez do snapshot.
+    - compact_every (int): Quantidade de registros no log que dispara a compactação.
+    - retries (int): Quantas vezes uma alteração em conflito é refeita.
+    - lock (FileLock): O bloqueio entre processos.
+    - reloads (int): Quantas vezes o arquivo (ou o log) alterado fora deste objeto foi relido.
+    """
+
+    def __init__(self, path: str = 'data.json', journaled: bool = False, compact_every: int = 1000,
+                 retries: int = 5, lock_timeout: float = 10.0) -> None:
+        self.path = path
+        self.journaled = journaled
+        self.compact_every = compact_every
+        self.retries = retries
+        self.lock = FileLock(path + '.lock', timeout=lock_timeout)
+        self._journal = StockJournal(path + '.journal') if journaled else None
+        self.reloads = 0
+
+    def load(self) -> dict:
+        """
+        Carrega os dados do arquivo JSON, usando o cache se o arquivo não mudou.
+
+        Se o arquivo JSON não existir, cria um novo arquivo vazio e retorna um dicionário vazio.
+        O dicionário retornado é a cópia em cache: quem alterá-lo deve chamar save.
+        """
+        # Verifica se o arquivo JSON existe
+        if not os.path.exists(self.path):
+            # Se o arquivo não existir, cria um novo arquivo vazio
+            print("JSON file not found. Creating a new file.")
+            self.save({})
+            return catalog_cache.get(self.path)
+        # Usa a cópia em memória se o arquivo não mudou desde a última leitura
+        data = catalog_cache.get(self.path)
+        if data is None:
+            # Abre o arquivo JSON e carrega os dados
+            with open(self.path, 'r') as file:
+                data = json.load(file)
+                if metrics.registry is not None:
+                    metrics.registry.add_bytes('json', read=os.fstat(file.fileno()).st_size)
+            catalog_cache.put(self.path, data)
+            self._index = self._search = None  # O arquivo mudou fora deste processo: os índices serão remontados
+            self.reloads += 1
+            if self.journaled:
+                self._journal.rewind()  # Snapshot novo: o log precisa ser aplicado desde o início
+        if self.journaled:
+            # Aplica apenas os registros do log ainda não lidos (gravados por outros processos)
+            if self._journal.replay(data):
+                self._index = self._search = None
+                self.reloads += 1
+        return data
+
+    def save(self, data: dict) -> None:
+        """
+        Substitui o catálogo inteiro.
+        """
+        with self.lock:
+            data[VERSION_KEY] = catalog_version(self.load() if os.path.exists(self.path) else {}) + 1
+            self._write(data)
+            if self.journaled:
+                self._journal.truncate()  # O catálogo novo substitui também o log pendente
+        self._index = self._search = None
+
+    def stock_index(self) -> StockIndex:
+        self.load()  # Descarta os índices se outro processo alterou o arquivo (só uma consulta ao cache)
+        return super().stock_index()
+
+    def search_index(self) -> SearchIndex:
+        self.load()
+        return super().search_index()
+
+    def _write(self, data: dict) -> None:
+        """
+        Salva os dados no arquivo JSON e atualiza o cache.
+
+        A gravação é atômica: os dados vão para um arquivo temporário que só
+        substitui o original depois de gravado em disco, então uma falha no meio
+        da escrita nunca deixa o catálogo pela metade.
+        """
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump(data, file, indent=4)
+            if metrics.registry is not None:
+                metrics.registry.add_bytes('json', written=file.tell())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+        # Atualiza o cache com os dados gravados para evitar uma nova leitura
+        catalog_cache.put(self.path, data)
+
+    def _bucket(self, product: str, gender: str) -> dict:
+        """
+        Retorna o dicionário de produtos de um gênero.
+
+        Lança:
+        - InvalidProduct se o produto ou o gênero não existirem.
+        """
+        try:
+            return self.load()[product][gender]
+        except KeyError:
+            raise InvalidProduct("Produto não encontrado!")
+
+    def _mutate(self, change):
+        """
+        Executa uma alteração com o catálogo bloqueado para outros processos.
+
+        A função `change(data)` aplica a alteração nos dados carregados e retorna
+        os registros que a descrevem (ver StockJournal). Antes de gravar, confere se
+        o arquivo (e o log) continuam como foram lidos; se outro processo os alterou,
+        os dados em memória são descartados e a alteração é refeita.
+
+        Retorna:
+        - Os registros gravados.
+
+        Lança:
+        - LockTimeout se o bloqueio não for obtido a tempo.
+        - ConcurrentModification se o conflito persistir após `retries` tentativas.
+        """
+        for _ in range(self.retries):
+            with self.lock:
+                data = self.load()
+                version = catalog_version(data)
+                records = change(data)
+                if self._unchanged_since_load(data):
+                    data[VERSION_KEY] = version + len(records)
+                    self._commit(data, records)
+                    for record in records:
+                        if record[0] in ('q', 'a'):
+                            self._touch(*record[1:5])
+                    return records
+            # Conflito: descarta a cópia em memória (já alterada) e tenta de novo
+            catalog_cache.invalidate(self.path)
+        raise ConcurrentModification("O catálogo foi alterado por outro processo durante a gravação.")
+
+    def _unchanged_since_load(self, data: dict) -> bool:
+        """
+        Verifica se o arquivo (e o log) no disco ainda correspondem aos dados carregados.
+        """
+        if catalog_cache.get(self.path) is not data:
+            return False
+        return not self.journaled or self._journal.is_current()
+
+    def _commit(self, data: dict, records: list) -> None:
+        """
+        Persiste alterações já aplicadas nos dados em memória.
+
+        No modo com log apenas os registros são gravados; caso contrário o arquivo
+        inteiro é salvo.
+        """
+        if not self.journaled:
+            self._write(data)
+            return
+        self._journal.extend(records)
+        if self._journal.pending >= self.compact_every:
+            self.compact()
+
+    @staticmethod
+    def _find(data: dict, product: str, gender: str, type: str) -> dict:
+        """
+        Retorna as informações de um produto dentro dos dados já carregados.
+
+        Lança:
+        - InvalidProduct se o produto não for encontrado.
+        """
+        try:
+            return data[product][gender][type]
+        except KeyError:
+            raise InvalidProduct("Produto não encontrado!")
+
+    def get(self, product: str, gender: str, type: str) -> dict:
+        return self._find(self.load(), product, gender, type)
+
+    def items(self, product: str, gender: str) -> list:
+        return list(self._bucket(product, gender).items())
+
+    def set_price(self, product: str, gender: str, type: str, price: float) -> None:
+        def change(data):
+            self._find(data, product, gender, type)['preco'] = price
+            return [['p', product, gender, type, price]]
+        self._mutate(change)
+
+    def set_prices(self, changes: list) -> None:
+        def change(data):
+            # Confere todos os produtos antes de alterar qualquer preço
+            infos = [self._find(data, product, gender, type) for product, gender, type, _ in changes]
+            for info, (_, _, _, price) in zip(infos, changes):
+                info['preco'] = price
+            return [['p', product, gender, type, price] for product, gender, type, price in changes]
+        self._mutate(change)
+
+    def add_quantity(self, product: str, gender: str, type: str, delta: int) -> int:
+        def change(data):
+            info = self._find(data, product, gender, type)
+            info['quantidade'] = max(info['quantidade'] + delta, 0)
+            return [['q', product, gender, type, info['quantidade']]]
+        return self._mutate(change)[0][4]
+
+    def insert(self, product: str, gender: str, type: str, quantity: int, price: float) -> None:
+        def change(data):
+            try:
+                bucket = data[product][gender]
+            except KeyError:
+                raise InvalidProduct("Produto não encontrado!")
+            if type in bucket:
+                raise ExistingProduct("Já existe este produto, tente adicionar quantidade ao estoque!")
+            bucket[type] = {'quantidade': quantity, 'preco': price}
+            return [['a', product, gender, type, quantity, price]]
+        self._mutate(change)
+
+    def upsert_many(self, rows: list, add_quantity: bool = False) -> None:
+        def change(data):
+            if add_quantity:
+                check_deltas(rows, lambda *sku: self._find(data, *sku))  # Antes de alterar os dados em cache
+            records = []
+            for product, gender, type, quantity, price in rows:
+                bucket = data.setdefault(product, {}).setdefault(gender, {})
+                if add_quantity and type in bucket:
+                    quantity += bucket[type]['quantidade']
+                bucket[type] = {'quantidade': quantity, 'preco': price}
+                records.append(['a', product, gender, type, quantity, price])
+            return records
+        self._mutate(change)
+
+    def apply_sale(self, lines: list) -> None:
+        def change(data):
+            # Uma única leitura e uma única gravação para a venda inteira
+            totals = check_sale(lines, lambda *sku: self._find(data, *sku))
+            records = []
+            for (product, gender, type), quantity in totals.items():
+                info = self._find(data, product, gender, type)
+                info['quantidade'] -= quantity
+                records.append(['q', product, gender, type, info['quantidade']])
+            return records
+        self._mutate(change)
+
+    def compact(self) -> None:
+        """
+        Incorpora o log ao snapshot: grava o arquivo JSON completo e esvazia o log.
+        """
+        if not self.journaled:
+            return
+        with self.lock:
+            data = self.load()
+            self._write(data)  # Primeiro o snapshot, depois o log (os registros são idempotentes)
+            self._journal.truncate()
+
+
+# As leituras e gravações do arquivo (e do log) passam por load, save e _commit
+metrics.instrument(JsonStorage, ('load', 'save', '_commit'), 'json')
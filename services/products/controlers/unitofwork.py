@@ -0,0 +1,177 @@
+from .storage import Storage, check_sale, check_deltas
+from .stockindex import StockIndex
+from .productsexceptions import *
+
+class UnitOfWork(Storage):
+    """
+    Armazenamento temporário de uma transação (ver Controller.transaction).
+
+    As alterações são aplicadas a uma cópia de trabalho que guarda só os produtos
+    alterados; as leituras dos demais vêm direto do armazenamento de origem. No
+    fim, commit grava todas as alterações com uma única chamada a upsert_many
+    (uma gravação atômica do arquivo, ou uma transação no SQLite), então o custo
+    cresce com o número de produtos alterados, e não com o número de chamadas
+    vezes o tamanho do catálogo. Para desfazer, basta descartar a cópia.
+
+    As quantidades são gravadas como diferenças sobre o estoque de origem, então
+    vendas e entradas feitas por outros processos durante a transação não se
+    perdem; os preços gravados são os da cópia de trabalho. As baixas são
+    conferidas de novo na gravação, com a origem bloqueada: se outro processo
+    vendeu as mesmas unidades, nada é gravado (ConcurrentModification).
+
+    Atributos:
+    - backend (Storage): O armazenamento onde a transação é gravada.
+
+    Métodos (além dos de Storage):
+    - pending(self) -> int: Quantidade de produtos alterados na transação.
+    - after_commit(self, action): Agenda uma ação para depois da gravação.
+    - commit(self) -> int: Grava as alterações na origem e retorna quantos produtos foram gravados.
+    """
+
+    def __init__(self, backend: Storage) -> None:
+        self.backend = backend
+        self._changes = {}   # Exemplo: {('shampoo', 'masculino', 'Men shampoo'): {'quantidade': 12, 'preco': 17.0}}
+        self._original = {}  # Quantidade na origem quando o produto foi alterado (None se for novo)
+        self._after = []
+
+    def _find(self, product: str, gender: str, type: str) -> dict:
+        """
+        Retorna a cópia de trabalho de um produto, copiando-o da origem na primeira alteração.
+
+        Lança:
+        - InvalidProduct se o produto não for encontrado.
+        """
+        sku = (product, gender, type)
+        info = self._changes.get(sku)
+        if info is None:
+            base = self.backend.get(product, gender, type)
+            info = self._changes[sku] = dict(base)
+            self._original[sku] = base['quantidade']
+        return info
+
+    def _exists(self, product: str, gender: str, type: str) -> bool:
+        if (product, gender, type) in self._changes:
+            return True
+        try:
+            self.backend.get(product, gender, type)
+        except InvalidProduct:
+            return False
+        return True
+
+    def load(self) -> dict:
+        data = {product: {gender: dict(products) for gender, products in genders.items()}
+                for product, genders in self.backend.load().items() if not product.startswith('_')}
+        for (product, gender, type), info in self._changes.items():
+            data.setdefault(product, {}).setdefault(gender, {})[type] = info
+        return data
+
+    def iter_products(self):
+        for product, gender, type, info in self.backend.iter_products():
+            yield product, gender, type, self._changes.get((product, gender, type), info)
+        for (product, gender, type), info in self._changes.items():
+            if self._original[(product, gender, type)] is None:
+                yield product, gender, type, info  # Produtos incluídos na transação
+
+    def save(self, data: dict) -> None:
+        raise ValueError("O catálogo inteiro não pode ser substituído dentro de uma transação!")
+
+    def get(self, product: str, gender: str, type: str) -> dict:
+        info = self._changes.get((product, gender, type))
+        return info if info is not None else self.backend.get(product, gender, type)
+
+    def items(self, product: str, gender: str) -> list:
+        try:
+            products = dict(self.backend.items(product, gender))
+        except InvalidProduct:
+            products = {}
+        changed = {type: info for (category, group, type), info in self._changes.items()
+                   if category == product and group == gender}
+        if not products and not changed:
+            return self.backend.items(product, gender)  # Mantém o erro (ou a lista vazia) da origem
+        products.update(changed)
+        return list(products.items())
+
+    def set_price(self, product: str, gender: str, type: str, price: float) -> None:
+        self._find(product, gender, type)['preco'] = price
+
+    def set_prices(self, changes: list) -> None:
+        # Confere todos os produtos antes de alterar qualquer preço
+        infos = [self._find(product, gender, type) for product, gender, type, _ in changes]
+        for info, (_, _, _, price) in zip(infos, changes):
+            info['preco'] = price
+
+    def add_quantity(self, product: str, gender: str, type: str, delta: int) -> int:
+        info = self._find(product, gender, type)
+        info['quantidade'] = max(info['quantidade'] + delta, 0)
+        self._touch(product, gender, type, info['quantidade'])
+        return info['quantidade']
+
+    def insert(self, product: str, gender: str, type: str, quantity: int, price: float) -> None:
+        self.items(product, gender)  # Lança InvalidProduct se a origem não aceitar o tipo ou o gênero
+        if self._exists(product, gender, type):
+            raise ExistingProduct("Já existe este produto, tente adicionar quantidade ao estoque!")
+        self._changes[(product, gender, type)] = {'quantidade': quantity, 'preco': price}
+        self._original[(product, gender, type)] = None
+        self._touch(product, gender, type, quantity)
+
+    def upsert_many(self, rows: list, add_quantity: bool = False) -> None:
+        if add_quantity:
+            check_deltas(rows, self.get)
+        for product, gender, type, quantity, price in rows:
+            if self._exists(product, gender, type):
+                info = self._find(product, gender, type)
+                if add_quantity:
+                    quantity += info['quantidade']
+                info.update(quantidade=quantity, preco=price)
+            else:
+                self._changes[(product, gender, type)] = {'quantidade': quantity, 'preco': price}
+                self._original[(product, gender, type)] = None
+            self._touch(product, gender, type, quantity)
+
+    def apply_sale(self, lines: list) -> None:
+        check_sale(lines, self.get)  # Valida todas as linhas antes de alterar qualquer estoque
+        for product, gender, type, quantity in lines:
+            self.add_quantity(product, gender, type, -quantity)
+
+    def stock_index(self) -> StockIndex:
+        if self._index is None:
+            index = StockIndex()
+            index.rebuild(self.iter_products())  # Sem montar a cópia completa do catálogo
+            self._index = index
+        return self._index
+
+    def pending(self) -> int:
+        return len(self._changes)
+
+    def after_commit(self, action) -> None:
+        """
+        Agenda uma ação (como registrar eventos ou vendas) para depois da gravação;
+        se a transação for desfeita, a ação é descartada.
+        """
+        self._after.append(action)
+
+    def commit(self) -> int:
+        """
+        Grava todas as alterações na origem com uma única gravação e executa as
+        ações agendadas.
+
+        Retorna:
+        - A quantidade de produtos gravados.
+
+        Lança:
+        - ConcurrentModification se o estoque atual da origem não cobrir mais as baixas da transação.
+        """
+        rows = []
+        for (product, gender, type), info in self._changes.items():
+            original = self._original[(product, gender, type)]
+            quantity = info['quantidade'] if original is None else info['quantidade'] - original
+            rows.append((product, gender, type, quantity, info['preco']))
+        if rows:
+            # Com add_quantity, as quantidades dos produtos existentes são somadas ao estoque atual da origem
+            try:
+                self.backend.upsert_many(rows, add_quantity=True)
+            except InsufficientStock as e:
+                raise ConcurrentModification(f"O estoque foi alterado por outro processo durante a transação. {e}") from e
+        for action in self._after:
+            action()
+        return len(rows)
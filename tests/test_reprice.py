@@ -0,0 +1,68 @@
+"""
+Testes da validação de preços da remarcação (Controller.reprice) e de edit_price.
+
+Uso (na raiz do projeto):
+    python -m pytest tests
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.products.controlers.controller import Controller
+from services.products.controlers.productcontroller import ProductController
+from services.products.controlers.storage import JsonStorage
+from services.products.controlers.productsexceptions import InvalidPrice
+
+
+class RepriceTest(unittest.TestCase):
+    """
+    Preços que não são números finitos maiores que 0 lançam InvalidPrice e não alteram o catálogo.
+    """
+
+    def setUp(self) -> None:
+        self._workdir = tempfile.mkdtemp(prefix='test_reprice_')
+        self._path = os.path.join(self._workdir, 'data.json')
+        shutil.copy(os.path.join(ROOT, 'data.json'), self._path)
+        self._previous = Controller.storage
+        Controller.use_storage(JsonStorage(self._path))
+
+    def tearDown(self) -> None:
+        Controller.storage = self._previous
+        shutil.rmtree(self._workdir, ignore_errors=True)
+
+    def _file_price(self) -> float:
+        with open(self._path, 'r') as file:
+            return json.load(file)['shampoo']['masculino']['Men shampoo']['preco']
+
+    def test_invalid_prices_are_rejected(self) -> None:
+        before = self._file_price()
+        for value in (float('nan'), float('inf'), float('-inf'), 0, -1):
+            with self.subTest(prices=value), self.assertRaises(InvalidPrice):
+                Controller().reprice(prices={'Men shampoo': value})
+        for percent in (float('nan'), float('inf'), -100):
+            with self.subTest(percent=percent), self.assertRaises(InvalidPrice):
+                Controller().reprice(percent=percent, category='shampoo')
+        for amount in (float('nan'), float('inf')):
+            with self.subTest(amount=amount), self.assertRaises(InvalidPrice):
+                Controller().reprice(amount=amount, category='shampoo')
+        self.assertEqual(self._file_price(), before)
+
+    def test_edit_price_rejects_non_finite(self) -> None:
+        action = ProductController('masculino', 'shampoo')
+        for value in (float('nan'), float('inf')):
+            with self.subTest(price=value), self.assertRaises(InvalidPrice):
+                action.edit_price('Men shampoo', value)
+
+    def test_valid_reprice(self) -> None:
+        self.assertEqual(Controller().reprice(prices={'Men shampoo': 18.9}), 1)
+        self.assertEqual(self._file_price(), 18.9)
+
+
+if __name__ == '__main__':
+    unittest.main()